@@ -0,0 +1,66 @@
+"""Unique indexes on swipe and match user pairs
+
+Revision ID: 3c7d9e2a5f10
+Revises: 9d3c6a0e4b21
+Create Date: 2026-10-18 14:22:09.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7d9e2a5f10'
+down_revision = '9d3c6a0e4b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Pairs Both Users Swiped On Concurrently have a Row in Each Direction - Merge into the Earlier Row.
+    # Either Side REJECTED Rejects the Pair, Otherwise Both Swiped Right and the Pair is ACCEPTED
+    op.execute("""
+        UPDATE swipes AS kept
+        SET swipe_result = CASE WHEN 'REJECTED' IN (kept.swipe_result, dup.swipe_result) THEN 'REJECTED' ELSE 'ACCEPTED' END
+        FROM swipes AS dup
+        WHERE dup.swiper_id = kept.swipee_id AND dup.swipee_id = kept.swiper_id
+          AND (kept.swipe_date, kept.swiper_id) < (dup.swipe_date, dup.swiper_id)
+    """)
+    op.execute("""
+        DELETE FROM swipes AS dup
+        USING swipes AS kept
+        WHERE dup.swiper_id = kept.swipee_id AND dup.swipee_id = kept.swiper_id
+          AND (kept.swipe_date, kept.swiper_id) < (dup.swipe_date, dup.swiper_id)
+    """)
+
+    # Duplicate Matches for a Pair - Move their Messages onto the Oldest Match, then Drop the Rest
+    ranked_matches = """
+        SELECT id, MIN(id) OVER (PARTITION BY LEAST(matcher_id, matchee_id), GREATEST(matcher_id, matchee_id)) AS kept_id
+        FROM matches
+    """
+    op.execute(f"""
+        UPDATE messages SET match_id = ranked.kept_id
+        FROM ({ranked_matches}) AS ranked
+        WHERE messages.match_id = ranked.id AND ranked.id <> ranked.kept_id
+    """)
+    op.execute(f"""
+        DELETE FROM matches
+        USING ({ranked_matches}) AS ranked
+        WHERE matches.id = ranked.id AND ranked.id <> ranked.kept_id
+    """)
+
+    op.create_index(
+        'uq_swipes_pair', 'swipes',
+        [sa.text('LEAST(swiper_id, swipee_id)'), sa.text('GREATEST(swiper_id, swipee_id)')],
+        unique=True,
+    )
+    op.create_index(
+        'uq_matches_pair', 'matches',
+        [sa.text('LEAST(matcher_id, matchee_id)'), sa.text('GREATEST(matcher_id, matchee_id)')],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index('uq_matches_pair', table_name='matches')
+    op.drop_index('uq_swipes_pair', table_name='swipes')
@@ -0,0 +1,69 @@
+"""Hot-path indexes, and the unique constraints declared on UserPhoto, Prompt, and PromptAnswer
+
+Revision ID: b81e4f6a2d93
+Revises: 3c7d9e2a5f10
+Create Date: 2026-10-18 16:05:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e4f6a2d93'
+down_revision = '3c7d9e2a5f10'
+branch_labels = None
+depends_on = None
+
+# (Index Name, Table, Columns) - Built CONCURRENTLY, so Swipes and Messages Keep Flowing While they Build
+HOT_PATH_INDEXES = [
+    ('ix_swipes_swipee_id_result', 'swipes', ['swipee_id', 'swipe_result']),
+    ('ix_matches_matcher_id', 'matches', ['matcher_id']),
+    ('ix_matches_matchee_id', 'matches', ['matchee_id']),
+    ('ix_messages_match_id_message_date', 'messages', ['match_id', 'message_date']),
+    ('ix_user_photos_owner_main_upload', 'user_photos', ['fk_user_photo_owner', 'is_main_photo', 'upload_date']),
+]
+
+
+def upgrade():
+    # The Constraints were Declared in the Class Bodies but Never Attached - Drop Any Duplicates
+    # they'd Reject First, Keeping the Oldest Row
+    op.execute("""
+        DELETE FROM user_photos AS dup
+        USING user_photos AS kept
+        WHERE dup.url = kept.url AND dup.is_main_photo = kept.is_main_photo
+          AND dup.fk_user_photo_owner IS NOT DISTINCT FROM kept.fk_user_photo_owner
+          AND kept.id < dup.id
+    """)
+
+    # A Duplicate Prompt's Answers Go with It
+    duplicate_prompts = """
+        SELECT dup.id FROM prompts AS dup
+        JOIN prompts AS kept
+          ON dup.user_id = kept.user_id AND dup.prompt_question = kept.prompt_question AND kept.id < dup.id
+    """
+    op.execute(f"DELETE FROM prompt_answers WHERE prompt_id IN ({duplicate_prompts})")
+    op.execute(f"DELETE FROM prompts WHERE id IN ({duplicate_prompts})")
+    op.execute("""
+        DELETE FROM prompt_answers AS dup
+        USING prompt_answers AS kept
+        WHERE dup.prompt_id = kept.prompt_id AND dup.answer = kept.answer AND kept.id < dup.id
+    """)
+
+    op.create_unique_constraint('uq_user_photos_url_main_owner', 'user_photos', ['url', 'is_main_photo', 'fk_user_photo_owner'])
+    op.create_unique_constraint('uq_prompts_user_question', 'prompts', ['user_id', 'prompt_question'])
+    op.create_unique_constraint('uq_prompt_answers_prompt_answer', 'prompt_answers', ['prompt_id', 'answer'])
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in HOT_PATH_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(HOT_PATH_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    op.drop_constraint('uq_prompt_answers_prompt_answer', 'prompt_answers', type_='unique')
+    op.drop_constraint('uq_prompts_user_question', 'prompts', type_='unique')
+    op.drop_constraint('uq_user_photos_url_main_owner', 'user_photos', type_='unique')
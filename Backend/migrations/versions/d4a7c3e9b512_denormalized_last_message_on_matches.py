@@ -0,0 +1,67 @@
+"""Denormalized last message and last activity columns on matches
+
+Revision ID: d4a7c3e9b512
+Revises: b81e4f6a2d93
+Create Date: 2026-10-18 17:41:12.550391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c3e9b512'
+down_revision = 'b81e4f6a2d93'
+branch_labels = None
+depends_on = None
+
+MESSAGE_PREVIEW_LENGTH = 100
+
+
+def upgrade():
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_message_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('last_message_preview', sa.String(length=MESSAGE_PREVIEW_LENGTH), nullable=True))
+        batch_op.add_column(sa.Column('last_message_kind', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+
+    # Backfill from Each Match's Newest Message, Else the Match Itself
+    # (Re-Runnable Later in Batches with DB_Utils --action backfill_match_activity)
+    op.execute(f"""
+        UPDATE matches
+        SET last_message_id = latest.id,
+            last_message_preview = LEFT(latest.message_content, {MESSAGE_PREVIEW_LENGTH}),
+            last_message_kind = latest.kind,
+            last_activity_at = GREATEST(matches.match_date, latest.message_date)
+        FROM (
+            SELECT DISTINCT ON (match_id) match_id, id, message_content, kind, message_date
+            FROM messages
+            ORDER BY match_id, message_date DESC, id DESC
+        ) AS latest
+        WHERE latest.match_id = matches.id
+    """)
+    op.execute("UPDATE matches SET last_activity_at = COALESCE(match_date, created_at, now()) WHERE last_activity_at IS NULL")
+
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.alter_column('last_activity_at', existing_type=sa.DateTime(), nullable=False)
+
+    # The Match List Reads One Side's Matches in last_activity_at Order - These Replace the Single-Column Indexes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_matches_matcher_id_activity', 'matches', ['matcher_id', 'last_activity_at'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_matches_matchee_id_activity', 'matches', ['matchee_id', 'last_activity_at'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_matches_matcher_id', table_name='matches', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_matches_matchee_id', table_name='matches', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_matches_matcher_id', 'matches', ['matcher_id'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_matches_matchee_id', 'matches', ['matchee_id'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_matches_matchee_id_activity', table_name='matches', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_matches_matcher_id_activity', table_name='matches', postgresql_concurrently=True, if_exists=True)
+
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_column('last_activity_at')
+        batch_op.drop_column('last_message_kind')
+        batch_op.drop_column('last_message_preview')
+        batch_op.drop_column('last_message_id')
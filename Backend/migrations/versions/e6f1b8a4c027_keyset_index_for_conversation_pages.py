@@ -0,0 +1,29 @@
+"""Keyset index for conversation pages - (match_id, message_date, id) on messages
+
+Revision ID: e6f1b8a4c027
+Revises: d4a7c3e9b512
+Create Date: 2026-10-18 18:22:40.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f1b8a4c027'
+down_revision = 'd4a7c3e9b512'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # id Breaks message_date Ties, so a (message_date, id) Cursor Page is a Single Index Range Scan, Sort-Free
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_match_id_message_date_id', 'messages', ['match_id', 'message_date', 'id'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_messages_match_id_message_date', table_name='messages', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_match_id_message_date', 'messages', ['match_id', 'message_date'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_messages_match_id_message_date_id', table_name='messages', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,58 @@
+"""Per-match message sequence numbers - messages.seq and matches.last_seq
+
+Revision ID: f2c9a7d4e618
+Revises: e6f1b8a4c027
+Create Date: 2026-10-18 20:04:53.271906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c9a7d4e618'
+down_revision = 'e6f1b8a4c027'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_seq', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seq', sa.Integer(), nullable=True))
+
+    # Number Existing Conversations in the Order they're Read - (message_date, id)
+    op.execute("""
+        UPDATE messages
+        SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY match_id ORDER BY message_date, id) AS seq
+            FROM messages
+        ) AS numbered
+        WHERE numbered.id = messages.id
+    """)
+    op.execute("""
+        UPDATE matches
+        SET last_seq = latest.seq
+        FROM (SELECT match_id, max(seq) AS seq FROM messages GROUP BY match_id) AS latest
+        WHERE latest.match_id = matches.id
+    """)
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.alter_column('seq', existing_type=sa.Integer(), nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_match_id_seq', 'messages', ['match_id', 'seq'], unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_messages_match_id_seq', table_name='messages', postgresql_concurrently=True, if_exists=True)
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_column('seq')
+
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_column('last_seq')
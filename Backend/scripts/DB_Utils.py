@@ -34,6 +34,14 @@ def drop_all_tables():
 
         db.drop_all()
 
+# Recompute the Denormalized Last Message Columns on matches from messages
+def backfill_match_activity():
+    from Backend.src.models.match import Match
+
+    with app.app_context():
+        updated = Match.backfill_last_messages()
+        print(f"Match activity backfilled - {updated} matches updated.")
+
 # Hash the key using SHA-256
 def hash_key(key):
     return hashlib.sha256(key.encode()).hexdigest()
@@ -52,18 +60,20 @@ def main(action):
         if action == 'create':
             create_all_tables()
             print("All tables created successfully.") # TODO: Log this message 
+        elif action == 'backfill_match_activity':
+            backfill_match_activity()
         elif action == 'drop':
             if input("Are you sure you want to drop all tables? (y/n): ").strip().lower() == 'y':
                 drop_all_tables()
                 print("All tables dropped successfully.") # TODO: Log this message
         else:
-            print("Invalid action. Please enter 'create' or 'drop'.")
+            print("Invalid action. Please enter 'create', 'drop', or 'backfill_match_activity'.")
     else:
         print("Unauthorized access. Set the correct DB_UTILS_KEY environment variable.")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Database Utilities')
-    parser.add_argument('--action', nargs='?', choices=['create', 'drop'], help="Action to perform: 'create' to create all tables or 'drop' to drop all tables")
+    parser.add_argument('--action', nargs='?', choices=['create', 'drop', 'backfill_match_activity'], help="Action to perform: 'create' to create all tables, 'drop' to drop all tables, or 'backfill_match_activity' to recompute matches' last message columns")
 
     args = parser.parse_args()
     action = args.action if args.action else input("Enter 'create' to create all tables or 'drop' to drop all tables: ").strip().lower()
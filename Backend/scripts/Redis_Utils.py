@@ -0,0 +1,100 @@
+# Author: Joshua Ferguson
+
+# Rebuild/Backfill the Redis Structures Derived from Postgres
+# Usage: python3 -m Backend.scripts.Redis_Utils --action <action>
+
+import argparse
+
+from Backend.app import app
+from Backend.src.services.candidate_index_service import CandidateIndex
+from Backend.src.services.geo_index_service import GeoIndex
+from Backend.src.services.message_log_flusher import MESSAGE_LOG_DEAD_STREAM
+from Backend.src.services.message_log_service import MESSAGE_LOG_STREAM
+from Backend.src.services.swipe_exclusion_service import SwipeExclusionFilter
+from Backend.src.services.mutual_like_service import MutualLikeDetector
+from Backend.src.services.stream_flusher import requeue_dead_entries
+from Backend.src.services.swipe_log_flusher import SWIPE_LOG_DEAD_STREAM
+from Backend.src.services.swipe_log_service import SWIPE_LOG_STREAM
+from Backend.src.services.unread_counter_service import UnreadCounter
+from Backend.src.services.user_activity_service import UserActivity
+
+
+# Rebuild the Swipe Pool Candidate Index from the users and datingpreferences Tables
+def rebuild_candidate_index():
+    with app.app_context():
+        indexed = CandidateIndex().rebuild()
+        print(f"Candidate index rebuilt - {indexed} users indexed.")
+
+# Rebuild the Per-User Swipe Exclusion Sets (and Bloom Filters) from the swipes Table
+def rebuild_swipe_exclusions():
+    with app.app_context():
+        processed = SwipeExclusionFilter().rebuild()
+        print(f"Swipe exclusions rebuilt - {processed} swipes processed.")
+
+# Backfill the users:last_online Activity Sorted Set from users.last_online
+def backfill_user_activity():
+    with app.app_context():
+        written = UserActivity().rebuild()
+        print(f"User activity backfilled - {written} users written.")
+
+# Rebuild the Geo Grid Index from users.latitude/longitude
+def rebuild_geo_index():
+    with app.app_context():
+        indexed = GeoIndex().rebuild()
+        print(f"Geo index rebuilt - {indexed} users indexed.")
+
+# Rebuild the Mutual-Like Detector's liked_by Sets from the swipes Table
+def rebuild_liked_by():
+    with app.app_context():
+        written = MutualLikeDetector().rebuild()
+        print(f"liked_by sets rebuilt - {written} pending likes written.")
+
+# Repair Drift Between the liked_by Sets and the swipes Table (and ACCEPTED Pairs Missing a Match) - Safe to Run on a Schedule
+def reconcile_liked_by():
+    with app.app_context():
+        repaired = MutualLikeDetector().reconcile(log_stream=SWIPE_LOG_STREAM)
+        print(f"liked_by sets reconciled - {repaired['added']} added, {repaired['removed']} removed, "
+              f"{repaired['matches_created']} missing matches created.")
+
+# Recompute the Per-User Unread Counters from messages.message_read
+def rebuild_unread_counts():
+    with app.app_context():
+        written = UnreadCounter().rebuild()
+        print(f"Unread counts rebuilt - {written} match counts written.")
+
+# Move Dead-Lettered Chat Messages Back onto the Async Message Log
+def requeue_dead_messages():
+    requeued = requeue_dead_entries(MESSAGE_LOG_STREAM, MESSAGE_LOG_DEAD_STREAM)
+    print(f"Dead messages requeued - {requeued} messages back on the log.")
+
+# Move Dead-Lettered Swipes Back onto the Write-Behind Swipe Log
+def requeue_dead_swipes():
+    requeued = requeue_dead_entries(SWIPE_LOG_STREAM, SWIPE_LOG_DEAD_STREAM)
+    print(f"Dead swipes requeued - {requeued} swipes back on the log.")
+
+
+ACTIONS = {
+    'rebuild_candidate_index': rebuild_candidate_index,
+    'rebuild_swipe_exclusions': rebuild_swipe_exclusions,
+    'backfill_user_activity': backfill_user_activity,
+    'rebuild_geo_index': rebuild_geo_index,
+    'rebuild_liked_by': rebuild_liked_by,
+    'reconcile_liked_by': reconcile_liked_by,
+    'rebuild_unread_counts': rebuild_unread_counts,
+    'requeue_dead_messages': requeue_dead_messages,
+    'requeue_dead_swipes': requeue_dead_swipes,
+}
+
+def main(action):
+    if action not in ACTIONS:
+        print(f"Invalid action. Please enter one of: {', '.join(ACTIONS)}")
+        return
+    ACTIONS[action]()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Redis Utilities')
+    parser.add_argument('--action', nargs='?', choices=list(ACTIONS), help="Redis structure to rebuild from the database")
+
+    args = parser.parse_args()
+    action = args.action if args.action else input(f"Enter an action ({', '.join(ACTIONS)}): ").strip().lower()
+    main(action)
@@ -0,0 +1,166 @@
+# Author: Joshua Ferguson
+
+# Time Conversation Pages on One Large Match (50k Messages by Default), at Increasing Depth:
+# - full_load:  the Old get_messages - Loads the Whole Conversation, then COUNT + OFFSET for the Page
+# - offset:     COUNT + OFFSET Alone (the Legacy ?page= Path Now)
+# - keyset:     get_messages_page - a (message_date, id) Cursor, LIMIT n + 1, No COUNT
+# Runs in a Scratch Schema, Dropped Afterwards Unless --keep
+# Usage: python3 -m Backend.scripts.bench_conversation_pages [--messages 50000] [--limit 20] [--runs 7] [--output pages.json]
+
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+
+from Backend.app import app
+from Backend.src.extensions import db
+import Backend.src.models # noqa: F401 - Registers Every Table on db.metadata
+
+# Mirrors of the ORM Statements Each Path Runs - :limit, :offset, :cursor_date, :cursor_id per Page
+PAGE_COLUMNS = "id, match_id, messager_id, message_content, message_date, message_read, kind"
+PAGE_QUERIES = {
+    "full_load": [
+        f"SELECT {PAGE_COLUMNS} FROM messages WHERE match_id = :match_id ORDER BY message_date DESC",
+        "SELECT count(*) FROM messages WHERE match_id = :match_id",
+        f"SELECT {PAGE_COLUMNS} FROM messages WHERE match_id = :match_id ORDER BY message_date DESC LIMIT :limit OFFSET :offset",
+    ],
+    "offset": [
+        "SELECT count(*) FROM messages WHERE match_id = :match_id",
+        f"SELECT {PAGE_COLUMNS} FROM messages WHERE match_id = :match_id ORDER BY message_date DESC LIMIT :limit OFFSET :offset",
+    ],
+    "keyset": [
+        f"""SELECT {PAGE_COLUMNS} FROM messages
+            WHERE match_id = :match_id AND (message_date, id) < (:cursor_date, :cursor_id)
+            ORDER BY message_date DESC, id DESC LIMIT :limit + 1""",
+    ],
+}
+
+
+def seed(conn, messages):
+    """One Match Between Two Users, with Pairs of Messages Sharing a message_date so id Has to Break Ties"""
+    conn.execute(text("""
+        INSERT INTO users (id, email, auth_provider, name, deleted, created_at, updated_at)
+        VALUES ('bench_a', 'bench_a@bench.test', 'email', 'Bench A', false, now(), now()),
+               ('bench_b', 'bench_b@bench.test', 'email', 'Bench B', false, now(), now())
+    """))
+    match_id = conn.execute(text("""
+        INSERT INTO matches (matcher_id, matchee_id, created_at, match_date, last_activity_at)
+        VALUES ('bench_a', 'bench_b', now(), now() - interval '1 year', now())
+        RETURNING id
+    """)).scalar()
+
+    start = time.perf_counter()
+    conn.execute(text("""
+        INSERT INTO messages (match_id, messager_id, message_content, message_date, message_read, kind, seq)
+        SELECT :match_id, CASE WHEN i % 2 = 0 THEN 'bench_a' ELSE 'bench_b' END, 'Message ' || i,
+               now() - interval '1 year' + (i / 2) * interval '1 minute', true, 'text', i
+        FROM generate_series(1, :messages) AS i
+    """), {"match_id": match_id, "messages": messages})
+    conn.execute(text("UPDATE matches SET last_seq = :messages WHERE id = :match_id"), {"match_id": match_id, "messages": messages})
+    conn.execute(text("ANALYZE"))
+    conn.commit()
+    print(f"Seeded {messages} messages in {(time.perf_counter() - start):.1f} s")
+    return match_id
+
+
+def cursor_at(conn, match_id, offset):
+    """The (message_date, id) of the Message Just Above a Page - What the Client Would Send as `before`"""
+    if offset == 0:
+        return {"cursor_date": "infinity", "cursor_id": 0}
+    cursor_date, cursor_id = conn.execute(text(
+        "SELECT message_date, id FROM messages WHERE match_id = :match_id ORDER BY message_date DESC, id DESC OFFSET :offset LIMIT 1"
+    ), {"match_id": match_id, "offset": offset - 1}).one()
+    return {"cursor_date": cursor_date, "cursor_id": cursor_id}
+
+
+def plan_nodes(node):
+    """Node Types (with Index Names) Down a JSON Plan"""
+    nodes = [f"{node['Node Type']} {node['Index Name']}" if "Index Name" in node else node["Node Type"]]
+    for child in node.get("Plans", []):
+        nodes += plan_nodes(child)
+    return nodes
+
+
+def time_page(conn, statements, params, runs):
+    """Median Wall-Clock ms to Run and Fetch Every Statement of One Path, Plus the Rows the Page Returned"""
+    timings, rows = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        for statement in statements:
+            rows = len(conn.execute(text(statement), params).all())
+        timings.append((time.perf_counter() - start) * 1000)
+    conn.rollback()
+    return statistics.median(timings), rows
+
+
+def main(messages, limit, runs, schema, output, keep):
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            print("The conversation page bench needs PostgreSQL.")
+            return
+
+        # Page 1, Then Ever Deeper Back into the History
+        depths = sorted({0, *(page * limit for page in (10, 100, 1000)), (messages // limit - 1) * limit})
+        depths = [depth for depth in depths if depth < messages]
+        results = {}
+
+        with db.engine.connect() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+            conn.execute(text(f"SET search_path TO {schema}"))
+            conn.commit()
+
+            try:
+                db.metadata.create_all(conn)
+                conn.commit()
+                match_id = seed(conn, messages)
+
+                for depth in depths:
+                    params = {"match_id": match_id, "limit": limit, "offset": depth, **cursor_at(conn, match_id, depth)}
+                    conn.rollback()
+                    results[depth] = {name: time_page(conn, statements, params, runs) for name, statements in PAGE_QUERIES.items()}
+
+                # The Keyset Plan at the Deepest Page - Should be One Index Scan, No Sort
+                plan = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {PAGE_QUERIES['keyset'][0]}"), params).scalar()
+                plan = plan[0] if isinstance(plan, list) else json.loads(plan)[0]
+                conn.rollback()
+            finally:
+                if not keep:
+                    conn.rollback()
+                    conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+                    conn.commit()
+
+    print(f"\n{messages} messages, {limit} per page, median of {runs} runs (ms):")
+    print(f"{'page':>8}{'offset':>10}" + "".join(f"{name:>12}" for name in PAGE_QUERIES) + f"{'speedup':>10}")
+    for depth, timings in results.items():
+        speedup = timings["full_load"][0] / timings["keyset"][0] if timings["keyset"][0] else float("inf")
+        print(
+            f"{depth // limit + 1:>8}{depth:>10}" + "".join(f"{timings[name][0]:>12.2f}" for name in PAGE_QUERIES)
+            + f"{speedup:>9.1f}x"
+        )
+    print(f"\nKeyset plan at offset {depths[-1]}: {' -> '.join(plan_nodes(plan['Plan']))}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({
+                "dataset": {"messages": messages, "limit": limit, "runs": runs},
+                "pages": {str(depth): {name: {"median_ms": ms, "rows": rows} for name, (ms, rows) in timings.items()}
+                          for depth, timings in results.items()},
+                "keyset_plan": plan,
+            }, f, indent=2, default=str)
+        print(f"Timings written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time Offset vs Keyset Conversation Pages on One Large Match')
+    parser.add_argument('--messages', type=int, default=50000, help="Messages in the benchmark match")
+    parser.add_argument('--limit', type=int, default=20, help="Messages per page")
+    parser.add_argument('--runs', type=int, default=7, help="Timed runs per page and path")
+    parser.add_argument('--schema', default="bench_conversation_pages", help="Scratch schema, dropped and recreated")
+    parser.add_argument('--output', help="Write the timings and keyset plan here")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch schema afterwards")
+
+    args = parser.parse_args()
+    main(args.messages, args.limit, args.runs, args.schema, args.output, args.keep)
@@ -0,0 +1,275 @@
+# Author: Joshua Ferguson
+
+# Seed a Large Synthetic Dataset into a Scratch Schema and Record EXPLAIN ANALYZE Timings for the Hot Queries,
+# Before (Without) and After (With) the Hot-Path Indexes and Unique Constraints
+# Never Touches the App's Own Tables - Everything Lives in the --schema Schema, Dropped Afterwards Unless --keep
+# Usage: python3 -m Backend.scripts.bench_query_plans [--users 50000] [--swipes_per_user 40] [--messages_per_match 20] [--runs 7] [--output plans.json]
+
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.schema import AddConstraint, CreateIndex
+
+from Backend.app import app
+from Backend.src.extensions import db
+import Backend.src.models # noqa: F401 - Registers Every Table on db.metadata
+
+# Indexes and Constraints Added by Migrations b81e4f6a2d93, d4a7c3e9b512, and e6f1b8a4c027 - Dropped for the "Before" Run
+BENCH_INDEXES = [
+    ("swipes", "ix_swipes_swipee_id_result"),
+    ("matches", "ix_matches_matcher_id_activity"),
+    ("matches", "ix_matches_matchee_id_activity"),
+    ("messages", "ix_messages_match_id_message_date_id"),
+    ("user_photos", "ix_user_photos_owner_main_upload"),
+]
+BENCH_CONSTRAINTS = [
+    ("user_photos", "uq_user_photos_url_main_owner"),
+    ("prompts", "uq_prompts_user_question"),
+    ("prompt_answers", "uq_prompt_answers_prompt_answer"),
+]
+
+# Hot Queries, Mirroring their Call Sites - :user_id, :match_id, and :since are Sampled per Run
+HOT_QUERIES = {
+    # generate_swipe_pool Without the Exclusion Filter Built - NOT EXISTS Against Swipes Received
+    "swipe_pool_exclusions": """
+        SELECT u.id FROM users u
+        WHERE u.id <> :user_id AND u.deleted IS NOT TRUE
+          AND u.state = (SELECT state FROM users WHERE id = :user_id)
+          AND NOT EXISTS (
+              SELECT 1 FROM swipes s
+              WHERE (s.swiper_id = :user_id AND s.swipee_id = u.id)
+                 OR (s.swiper_id = u.id AND s.swipee_id = :user_id AND s.swipe_result = 'ACCEPTED'))
+          AND NOT EXISTS (
+              SELECT 1 FROM swipes s WHERE s.swiper_id = u.id AND s.swipee_id = :user_id AND s.swipe_result = 'REJECTED')
+        LIMIT 200
+    """,
+    # MutualLikeDetector - Pending Likes Received
+    "likes_received": """
+        SELECT swiper_id FROM swipes WHERE swipee_id = :user_id AND swipe_result = 'PENDING'
+    """,
+    # UserModelHelper.get_match_summaries - the Match List
+    "match_list": """
+        SELECT m.id, m.match_date, u.name, m.last_message_preview, m.last_message_kind, m.last_activity_at, m.last_seq
+        FROM matches m
+        LEFT JOIN users u ON u.id = CASE WHEN m.matcher_id = :user_id THEN m.matchee_id ELSE m.matcher_id END
+        WHERE m.matcher_id = :user_id OR m.matchee_id = :user_id
+        ORDER BY m.last_activity_at DESC
+    """,
+    # MatchModelHelper.get_messages_page - The Newest Conversation Page
+    "conversation_page": """
+        SELECT * FROM messages WHERE match_id = :match_id ORDER BY message_date DESC, id DESC LIMIT 21
+    """,
+    # New Messages Across All of a User's Matches
+    "new_messages": """
+        SELECT * FROM messages
+        WHERE match_id IN (SELECT id FROM matches WHERE matcher_id = :user_id OR matchee_id = :user_id)
+          AND message_date > :since
+        ORDER BY message_date DESC
+    """,
+    # /users/profile_picture - Latest Main Photo
+    "main_photo": """
+        SELECT url FROM user_photos WHERE fk_user_photo_owner = :user_id AND is_main_photo ORDER BY upload_date DESC LIMIT 1
+    """,
+    # prompt_routes - A User's Prompts
+    "user_prompts": """
+        SELECT * FROM prompts WHERE user_id = :user_id
+    """,
+}
+
+
+def seed(conn, users, swipes_per_user, messages_per_match):
+    """Fill the Scratch Schema with generate_series - Deterministic, setseed Fixes random()"""
+    steps = [
+        ("users", """
+            INSERT INTO users (id, email, auth_provider, name, gender, age, state, city, deleted, created_at, updated_at, last_online)
+            SELECT 'u' || g, 'u' || g || '@bench.test', 'email', 'User ' || g,
+                   CASE WHEN g % 2 = 0 THEN 'male' ELSE 'female' END, 18 + g % 40,
+                   'S' || (g % 50), 'C' || (g % 400), false,
+                   now() - (g % 365) * interval '1 day', now(), now() - (g % 30) * interval '1 day'
+            FROM generate_series(1, :users) AS g
+        """),
+        ("datingpreferences", """
+            INSERT INTO datingpreferences (user_id, interested_in, age_preference_lower, age_preference_upper)
+            SELECT 'u' || g, 'any', 18, 60 FROM generate_series(1, :users) AS g
+        """),
+        # Stride Through the Users so Swipes Land Evenly; a Pair Already Swiped the Other Way is Skipped
+        ("swipes", """
+            INSERT INTO swipes (swiper_id, swipee_id, swipe_result, swipe_date)
+            SELECT 'u' || g, 'u' || ((g + k * 7919) % :users + 1),
+                   CASE WHEN r < 0.1 THEN 'ACCEPTED' WHEN r < 0.6 THEN 'REJECTED' ELSE 'PENDING' END,
+                   now() - (k % 60) * interval '1 day'
+            FROM generate_series(1, :users) AS g, generate_series(1, :swipes_per_user) AS k, LATERAL (SELECT random() AS r) AS roll
+            WHERE (g + k * 7919) % :users + 1 <> g
+            ON CONFLICT DO NOTHING
+        """),
+        ("matches", """
+            INSERT INTO matches (matcher_id, matchee_id, created_at, match_date, last_activity_at)
+            SELECT swiper_id, swipee_id, swipe_date, swipe_date, swipe_date FROM swipes WHERE swipe_result = 'ACCEPTED'
+            ON CONFLICT DO NOTHING
+        """),
+        ("messages", """
+            INSERT INTO messages (match_id, messager_id, message_content, message_date, message_read, kind, seq)
+            SELECT m.id, CASE WHEN i % 2 = 0 THEN m.matcher_id ELSE m.matchee_id END, 'Message ' || i,
+                   m.match_date + i * interval '1 hour', i < :messages_per_match - 2, 'text', i
+            FROM matches m, generate_series(1, :messages_per_match) AS i
+        """),
+        # As Match.add_message Leaves Them
+        ("matches (last message)", """
+            UPDATE matches m
+            SET last_message_id = latest.id, last_message_preview = LEFT(latest.message_content, 100),
+                last_message_kind = latest.kind, last_activity_at = latest.message_date, last_seq = latest.seq
+            FROM (SELECT DISTINCT ON (match_id) match_id, id, message_content, kind, message_date, seq
+                  FROM messages ORDER BY match_id, message_date DESC, id DESC) AS latest
+            WHERE latest.match_id = m.id
+        """),
+        ("user_photos", """
+            INSERT INTO user_photos (fk_user_photo_owner, url, is_main_photo, upload_date)
+            SELECT 'u' || g, 'https://bench.test/u' || g || '/' || p || '.jpg', p = 0, now() - p * interval '1 day'
+            FROM generate_series(1, :users) AS g, generate_series(0, 4) AS p
+        """),
+        ("prompts", """
+            INSERT INTO prompts (user_id, prompt_question, created_at, updated_at)
+            SELECT 'u' || g, 'Question ' || q, now(), now() FROM generate_series(1, :users) AS g, generate_series(1, 3) AS q
+        """),
+    ]
+
+    conn.execute(text("SELECT setseed(0.42)"))
+    params = {"users": users, "swipes_per_user": swipes_per_user, "messages_per_match": messages_per_match}
+    for table, statement in steps:
+        start = time.perf_counter()
+        result = conn.execute(text(statement), params)
+        print(f"Seeded {result.rowcount:>10} {table:<18} in {(time.perf_counter() - start):.1f} s")
+    conn.execute(text("ANALYZE"))
+    conn.commit()
+
+
+def drop_bench_indexes(conn):
+    for _, name in BENCH_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for table, name in BENCH_CONSTRAINTS:
+        conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}"))
+    conn.execute(text("ANALYZE"))
+    conn.commit()
+
+
+def create_bench_indexes(conn):
+    """Recreate Them from the Models' Own Declarations, so the Bench Measures What the Models Ship"""
+    for table, name in BENCH_INDEXES:
+        index = next(index for index in db.metadata.tables[table].indexes if index.name == name)
+        conn.execute(CreateIndex(index))
+    for table, name in BENCH_CONSTRAINTS:
+        constraint = next(constraint for constraint in db.metadata.tables[table].constraints if constraint.name == name)
+        conn.execute(AddConstraint(constraint))
+    conn.execute(text("ANALYZE"))
+    conn.commit()
+
+
+def plan_indexes(node):
+    """Index Names Used Anywhere in a JSON Plan"""
+    used = {node["Index Name"]} if "Index Name" in node else set()
+    for child in node.get("Plans", []):
+        used |= plan_indexes(child)
+    return used
+
+
+def explain(conn, samples):
+    """
+    EXPLAIN (ANALYZE, BUFFERS) Each Hot Query Once per Sample.
+
+    Returns:
+        dict: Query name -> {"execution_ms" (median), "planning_ms" (median), "plan_root", "indexes", "plan"}
+    """
+    results = {}
+    for name, statement in HOT_QUERIES.items():
+        execution, planning, plan = [], [], None
+        for sample in samples:
+            row = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}"), sample).scalar()
+            plan = row[0] if isinstance(row, list) else json.loads(row)[0]
+            execution.append(plan["Execution Time"])
+            planning.append(plan["Planning Time"])
+        conn.rollback()
+
+        results[name] = {
+            "execution_ms": statistics.median(execution),
+            "planning_ms": statistics.median(planning),
+            "plan_root": plan["Plan"]["Node Type"],
+            "indexes": sorted(plan_indexes(plan["Plan"])),
+            "plan": plan,
+        }
+    return results
+
+
+def main(users, swipes_per_user, messages_per_match, runs, schema, output, keep):
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            print("The query plan bench needs PostgreSQL.")
+            return
+
+        with db.engine.connect() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+            conn.execute(text(f"SET search_path TO {schema}"))
+            conn.commit()
+
+            try:
+                db.metadata.create_all(conn)
+                conn.commit()
+                drop_bench_indexes(conn)
+                seed(conn, users, swipes_per_user, messages_per_match)
+
+                # The Same Users and Matches in Both Runs - Users with Matches, so Every Query Has Work to Do
+                conn.execute(text("SELECT setseed(0.7)"))
+                samples = [
+                    {"user_id": user_id, "match_id": match_id, "since": since}
+                    for user_id, match_id, since in conn.execute(text(
+                        "SELECT matcher_id, id, match_date + interval '12 hours' FROM matches ORDER BY random() LIMIT :runs"
+                    ), {"runs": runs})
+                ]
+                conn.rollback()
+
+                before = explain(conn, samples)
+                start = time.perf_counter()
+                create_bench_indexes(conn)
+                print(f"Built indexes and constraints in {(time.perf_counter() - start):.1f} s")
+                after = explain(conn, samples)
+            finally:
+                if not keep:
+                    conn.rollback()
+                    conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+                    conn.commit()
+
+    print(f"\n{len(samples)} samples per query, median execution time:")
+    print(f"{'query':<24}{'before ms':>12}{'after ms':>12}{'speedup':>10}  plan (before -> after)")
+    for name in HOT_QUERIES:
+        was, now = before[name], after[name]
+        speedup = was["execution_ms"] / now["execution_ms"] if now["execution_ms"] else float("inf")
+        print(
+            f"{name:<24}{was['execution_ms']:>12.3f}{now['execution_ms']:>12.3f}{speedup:>9.1f}x  "
+            f"{was['plan_root']} {was['indexes'] or ''} -> {now['plan_root']} {now['indexes'] or ''}"
+        )
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({
+                "dataset": {"users": users, "swipes_per_user": swipes_per_user, "messages_per_match": messages_per_match},
+                "before": before,
+                "after": after,
+            }, f, indent=2, default=str)
+        print(f"\nFull plans written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='EXPLAIN ANALYZE the Hot Queries Before and After the Hot-Path Indexes')
+    parser.add_argument('--users', type=int, default=50000, help="Synthetic users")
+    parser.add_argument('--swipes_per_user', type=int, default=40, help="Swipes sent per user")
+    parser.add_argument('--messages_per_match', type=int, default=20, help="Messages per match")
+    parser.add_argument('--runs', type=int, default=7, help="Sampled users (and matches) per query")
+    parser.add_argument('--schema', default="bench_query_plans", help="Scratch schema, dropped and recreated")
+    parser.add_argument('--output', help="Write both runs' full JSON plans here")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch schema afterwards")
+
+    args = parser.parse_args()
+    main(args.users, args.swipes_per_user, args.messages_per_match, args.runs, args.schema, args.output, args.keep)
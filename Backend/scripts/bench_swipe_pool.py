@@ -0,0 +1,104 @@
+# Author: Joshua Ferguson
+
+# Benchmark Warm vs. Cold Swipe Pool Fetches, and Report Redis Memory per Cached Pool
+# Usage: python3 -m Backend.scripts.bench_swipe_pool --user_id <user_id> [--limit 20] [--runs 50]
+
+import argparse
+import json
+import statistics
+import time
+
+import redis
+
+from Backend.app import app
+from Backend.src.extensions import redis_client
+from Backend.src.services.swipe_pool_service import (
+    SWIPE_POOL_READ_POSITIONS,
+    SWIPE_POOL_REFILL_QUEUE,
+    SwipePoolService,
+    swipe_pool_key,
+    swipe_pool_served_key,
+)
+from Backend.src.services.profile_card_service import profile_card_key
+
+
+def clear_swipe_pool(user_id):
+    """Drop the Cached Pool, Served Set, and Read Position so the Next Fetch is a Cold Miss"""
+    SwipePoolService().drop_swipe_pool(user_id)
+    redis_client.delete(swipe_pool_served_key(user_id))
+    redis_client.zrem(SWIPE_POOL_REFILL_QUEUE, user_id)
+    redis_client.zrem(SWIPE_POOL_READ_POSITIONS, user_id)
+
+
+def time_fetch(pool_service, user_id, limit):
+    """Time a Single Fetch, Returns (milliseconds, source)"""
+    start = time.perf_counter()
+    result = pool_service.get_swipe_pool(user_id, limit)
+    return (time.perf_counter() - start) * 1000, result["source"]
+
+
+def summarize(label, timings):
+    if not timings:
+        print(f"{label:<6} no samples")
+        return
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<6} n={len(timings):<4} median={statistics.median(timings):8.2f} ms  p95={p95:8.2f} ms  max={timings[-1]:8.2f} ms")
+
+
+def report_memory(user_id):
+    """Bytes Held by the User's ID-Only Pool vs. What Inlining a Full Card per Entry Would Cost"""
+    card_ids = redis_client.zrange(swipe_pool_key(user_id), 0, -1)
+    if not card_ids:
+        print("memory no cached pool")
+        return
+
+    # MEMORY USAGE is Disabled on Some Managed Redis Servers
+    try:
+        pool_bytes = redis_client.memory_usage(swipe_pool_key(user_id)) or 0
+        card_bytes = [redis_client.memory_usage(profile_card_key(card_id)) or 0 for card_id in card_ids]
+    except redis.ResponseError as e:
+        print(f"memory not reported - {str(e)}")
+        return
+    inline_bytes = sum(
+        len(json.dumps({field: json.loads(value) for field, value in redis_client.hgetall(profile_card_key(card_id)).items()}))
+        for card_id in card_ids
+    )
+
+    print(f"memory cards={len(card_ids)} pool={pool_bytes} B ({pool_bytes / len(card_ids):.0f} B/card)  "
+          f"shared profile cards={sum(card_bytes)} B  inline card JSON would add {inline_bytes} B to every pool")
+
+
+def main(user_id, limit, runs):
+    pool_service = SwipePoolService()
+    cold, warm = [], []
+
+    with app.test_request_context():
+        for _ in range(runs):
+            # Cold - Empty Cache, Full Generation
+            clear_swipe_pool(user_id)
+            elapsed, source = time_fetch(pool_service, user_id, limit)
+            if source == "generated":
+                cold.append(elapsed)
+
+            # Warm - Served From the Pool the Cold Fetch Just Cached
+            elapsed, source = time_fetch(pool_service, user_id, limit)
+            if source == "cache":
+                warm.append(elapsed)
+
+        report_memory(user_id)
+        clear_swipe_pool(user_id)
+
+    print(f"Swipe Pool Fetch Latency - user={user_id} limit={limit}")
+    summarize("cold", cold)
+    summarize("warm", warm)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark Warm vs. Cold Swipe Pool Fetches')
+    parser.add_argument('--user_id', required=True, help="User to fetch the swipe pool for (needs dating preferences)")
+    parser.add_argument('--limit', type=int, default=20, help="Cards per fetch")
+    parser.add_argument('--runs', type=int, default=50, help="Number of cold/warm fetch pairs")
+
+    args = parser.parse_args()
+    main(args.user_id, args.limit, args.runs)
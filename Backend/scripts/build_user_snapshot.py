@@ -0,0 +1,29 @@
+# Author: Joshua Ferguson
+
+# Build or Refresh the Shared Columnar User Snapshot (see src/services/user_snapshot_service.py)
+# Usage: python3 -m Backend.scripts.build_user_snapshot [--full]
+
+import argparse
+import time
+
+from Backend.app import app
+from Backend.src.services.user_snapshot_service import UserSnapshot
+
+
+def main(full):
+    with app.app_context():
+        snapshot = UserSnapshot(writable=True)
+        start = time.perf_counter()
+        written = snapshot.build() if full else snapshot.refresh()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"User snapshot {'built' if full else 'refreshed'} - {written} users written in {elapsed_ms:.1f} ms")
+        print(f"Version {snapshot.meta['version']}: {snapshot.meta['rows']}/{snapshot.meta['capacity']} rows, watermark {snapshot.meta['watermark']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the User Snapshot')
+    parser.add_argument('--full', action='store_true', help="Rebuild from scratch instead of applying changes since the watermark")
+
+    args = parser.parse_args()
+    main(args.full)
@@ -0,0 +1,35 @@
+# Author: Joshua Ferguson
+
+# Standalone Async Chat Message Log Flusher
+# Messages are Only Logged When CHAT_PERSISTENCE=async - Keep at Least One Flusher Running While it Is
+# Usage: python3 -m Backend.scripts.message_log_flusher [--batch_size 500] [--db_connections 2]
+
+import argparse
+import os
+import signal
+
+
+def main(batch_size, db_connections):
+    # Bound this Process' DB Pool Before the App (and its Engine) is Created
+    os.environ["DB_POOL_SIZE"] = str(db_connections)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+
+    from Backend.app import app
+    from Backend.src.services.message_log_flusher import MessageLogFlusher
+
+    flusher = MessageLogFlusher(app, batch_size=batch_size)
+
+    # Finish the Current Batch on SIGTERM/SIGINT, then Exit
+    signal.signal(signal.SIGTERM, lambda *_: flusher.stop())
+    signal.signal(signal.SIGINT, lambda *_: flusher.stop())
+
+    flusher.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Message Log Flusher')
+    parser.add_argument('--batch_size', type=int, default=500, help="Max logged messages written per transaction")
+    parser.add_argument('--db_connections', type=int, default=2, help="DB pool size for this flusher")
+
+    args = parser.parse_args()
+    main(args.batch_size, args.db_connections)
@@ -0,0 +1,35 @@
+# Author: Joshua Ferguson
+
+# Standalone Write-Behind Swipe Log Flusher
+# Swipes are Only Logged When SWIPE_WRITE_BEHIND=1 and the liked_by Sets are Built (Redis_Utils --action rebuild_liked_by)
+# Usage: python3 -m Backend.scripts.swipe_log_flusher [--batch_size 1000] [--db_connections 2]
+
+import argparse
+import os
+import signal
+
+
+def main(batch_size, db_connections):
+    # Bound this Process' DB Pool Before the App (and its Engine) is Created
+    os.environ["DB_POOL_SIZE"] = str(db_connections)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+
+    from Backend.app import app
+    from Backend.src.services.swipe_log_flusher import SwipeLogFlusher
+
+    flusher = SwipeLogFlusher(app, batch_size=batch_size)
+
+    # Finish the Current Batch on SIGTERM/SIGINT, then Exit
+    signal.signal(signal.SIGTERM, lambda *_: flusher.stop())
+    signal.signal(signal.SIGINT, lambda *_: flusher.stop())
+
+    flusher.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Swipe Log Flusher')
+    parser.add_argument('--batch_size', type=int, default=1000, help="Max logged swipes written per transaction")
+    parser.add_argument('--db_connections', type=int, default=2, help="DB pool size for this flusher")
+
+    args = parser.parse_args()
+    main(args.batch_size, args.db_connections)
@@ -0,0 +1,40 @@
+# Author: Joshua Ferguson
+
+# Standalone Swipe Pool Refill Worker
+# Usage: python3 -m Backend.scripts.swipe_pool_worker [--db_connections 4] [--batch_size 50] [--snapshot_refresh_interval 30]
+
+import argparse
+import os
+import signal
+
+
+def main(db_connections, batch_size, snapshot_refresh_interval):
+    # Bound this Process' DB Pool Before the App (and its Engine) is Created
+    os.environ["DB_POOL_SIZE"] = str(db_connections)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+
+    from Backend.app import app
+    from Backend.src.services.swipe_pool_worker import SwipePoolRefillWorker
+
+    worker = SwipePoolRefillWorker(
+        app,
+        db_connections=db_connections,
+        batch_size=batch_size,
+        snapshot_refresh_interval=snapshot_refresh_interval,
+    )
+
+    # Finish the Current Batch on SIGTERM/SIGINT, then Exit
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+
+    worker.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Swipe Pool Refill Worker')
+    parser.add_argument('--db_connections', type=int, default=4, help="DB connections (and concurrent refills) for this worker")
+    parser.add_argument('--batch_size', type=int, default=50, help="Max users popped from the refill queue per batch")
+    parser.add_argument('--snapshot_refresh_interval', type=int, default=30, help="Seconds between user snapshot refreshes (0 disables)")
+
+    args = parser.parse_args()
+    main(args.db_connections, args.batch_size, args.snapshot_refresh_interval)
@@ -10,6 +10,7 @@ Extensions:
 - flask_jwt: JWTManager for handling JSON Web Tokens.
 - bcrypt: Bcrypt instance for password hashing.
 - redis_client: Redis client for caching and data storage.
+- redis_binary_client: Redis client returning raw bytes, for binary values.
 - s3: Boto3 S3 resource for interacting with Amazon S3.
 
 """
@@ -47,6 +48,11 @@ redis_client = redis.Redis(
     host="localhost", port=6379, decode_responses=True  # TODO use environment variables
 )
 
+# Binary-Safe Redis Client for Raw Bytes (e.g. Bloom Filter Bitmaps)
+redis_binary_client = redis.Redis(
+    host="localhost", port=6379, decode_responses=False  # TODO use environment variables
+)
+
 
 ## S3 Client for Media Storage
 # Import the MediaStorageService Class - Imported Here to Avoid Circular Imports
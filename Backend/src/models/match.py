@@ -3,13 +3,19 @@
 
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import fields
+from sqlalchemy import DateTime, Integer, String, and_, column, func, or_, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import relationship
 
 from Backend.src.extensions import db, ma # DB and Marshmallow Instances
+from Backend.src.models.message import Message
 from Backend.src.models.model_helpers import MatchModelHelper
 from Backend.src.models.user import User, UserSchema # User Model
 from Backend.src.models.swipe import Swipe # Swipe Model
 
+MESSAGE_PREVIEW_LENGTH = 100 # Characters of the Last Message Kept on the Match
+MATCH_BACKFILL_BATCH = 5000 # Match IDs per Backfill Transaction
+
 # Match Model for Matches Table
 class Match(db.Model):
     __tablename__ = 'matches' # Define the table name
@@ -20,7 +26,7 @@ class Match(db.Model):
     # On Delete of User - Cascade to Remove Associated Matches
     matcher_id = db.Column(db.String(64), db.ForeignKey('users.id'), nullable=False)
     matchee_id = db.Column(db.String(64), db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     
     """"
@@ -39,10 +45,22 @@ class Match(db.Model):
     """
     
     # ---Dimensional Fields---
-    match_date = db.Column(db.DateTime, nullable=False, default = datetime.now(timezone.utc))
+    match_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # ---Last Message, Denormalized for the Match List - Written with Each Message (see add_message)---
+    last_message_id = db.Column(db.Integer, nullable=True) # Not a Foreign Key - messages Already References matches
+    last_message_preview = db.Column(db.String(MESSAGE_PREVIEW_LENGTH), nullable=True)
+    last_message_kind = db.Column(db.String(10), nullable=True)
+    last_activity_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)) # Last Message, Else the Match Itself
+    last_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0") # seq of the Match's Latest Message - the Next is last_seq + 1
     
-    # Unique Constraint for matcher and matchee combination
-    db.UniqueConstraint('matcher_id', 'matchee_id')
+    __table_args__ = (
+        # One Match per Pair of Users, Whichever of Them is the Matcher
+        db.Index("uq_matches_pair", func.least(matcher_id, matchee_id), func.greatest(matcher_id, matchee_id), unique=True),
+        # A User's Matches are Looked Up from Either Side (matcher_id = :id OR matchee_id = :id), Most Recently Active First
+        db.Index("ix_matches_matcher_id_activity", matcher_id, last_activity_at),
+        db.Index("ix_matches_matchee_id_activity", matchee_id, last_activity_at),
+    )
     
     # Dictionary Representation of Match Object
     # Returns the Matcher and Matchee Email Addresses and Match Date
@@ -53,14 +71,14 @@ class Match(db.Model):
             'matchee_id': self.matchee_id,
             'match_date': self.match_date,
         }
+
+    # The Other User in the Match
+    def partner_id(self, user_id):
+        return self.matchee_id if self.matcher_id == user_id else self.matcher_id
         
     @staticmethod
     def create_match(matcher_id, matchee_id):
         
-        # Check if Match Already Exists
-        match = Match.query.filter_by(matcher_id=matcher_id, matchee_id=matchee_id).first()
-        if match:
-            return match
         # Validate matcher and matchee
         if matcher_id == matchee_id:
             return None
@@ -69,14 +87,277 @@ class Match(db.Model):
             return None
         
         try:
-            # Create Match
-            match = Match(matcher_id=matcher_id, matchee_id=matchee_id)
-            db.session.add(match)
+            # Create Match, or Return the Pair's Existing One (in Either Direction)
+            match_id, _ = Match.insert_pairs(matcher_id, [matchee_id])[matchee_id]
             db.session.commit()
-            return match
+            return Match.query.get(match_id)
         except Exception as e:
+            db.session.rollback()
             print(f"Error creating match: {str(e)}")
             return None
+
+    @staticmethod
+    def insert_pairs(matcher_id, matchee_ids, match_date=None):
+        """
+        Create Matches Between One User and Several Others, Idempotently - an INSERT ... ON CONFLICT DO NOTHING
+        on the Pair's Unique Index, so Concurrent Callers Create Exactly One Match per Pair.
+        Runs in the Caller's Transaction (No Commit).
+
+        Parameters:
+            matcher_id (str): The user the matches are created for.
+            matchee_ids (list): The other users.
+            match_date (datetime, optional): Defaults to now.
+
+        Returns:
+            dict: matchee_id -> (match_id, created), where created is False if the pair was already matched.
+        """
+        if not matchee_ids:
+            return {}
+        match_date = match_date or datetime.now(timezone.utc)
+
+        statement = pg_insert(Match).values([
+            {"matcher_id": matcher_id, "matchee_id": matchee_id, "created_at": match_date, "match_date": match_date, "last_activity_at": match_date}
+            for matchee_id in matchee_ids
+        ]).on_conflict_do_nothing(
+            index_elements=[func.least(Match.matcher_id, Match.matchee_id), func.greatest(Match.matcher_id, Match.matchee_id)],
+        ).returning(Match.id, Match.matchee_id)
+        matches = {matchee_id: (match_id, True) for match_id, matchee_id in db.session.execute(statement)}
+
+        # Pairs that Already had a Match, Either Direction
+        existing_ids = [matchee_id for matchee_id in matchee_ids if matchee_id not in matches]
+        if existing_ids:
+            existing = db.session.query(Match.id, Match.matcher_id, Match.matchee_id).filter(
+                or_(
+                    and_(Match.matcher_id == matcher_id, Match.matchee_id.in_(existing_ids)),
+                    and_(Match.matchee_id == matcher_id, Match.matcher_id.in_(existing_ids)),
+                )
+            )
+            for match_id, match_matcher_id, match_matchee_id in existing:
+                other_id = match_matchee_id if match_matcher_id == matcher_id else match_matcher_id
+                matches[other_id] = (match_id, False)
+        return matches
+
+    @staticmethod
+    def add_message(match_id, messager_id, message_content, kind=None, message_date=None):
+        """
+        Insert a Message and Make it the Match's Last Message - Every Message Write Goes Through Here,
+        so the Denormalized Columns Change in the Same Transaction. Runs in the Caller's Transaction (No Commit).
+        The Message Takes the Match's Next seq - Incrementing last_seq Row-Locks the Match Until Commit,
+        so Concurrent Senders Serialize, and a Rolled-Back Message Gives its seq Back. While Async Mode is On
+        it Comes from the Logged Messages' Counter Instead (see message_log_service), Floored at last_seq.
+
+        Parameters:
+            match_id (int): The match the message belongs to.
+            messager_id (str): The sender.
+            message_content (str): The message.
+            kind (str, optional): text or game - defaults to text.
+            message_date (datetime, optional): Defaults to now.
+
+        Returns:
+            Message: The new message, with its id assigned.
+        """
+        # Imported Here - message_log_service Imports the Models
+        from Backend.src.services.message_log_service import MessageLog
+
+        seq = None
+        if MessageLog.is_enabled():
+            # Logged Messages Not Yet Flushed Hold seqs Past last_seq - Take the Next from their Counter
+            last_seq = db.session.execute(
+                select(Match.last_seq).where(Match.id == match_id).with_for_update()
+            ).scalar_one()
+            try:
+                seq = MessageLog().next_seq(match_id, last_seq)
+                db.session.execute(
+                    update(Match)
+                    .where(Match.id == match_id, Match.last_seq < seq)
+                    .values(last_seq=seq)
+                    .execution_options(synchronize_session=False)
+                )
+            except Exception as e:
+                # The Flusher Renumbers a Logged Message Whose seq this Takes
+                print(f"Error taking a seq for match {match_id} from Redis, taking it from last_seq: {str(e)}")
+                seq = None
+
+        if seq is None:
+            seq = db.session.execute(
+                update(Match)
+                .where(Match.id == match_id)
+                .values(last_seq=Match.last_seq + 1)
+                .returning(Match.last_seq)
+                .execution_options(synchronize_session=False)
+            ).scalar_one()
+
+        message = Message(
+            match_id=match_id,
+            messager_id=messager_id,
+            message_content=message_content,
+            kind=kind or "text",
+            message_date=message_date or datetime.now(timezone.utc),
+            seq=seq,
+        )
+        db.session.add(message)
+        db.session.flush()
+
+        # An Older Message Never Overwrites a Newer One (Ordered by (message_date, id), as Conversations are -
+        # Logged Messages' Ids Come in Per-Process Blocks)
+        Match.query.filter(
+            Match.id == match_id,
+            or_(
+                Match.last_message_id.is_(None),
+                tuple_(Match.last_activity_at, Match.last_message_id) < tuple_(message.message_date, message.id),
+            ),
+        ).update({
+            "last_message_id": message.id,
+            "last_message_preview": message.message_content[:MESSAGE_PREVIEW_LENGTH],
+            "last_message_kind": message.kind,
+            "last_activity_at": message.message_date,
+        }, synchronize_session=False)
+        return message
+
+    @staticmethod
+    def insert_messages(rows, next_seq=None):
+        """
+        Bulk add_message for Messages with Reserved Ids (see message_log_service) - Inserts Them, Skipping
+        Ids Already Present, then Moves Each Match's Last Message Columns to its Newest. No Commit.
+        Messages Keep the seq they were Logged With. One Whose seq Another Message Took (a Strict Save
+        While Redis was Down) Takes a New One in the Order Given - the Matches are
+        Locked First, so add_message Waits Until Commit.
+
+        Parameters:
+            rows (list): Message rows - id, match_id, messager_id, message_content, kind, message_date, message_read, seq.
+            next_seq (callable, optional): (match_id, last_seq) -> a seq above last_seq (see MessageLog.next_seq) -
+                                           defaults to last_seq + 1.
+
+        Returns:
+            set: Ids actually inserted (a replayed message is skipped).
+        """
+        if not rows:
+            return set()
+
+        # Lock in id Order, as Every Writer Does, so Two Batches Can't Deadlock
+        last_seqs = dict(db.session.execute(
+            select(Match.id, Match.last_seq)
+            .where(Match.id.in_({row["match_id"] for row in rows}))
+            .order_by(Match.id)
+            .with_for_update()
+        ).all())
+
+        # Replayed Messages are Already In - Under the Locks, Nothing Else Can Insert Them Now
+        present = set(db.session.execute(
+            select(Message.id).where(Message.id.in_([row["id"] for row in rows]))
+        ).scalars())
+        # seqs Other Messages Already Hold
+        taken = {tuple(pair) for pair in db.session.execute(
+            select(Message.match_id, Message.seq)
+            .where(tuple_(Message.match_id, Message.seq).in_([(row["match_id"], row["seq"]) for row in rows]))
+        )}
+
+        new_rows = []
+        for row in rows:
+            if row["match_id"] not in last_seqs:
+                raise ValueError(f"Match {row['match_id']} not found for message {row['id']}")
+            if row["id"] in present:
+                continue
+            present.add(row["id"])
+            seq = row["seq"]
+            if (row["match_id"], seq) not in taken:
+                taken.add((row["match_id"], seq))
+                last_seqs[row["match_id"]] = max(last_seqs[row["match_id"]], seq)
+            else:
+                seq = None
+            new_rows.append({**row, "seq": seq})
+        if not new_rows:
+            return set()
+
+        # Renumber Those Whose seq Was Taken, Past Every seq Kept
+        for row in new_rows:
+            if row["seq"] is None:
+                last_seq = last_seqs[row["match_id"]]
+                row["seq"] = next_seq(row["match_id"], last_seq) if next_seq else last_seq + 1
+                last_seqs[row["match_id"]] = max(last_seq, row["seq"])
+
+        inserted = set(db.session.execute(
+            pg_insert(Message).values(new_rows).on_conflict_do_nothing(index_elements=[Message.id]).returning(Message.id)
+        ).scalars())
+
+        seqs = values(column("match_id", Integer), column("last_seq", Integer), name="seqs").data(
+            [(match_id, last_seq) for match_id, last_seq in last_seqs.items()]
+        )
+        db.session.execute(
+            update(Match)
+            .where(Match.id == seqs.c.match_id, Match.last_seq < seqs.c.last_seq)
+            .values(last_seq=seqs.c.last_seq)
+            .execution_options(synchronize_session=False)
+        )
+        rows = new_rows
+
+        # Newest Inserted Message per Match
+        newest = {}
+        for row in rows:
+            current = newest.get(row["match_id"])
+            if row["id"] in inserted and (current is None or (row["message_date"], row["id"]) > (current["message_date"], current["id"])):
+                newest[row["match_id"]] = row
+        if not newest:
+            return inserted
+
+        latest = values(
+            column("match_id", Integer), column("id", Integer), column("message_content", String),
+            column("kind", String), column("message_date", DateTime), name="latest",
+        ).data([
+            (row["match_id"], row["id"], row["message_content"][:MESSAGE_PREVIEW_LENGTH], row["kind"], row["message_date"])
+            for row in newest.values()
+        ])
+        db.session.execute(
+            update(Match)
+            .where(
+                Match.id == latest.c.match_id,
+                or_(
+                    Match.last_message_id.is_(None),
+                    tuple_(Match.last_activity_at, Match.last_message_id) < tuple_(latest.c.message_date, latest.c.id),
+                ),
+            )
+            .values(
+                last_message_id=latest.c.id,
+                last_message_preview=latest.c.message_content,
+                last_message_kind=latest.c.kind,
+                last_activity_at=latest.c.message_date,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return inserted
+
+    @staticmethod
+    def backfill_last_messages(batch_size=MATCH_BACKFILL_BATCH):
+        """
+        Recompute Every Match's Last Message Columns from messages, One Range of Match IDs per Transaction.
+
+        Returns:
+            int: Number of matches updated.
+        """
+        updated = 0
+        max_id = db.session.query(func.max(Match.id)).scalar() or 0
+        for start in range(0, max_id + 1, batch_size):
+            latest = (
+                select(Message.match_id, Message.id, Message.message_content, Message.kind, Message.message_date)
+                .where(Message.match_id >= start, Message.match_id < start + batch_size)
+                .distinct(Message.match_id)
+                .order_by(Message.match_id, Message.message_date.desc(), Message.id.desc())
+                .subquery()
+            )
+            result = db.session.execute(
+                update(Match)
+                .where(Match.id == latest.c.match_id)
+                .values(
+                    last_message_id=latest.c.id,
+                    last_message_preview=func.left(latest.c.message_content, MESSAGE_PREVIEW_LENGTH),
+                    last_message_kind=latest.c.kind,
+                    last_activity_at=func.greatest(Match.match_date, latest.c.message_date),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            updated += result.rowcount
+        return updated
     
     @staticmethod 
     # Get Messages between two users, with optional limit and offset
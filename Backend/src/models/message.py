@@ -1,7 +1,7 @@
 # Author: Joshua Ferguson
 
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from marshmallow import ValidationError, validates
 
 from marshmallow_sqlalchemy import fields
@@ -15,6 +15,30 @@ from Backend.src.validators.text_val import TextValidator # Custom Validators
 
 
 MESSAGE_CONTENT_LENGTH = 500
+MESSAGE_SEQ_GAP_WAIT = timedelta(minutes=15) # A Missing seq Younger than this May Still Reach Postgres
+
+
+def held_seq(from_seq, messages, now=None):
+    """
+    The seq a Client Holds After Receiving Messages on Top of from_seq - the Last One Before a Gap. In Async Mode
+    a Logged Message can Reach Postgres After a Higher seq, so a Missing seq is Waited For - Unless the Message
+    After it is Older than MESSAGE_SEQ_GAP_WAIT (the Missing One was Rolled Back or Dead-Lettered).
+
+    Parameters:
+        from_seq (int): The seq the client held before.
+        messages (list): (seq, message_date) of the messages received, by seq - message_date as stored, naive UTC.
+        now (datetime, optional): Defaults to now.
+
+    Returns:
+        int: The seq to ask from next - messages past it are sent again.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    held = from_seq
+    for seq, message_date in messages:
+        if seq > held + 1 and message_date > now - MESSAGE_SEQ_GAP_WAIT:
+            break
+        held = seq
+    return held
 
 # Message Model for Messages Table
 # TODO: Implement CASCADE on User Deletion
@@ -35,12 +59,24 @@ class Message(db.Model):
     message_content = db.Column(db.String(MESSAGE_CONTENT_LENGTH), nullable=False)
 
     # TODO: Implement Date, Time, and TimeZone for Messages in the TimeDate Models
-    message_date = db.Column(db.DateTime, nullable=False, default = datetime.now(timezone.utc))
+    message_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # Position in the Match's Conversation - 1, 2, 3... Assigned from matches.last_seq on Insert (see Match.add_message),
+    # so a Client Holding seq n Asks for Exactly What Came After It. Gap-Free in Strict Mode - in Async Mode a seq is
+    # Taken When the Message is Sent, and One Never Inserted Leaves a Gap (see held_seq)
+    seq = db.Column(db.Integer, nullable=False)
 
 
     message_read = db.Column(db.Boolean, nullable=False, default=False) #Indicate if Message has been Read
     kind = db.Column(db.String(10), nullable=False, default="text") # Type of Message - Text, Image, Video, etc.
 
+    __table_args__ = (
+        # A Conversation Page - Newest Messages of One Match, Keyset-Paged on (message_date, id)
+        db.Index("ix_messages_match_id_message_date_id", match_id, message_date, id),
+        # A Delta Since seq n - and No Two Messages of a Match Share a seq
+        db.Index("ix_messages_match_id_seq", match_id, seq, unique=True),
+    )
+
 # Marshmallow Base Schema for the Message
 class MessageSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
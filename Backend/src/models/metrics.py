@@ -32,7 +32,7 @@ class ActivityMetric(db.Model):
     total_reports = db.Column(db.Integer, nullable=False)
     
     # ---Dimensional Fields---
-    activity_date = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    activity_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     
     
     
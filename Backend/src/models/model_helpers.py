@@ -1,8 +1,15 @@
 # Author: Joshua Ferguson
 
+import base64
+from datetime import datetime
+
+from sqlalchemy import case, or_, tuple_
+
 import Backend.src.models as models
 from Backend.src.extensions import db
 from Backend.src.models.message import MessageSchema
+from Backend.src.services.recent_messages_service import RecentMessages, serialize_message
+from Backend.src.services.unread_counter_service import UnreadCounter
 
 class UserModelHelper:
     
@@ -27,12 +34,63 @@ class UserModelHelper:
 
         return new_matches
     
+    def get_match_summaries(self, since=None):
+        """
+        Every Match of the User with the Partner's Name and the Latest Message, in One Query -
+        the Latest Message is Denormalized onto the Match (see Match.add_message), so messages Isn't Touched.
+
+        Parameters:
+            since (datetime, optional): Only matches created after this (e.g. last_online, for polling).
+
+        Returns:
+            list: Rows of (match_id, match_date, partner_id, partner_name, last_message_preview, last_message_kind,
+                  last_activity_at, last_seq), most recently active first. The message columns are None for a match with no messages.
+        """
+        Match, User = models.match.Match, models.user.User
+
+        partner_id = case((Match.matcher_id == self.user_id, Match.matchee_id), else_=Match.matcher_id)
+        query = (
+            db.session.query(
+                Match.id, Match.match_date, partner_id.label("partner_id"), User.name,
+                Match.last_message_preview, Match.last_message_kind, Match.last_activity_at, Match.last_seq,
+            )
+            .outerjoin(User, User.id == partner_id)
+            .filter(or_(Match.matcher_id == self.user_id, Match.matchee_id == self.user_id))
+        )
+        if since is not None:
+            query = query.filter(Match.created_at > since)
+
+        return query.order_by(Match.last_activity_at.desc()).all()
+
     def get_user_matches_ids(self):
         """
         Get the User Matches for the User
         """
         return [match.id for match in self.get_user_matches()]
 
+# Opaque Conversation Cursor - a Message's (message_date, id), URL-Safe
+def encode_message_cursor(message):
+    return base64.urlsafe_b64encode(f"{message.message_date.isoformat()}|{message.id}".encode()).decode()
+
+
+def decode_message_cursor(cursor):
+    """
+    Parameters:
+        cursor (str): A cursor from encode_message_cursor.
+
+    Returns:
+        tuple: (message_date, id)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        message_date, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(message_date), int(message_id)
+    except Exception:
+        raise ValueError("Invalid message cursor.")
+
+
 class MatchModelHelper:
     
     def __init__(self,match_id=None):
@@ -42,7 +100,7 @@ class MatchModelHelper:
         """
         Get the Last Message in the Match
         """
-        message = self.get_messages(limit=1)
+        message = self.get_messages_page(limit=1)
         if message and message.get("messages"):
             last_msg = message["messages"][0]
             return last_msg
@@ -80,10 +138,9 @@ class MatchModelHelper:
             .order_by(models.message.Message.message_date.desc())  # Order by newest first
         )
         
-        conversation = conversation_query.all()
-
         # Fetch all messages if `get_all_messages` is True
         if get_all_messages:
+            conversation = conversation_query.all()
             return {"messages": conversation, "total_messages": len(conversation)}
 
         # Paginate Results
@@ -97,27 +154,107 @@ class MatchModelHelper:
             "has_next": paginated_results.has_next,  # Whether there is a next page
             "has_prev": paginated_results.has_prev,  # Whether there is a previous page
         }
+
+    def get_messages_page(self, limit=20, before=None, after=None, include_total=False):
+        """
+        One Page of the Conversation, Keyset-Paged on (message_date, id) - an Index Range Scan on
+        ix_messages_match_id_message_date_id However Deep the Page, with No OFFSET, and No COUNT Unless Asked.
+
+        Parameters:
+        - limit: Number of messages in the page.
+        - before: Cursor - the page of messages just older than it (scrolling back). Default: the newest page.
+        - after: Cursor - the page of messages just newer than it (catching up).
+        - include_total: Also count the whole conversation.
+
+        Returns:
+        - Dictionary with the messages (newest first), `before`/`after` cursors for the adjacent pages,
+          `has_more` (more messages past this page, in the direction paged), and `total_messages` if asked.
+        """
+        Message = models.message.Message
+        position = tuple_(Message.message_date, Message.id)
+
+        conversation_query = Message.query.filter(Message.match_id == self.match_id)
+        if after is not None:
+            # Oldest First from the Cursor, so the Page Starts Right After It
+            conversation_query = conversation_query.filter(
+                position > tuple_(*decode_message_cursor(after))
+            ).order_by(Message.message_date.asc(), Message.id.asc())
+        else:
+            if before is not None:
+                conversation_query = conversation_query.filter(position < tuple_(*decode_message_cursor(before)))
+            conversation_query = conversation_query.order_by(Message.message_date.desc(), Message.id.desc())
+
+        # One Extra Row Tells Whether Another Page Follows
+        messages = conversation_query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if after is not None:
+            messages.reverse()
+
+        page = {
+            "messages": messages,
+            "before": encode_message_cursor(messages[-1]) if messages else None,
+            "after": encode_message_cursor(messages[0]) if messages else None,
+            "has_more": has_more,
+        }
+        if include_total:
+            page["total_messages"] = Message.query.filter(Message.match_id == self.match_id).count()
+        return page
+
+    def get_messages_since(self, seq=0, limit=100):
+        """
+        The Messages After a seq - Exactly What a Client Holding Everything Up to seq is Missing,
+        an Index Range Scan on ix_messages_match_id_seq.
+
+        Parameters:
+        - seq: The last seq the client holds (0 for the whole conversation).
+        - limit: Most messages returned.
+
+        Returns:
+        - Dictionary with the messages (oldest first), `seq` (the last one returned before a gap still
+          expected to fill, see held_seq - ask from it next), and `has_more` (more messages past this batch).
+        """
+        Message = models.message.Message
+
+        # One Extra Row Tells Whether Another Batch Follows
+        messages = (
+            Message.query.filter(Message.match_id == self.match_id, Message.seq > seq)
+            .order_by(Message.seq.asc())
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+
+        return {
+            "messages": messages,
+            "seq": models.message.held_seq(seq, [(message.seq, message.message_date) for message in messages]),
+            "has_more": has_more,
+        }
         
     def save_message_to_match_chat(self, user_id, message_content):
         """
         Save a message to the database.
+
+        Returns:
+        - The saved message, serialized for chat clients (see serialize_message), or None on failure.
         """
         try:
-            data_message = models.message.Message(
-                match_id=self.match_id,
-                messager_id=user_id,
-                message_content=message_content
-            )
-            # Extract the values from the data
-            message = MessageSchema().load(data_message)
-
-            # Add the new message to the session
-            db.session.add(message)
+            # Insert the Message and Update the Match's Last Message Together
+            message = models.match.Match.add_message(self.match_id, user_id, message_content)
+            # Read Before the Commit Expires Them
+            recipient_id = models.match.Match.query.get(self.match_id).partner_id(user_id)
+            buffered = serialize_message(message)
             # Commit the changes to the database
             db.session.commit()
 
-            return message
+            # Badge the Recipient's Unread Count, and Buffer the Message for Chat History
+            UnreadCounter().record_message(recipient_id, self.match_id)
+            RecentMessages().push(buffered)
+
+            return buffered
         except Exception as e:
+            db.session.rollback()
             print(f"Error saving message: {str(e)}")
             return None
 
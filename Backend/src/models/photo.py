@@ -28,12 +28,16 @@ class UserPhoto(db.Model):
     # Metadata Fields
     is_main_photo = db.Column(db.Boolean, nullable=False, default=False)
     upload_date = db.Column(
-        db.DateTime, nullable=False, default=datetime.now(timezone.utc)
+        db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
     # is_fake = db.Column(db.Boolean, nullable=True) # Is the Photo Fake or Not
 
-    # Unique Constraint on url and is_main_photo, and user_id
-    db.UniqueConstraint("url", "is_main_photo", "user_id")
+    __table_args__ = (
+        # Unique Constraint on url and is_main_photo, and user_id
+        db.UniqueConstraint(url, is_main_photo, user_id, name="uq_user_photos_url_main_owner"),
+        # A User's Main or Gallery Photos, Newest First
+        db.Index("ix_user_photos_owner_main_upload", user_id, is_main_photo, upload_date),
+    )
 
 
 # Marshmallow Base Schema for the Message
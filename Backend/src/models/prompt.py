@@ -19,14 +19,14 @@ class Prompt(db.Model):
     prompt_question = db.Column(db.String(256), nullable=False)
 
     # Metadata Fields
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(
         db.DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
     )
-    # Unique Constraint for user_id and prompt_question combination
-    db.UniqueConstraint("user_id", "prompt_question")
+    # Unique Constraint for user_id and prompt_question combination - Also Serves Lookups by user_id
+    __table_args__ = (db.UniqueConstraint(user_id, prompt_question, name="uq_prompts_user_question"),)
 
     # Relationships
     # user = relationship("User", back_populates="prompts")
@@ -53,9 +53,9 @@ class PromptAnswer(db.Model):
     prompt_id = db.Column(db.Integer, db.ForeignKey("prompts.id"), nullable=False)
     answer = db.Column(db.String(256), nullable=False)
     decoy = db.Column(db.String(256), nullable=False, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
-    db.UniqueConstraint("prompt_id", "answer")
+    __table_args__ = (db.UniqueConstraint(prompt_id, answer, name="uq_prompt_answers_prompt_answer"),)
 
     # Relationships
     prompt = relationship("Prompt", back_populates="answers")
@@ -37,7 +37,7 @@ class Report(db.Model):
     report_reason = db.Column(db.String(REPORT_CONTENT_LENGTH), primary_key=True, nullable=False)
     report_message = db.Column(db.Integer, db.ForeignKey('messages.id'),nullable=True) # Optional
     
-    report_date = db.Column(db.DateTime, nullable=False,default=datetime.now(timezone.utc))
+    report_date = db.Column(db.DateTime, nullable=False,default=lambda: datetime.now(timezone.utc))
     
     # Report Status - Enum of Pending, Resolved, Rejected
     status = db.Column(db.String, nullable=False, default="PENDING") # Report Status
@@ -1,12 +1,19 @@
 # Author: Joshua Ferguson
 
+from collections import namedtuple
 from datetime import datetime, timezone
 from marshmallow_sqlalchemy import fields
 from sqlalchemy.orm import relationship, deferred
-from sqlalchemy import  CheckConstraint
+from sqlalchemy import  CheckConstraint, and_, case, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from  Backend.src.extensions import db, ma # DB and Marshmallow Instances
 from  Backend.src.models.user import User, UserSchema # User Model
+from Backend.src.services.swipe_exclusion_service import SwipeExclusionFilter
+from Backend.src.services.swipe_log_service import SwipeLog
+
+SWIPE_BATCH_MAX = 100 # Most Swipes Accepted in One Batch
+SWIPE_CLIENT_RESULTS = ("PENDING", "REJECTED") # What a Client Can Send - ACCEPTED is Only Ever Derived
 
 # Swipe Model for Swipes Table
 # TODO: Implement CASCADE on User Deletion
@@ -21,10 +28,14 @@ class Swipe(db.Model):
     swipe_result = db.Column(db.String, nullable=False, default='PENDING')
     
     # ---Dimensional Fields---
-    swipe_date = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    swipe_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     
     __table_args__ = (
         CheckConstraint(swipe_result.in_(['PENDING', 'ACCEPTED', 'REJECTED']), name='swipe_result_check'),
+        # One Row per Pair of Users, Whichever Direction Swiped First (see swipe_upsert)
+        db.Index("uq_swipes_pair", func.least(swiper_id, swipee_id), func.greatest(swiper_id, swipee_id), unique=True),
+        # Swipes Received - "Who Liked / Rejected Me" (Pool Exclusions, liked_by Rebuilds); the PK Covers Swipes Sent
+        db.Index("ix_swipes_swipee_id_result", swipee_id, swipe_result),
     )
     # ------Relationships------
     
@@ -74,32 +85,244 @@ class SwipeSchemaNested(SwipeSchema):
     swipee = ma.Nested(UserSchema)
  
  
+class SwipeOutcome(namedtuple("SwipeOutcome", ["swiper_id", "swipee_id", "swipe_result", "match_id", "new_match"])):
+    """
+    The Pair's Swipe After Processing - swiper_id/swipee_id are Whichever Direction Swiped First -
+    and its Match, if the Pair is ACCEPTED (new_match is False if the Match Already Existed).
+    """
+
+
+def swipe_upsert(rows):
+    """
+    INSERT ... ON CONFLICT on the Pair's Unique Index, Resolving Each Swipe Against the Pair's Existing Row:
+    - No Row: the Swipe is Inserted as Sent
+    - A Left Swipe (REJECTED): the Pair is REJECTED
+    - A Right Swipe (PENDING) on the Other User's PENDING Swipe: the Pair is ACCEPTED
+    - Otherwise the Pair is Unchanged (e.g. Re-Swiping Right on Your Own PENDING Swipe)
+
+    The Conflicting Row is Locked for the Update, so Simultaneous Mutual Swipes Serialize on it
+    and the Second One Always Sees the First.
+
+    Parameters:
+        rows (list): [{"swiper_id", "swipee_id", "swipe_result", "swipe_date"}, ...], at most one per pair.
+
+    Returns:
+        Insert: The statement, RETURNING each pair's swiper_id, swipee_id, and resulting swipe_result.
+    """
+    statement = pg_insert(Swipe).values(rows)
+    incoming = statement.excluded
+    resolved_result = case(
+        (incoming.swipe_result == "REJECTED", "REJECTED"),
+        (
+            and_(
+                Swipe.swipe_result == "PENDING",
+                incoming.swipe_result == "PENDING",
+                Swipe.swiper_id != incoming.swiper_id,
+            ),
+            "ACCEPTED",
+        ),
+        else_=Swipe.swipe_result,
+    )
+
+    return statement.on_conflict_do_update(
+        index_elements=[func.least(Swipe.swiper_id, Swipe.swipee_id), func.greatest(Swipe.swiper_id, Swipe.swipee_id)],
+        set_={
+            "swipe_result": resolved_result,
+            "swipe_date": case((resolved_result != Swipe.swipe_result, incoming.swipe_date), else_=Swipe.swipe_date),
+        },
+    ).returning(Swipe.swiper_id, Swipe.swipee_id, Swipe.swipe_result)
+
+
+def write_swipes(swiper_id, swipe_results, now, mutual_ids=()):
+    """
+    Upsert Swipes by One User and Insert Matches for the Pairs Left ACCEPTED. Does Not Commit.
+
+    Parameters:
+        swiper_id (str): The user who swiped.
+        swipe_results (dict): swipee_id -> PENDING or REJECTED, at most one per pair.
+        now (datetime): Swipe and match date.
+        mutual_ids (iterable, optional): Swipees the swipe log found had already swiped right on swiper_id.
+            Their right swipe may not be flushed yet, so it's upserted first for this swipe to resolve against.
+
+    Returns:
+        tuple: (swipee_id -> the pair's upserted row (swiper_id, swipee_id, swipe_result),
+                swipee_id -> (match_id, created) for ACCEPTED pairs)
+    """
+    from Backend.src.models.match import Match
+
+    mutual_ids = [swipee_id for swipee_id in mutual_ids if swipee_id in swipe_results]
+    if mutual_ids:
+        db.session.execute(swipe_upsert([
+            {"swiper_id": swipee_id, "swipee_id": swiper_id, "swipe_result": "PENDING", "swipe_date": now}
+            for swipee_id in mutual_ids
+        ]))
+
+    upserted = db.session.execute(swipe_upsert([
+        {"swiper_id": swiper_id, "swipee_id": swipee_id, "swipe_result": swipe_result, "swipe_date": now}
+        for swipee_id, swipe_result in swipe_results.items()
+    ]))
+    rows = {row.swipee_id if row.swiper_id == swiper_id else row.swiper_id: row for row in upserted}
+
+    matches = {}
+    accepted_ids = [swipee_id for swipee_id, row in rows.items() if row.swipe_result == "ACCEPTED"]
+    if accepted_ids:
+        matches = Match.insert_pairs(swiper_id, accepted_ids, match_date=now)
+    return rows, matches
+
+
 class SwipeProcessor():
-    
+
+    @staticmethod
     def process_new_swipe(swiper_id, swipee_id, new_swipe_result):
-        
-        # Check if Swipe Exists for the two Users
-        # Meaning, There is a record Where Swipee equals Current Swiper, and Vice Versa
-        swiper_swipe = Swipe.query.filter_by(swiper_id=swipee_id, swipee_id=swiper_id).first()
-        swipee_swipe = Swipe.query.filter_by(swiper_id=swiper_id, swipee_id=swipee_id).first()
-
-        # Swipe Exits - Good to Compare and Check for New Match
-        swipe_record = swiper_swipe if swiper_swipe else swipee_swipe
-
-        # If swipe does not exist, create a new swipe instance
-        if swipe_record is None:
-            new_swipe = Swipe(swiper_id=swiper_id, swipee_id=swipee_id, swipe_result=new_swipe_result)
-            db.session.add(new_swipe)
-            db.session.commit()
-            print(f"New swipe created - Swiper: {new_swipe.swiper_id}, Swipee: {new_swipe.swipee_id}, Result: {new_swipe.swipe_result}")
-            return new_swipe
-
-        # If Given Swipe_Result is Rejected, set Stored Swipe Record as Rejected, Pass
-        elif new_swipe_result == "REJECTED":
-            swipe_record.swipe_result = "REJECTED"
-
-        # If Both Stored Swipe and New is PENDING, Turn to Accepted, Indicating Successful Match
-        elif swipe_record.swipe_result == "PENDING" and new_swipe_result == "PENDING":
-            swipe_record.swipe_result = "ACCEPTED"
-
-        return swipe_record
\ No newline at end of file
+        """
+        Record a Swipe and Resolve the Pair Atomically - One Upsert on the Pair's Unique Index (see swipe_upsert)
+        and, When it Leaves the Pair ACCEPTED, an Idempotent Match Insert, in One Transaction.
+
+        With the Write-Behind Swipe Log Enabled (see swipe_log_service.py) the Pair is Resolved in Redis and
+        the Swipe is Left to the Flusher - Only a Swipe that Makes a Match is Written Here.
+
+        Parameters:
+            swiper_id (str): The user who swiped.
+            swipee_id (str): The user swiped on.
+            new_swipe_result (str): PENDING (Right) or REJECTED (Left). ACCEPTED is Taken as a Right Swipe.
+
+        Returns:
+            SwipeOutcome: The pair's resulting swipe and match.
+
+        Raises:
+            ValueError: On a self-swipe or an unknown swipe result.
+            LookupError: If the swipee doesn't exist or is deleted.
+        """
+        # A Right Swipe Stays PENDING Until the Other User Swipes Right Too
+        if new_swipe_result == "ACCEPTED":
+            new_swipe_result = "PENDING"
+        if new_swipe_result not in SWIPE_CLIENT_RESULTS:
+            raise ValueError(f"Invalid swipe result: {new_swipe_result}")
+        if swiper_id == swipee_id:
+            raise ValueError("Users cannot swipe on themselves.")
+
+        # Checked Up Front, as in process_swipe_batch - a Logged Swipe Would Otherwise Report SUCCESS, Land in
+        # liked_by, and Only Fail on the Foreign Key in the Flusher
+        if not db.session.query(User.id).filter(User.id == swipee_id, User.deleted.isnot(True)).first():
+            raise LookupError(f"User {swipee_id} not found.")
+
+        swipe_log = SwipeLog()
+        logged_result = swipe_log.append(swiper_id, swipee_id, new_swipe_result) if swipe_log.is_enabled() else None
+
+        if logged_result is not None and logged_result != "ACCEPTED":
+            # Logged - the Flusher Writes it, and No Match can Come of it
+            outcome = SwipeOutcome(swiper_id, swipee_id, logged_result, None, False)
+        else:
+            try:
+                rows, matches = write_swipes(
+                    swiper_id, {swipee_id: new_swipe_result}, datetime.now(timezone.utc),
+                    mutual_ids=[swipee_id] if logged_result == "ACCEPTED" else (),
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            swipe = rows[swipee_id]
+            match_id, new_match = matches.get(swipee_id, (None, False))
+            outcome = SwipeOutcome(swipe.swiper_id, swipe.swipee_id, swipe.swipe_result, match_id, new_match)
+
+            # Keep the liked_by Sets in Step with What was Written
+            swipe_log.detector.record_swipes(swiper_id, {swipee_id: swipe.swipe_result})
+
+        print(f"Swipe Processed - Swiper: {swiper_id}, Swipee: {swipee_id}, Pair Result: {outcome.swipe_result}")
+
+        # Keep the Per-User Exclusion Sets Used by Swipe Pool Generation in Step
+        SwipeExclusionFilter().record_swipe(swiper_id, swipee_id, outcome.swipe_result)
+        return outcome
+
+    @staticmethod
+    def process_swipe_batch(swiper_id, swipes):
+        """
+        Resolve a Batch of Swipes by One User in One Transaction: One Bulk Upsert of Every Swipe
+        (Resolved as in process_new_swipe, see swipe_upsert) and One Idempotent Insert of Any New Matches.
+        With the Write-Behind Swipe Log Enabled, Only the Swipes that Make Matches are Written Here.
+
+        Parameters:
+            swiper_id (str): The user who swiped.
+            swipes (list): [{"swipee_id": str, "swipe_result": "PENDING" | "REJECTED"}, ...], in swipe order.
+                If a card appears twice, the last swipe wins.
+
+        Returns:
+            list: One result per swipe, in order - {"swipee_id", "status", "swipe_result", "match_id"},
+                  where status is "SUCCESS", "NEW" (a new match), or "INVALID".
+        """
+        def requested_swipe(swipe):
+            """(swipee_id, swipe_result) of a Well-Formed Entry, Else (None, None) - Ids are Only Ever Strings"""
+            if not isinstance(swipe, dict):
+                return None, None
+            swipee_id, swipe_result = swipe.get("swipee_id"), swipe.get("swipe_result")
+            if not isinstance(swipee_id, str) or not isinstance(swipe_result, str):
+                return None, None
+            return swipee_id, swipe_result
+
+        # Last Swipe on a Card Wins
+        requested = {}
+        for swipe in swipes:
+            swipee_id, swipe_result = requested_swipe(swipe)
+            if swipee_id and swipee_id != swiper_id and swipe_result in SWIPE_CLIENT_RESULTS:
+                requested[swipee_id] = swipe_result
+
+        # Unknown or Deleted Users Fail Individually Instead of Failing the Batch on the Foreign Key
+        known_ids = {
+            user_id for (user_id,) in db.session.query(User.id).filter(
+                User.id.in_(list(requested)), User.deleted.isnot(True)
+            )
+        } if requested else set()
+        requested = {swipee_id: result for swipee_id, result in requested.items() if swipee_id in known_ids}
+
+        resolved = {} # swipee_id -> Resulting swipe_result of the Pair
+        matches = {} # swipee_id -> (Match ID, Created by this Batch), for ACCEPTED Pairs
+        if requested:
+            swipe_log = SwipeLog()
+            logged = swipe_log.append_many(swiper_id, requested) if swipe_log.is_enabled() else None
+
+            to_write, mutual_ids = requested, ()
+            if logged is not None:
+                # Logged Swipes are Left to the Flusher - Only Mutual Likes Need Writing Now
+                resolved = {swipee_id: result for swipee_id, result in logged.items() if result != "ACCEPTED"}
+                mutual_ids = [swipee_id for swipee_id, result in logged.items() if result == "ACCEPTED"]
+                to_write = {swipee_id: requested[swipee_id] for swipee_id in mutual_ids}
+
+            if to_write:
+                now = datetime.now(timezone.utc)
+                try:
+                    rows, matches = write_swipes(swiper_id, to_write, now, mutual_ids=mutual_ids)
+                    resolved.update({swipee_id: row.swipe_result for swipee_id, row in rows.items()})
+
+                    if matches:
+                        # Set Online Status to Now, as a Single Matching Swipe Does
+                        User.query.filter_by(id=swiper_id).update({"last_online": now}, synchronize_session=False)
+
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+
+                # Keep the liked_by Sets in Step with What was Written
+                swipe_log.detector.record_swipes(swiper_id, {swipee_id: row.swipe_result for swipee_id, row in rows.items()})
+
+            # Keep the Per-User Exclusion Sets Used by Swipe Pool Generation in Step
+            SwipeExclusionFilter().record_swipes(swiper_id, resolved)
+
+        results = []
+        for swipe in swipes:
+            swipee_id, _ = requested_swipe(swipe)
+            if swipee_id not in resolved:
+                sent_id = swipe.get("swipee_id") if isinstance(swipe, dict) else None
+                results.append({"swipee_id": sent_id, "status": "INVALID", "swipe_result": None, "match_id": None})
+                continue
+
+            match_id, new_match = matches.get(swipee_id, (None, False))
+            results.append({
+                "swipee_id": swipee_id,
+                "status": "NEW" if new_match else "SUCCESS",
+                "swipe_result": resolved[swipee_id],
+                "match_id": str(match_id) if match_id is not None else None,
+            })
+        return results
@@ -15,6 +15,7 @@ from better_profanity import profanity # Profanity Filter
 from  Backend.src.extensions import db, ma, bcrypt
 
 from Backend.src.models.photo import UserPhoto # User Photo Model # Keep This Before User Model and Helper
+from Backend.src.services.user_activity_service import touch_user_activity
 
 # Last Import - Avoid Circular Imports
 from Backend.src.models.model_helpers import UserModelHelper 
@@ -34,9 +35,10 @@ class User(db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False)
     
     auth_provider = db.Column(db.String(36), nullable=False)  # "apple" or "email"
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
-    last_online = db.Column(db.DateTime, default=datetime.now(timezone.utc)) # Last Online Timestamp
+    # Callable Defaults - Evaluated per Row, Not Once at Import
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), index=True) # Watermark for the User Snapshot
+    last_online = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc)) # Last Online Timestamp
     deleted = db.Column(db.Boolean, default=False) # Soft Delete Flag
     
 
@@ -58,6 +60,8 @@ class User(db.Model):
     state = db.Column(db.String(10), nullable=True)
     city = db.Column(db.String(100), nullable=True)
     country_code = db.Column(db.String(10), nullable=True)
+    latitude = db.Column(db.Float, nullable=True) # Coordinates for Distance Matching (See geo_index_service.py)
+    longitude = db.Column(db.Float, nullable=True)
     
     # Flag to Indicate Fake User, Default is False - Internal Use
     is_fake = db.Column(db.Boolean, nullable=True, default=False)
@@ -114,6 +118,7 @@ class User(db.Model):
         """Set the user as online."""
         self.last_online = datetime.now(timezone.utc)
         db.session.commit()
+        touch_user_activity(self.id, self.last_online)
         return self
     
     @staticmethod
@@ -130,6 +135,7 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
         model = User
         load_instance = True
         include_relationships = True
+        exclude = ("latitude", "longitude") # Never Expose Exact Coordinates on Cards
 
     # Validate the Age Field - Must be Greater than 18
     @validates("age")
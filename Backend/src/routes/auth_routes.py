@@ -9,6 +9,7 @@ from sqlalchemy.exc import SQLAlchemyError
 import Backend.src.models as models  # Import the Models and Schemas
 from Backend.src.extensions import db  # Import the DB Instance
 from Backend.src.models.userFCMToken import UserFcmToken
+from Backend.src.services.user_activity_service import touch_user_activity
 from Backend.src.services.auth_service import (
     AppleAuthService,
     EmailAuthService,
@@ -187,6 +188,7 @@ def handle_apple_signup(identity_token):
         # User already exists and is linked to Apple sub
         existing_user.last_online = datetime.now(timezone.utc)
         db.session.commit()
+        touch_user_activity(existing_user.id, existing_user.last_online)
         return jsonify({"message": "User already exists"}), 200
 
     try:
@@ -223,6 +225,7 @@ def handle_email_login(email, password):
 
     user.last_online = datetime.now(timezone.utc)
     db.session.commit()
+    touch_user_activity(user.id, user.last_online)
     token = create_access_token(identity=str(user_id))
     return jsonify({"message": "Login successful", "token": token}), 200
 
@@ -244,6 +247,7 @@ def handle_apple_login(identity_token):
         return jsonify({"error": "User not found, please sign up first"}), 404
     user.last_online = datetime.now(timezone.utc)
     db.session.commit()
+    touch_user_activity(user.id, user.last_online)
     # token = gen_access_token(str(user.id))
     return jsonify({"message": "Login successful"}), 200
 
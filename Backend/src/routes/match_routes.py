@@ -9,6 +9,7 @@ import logging
 from Backend.src.extensions import db # Import the DB Instance
 import Backend.src.models as models
 from Backend.src.models.model_helpers import UserModelHelper, MatchModelHelper
+from Backend.src.services.unread_counter_service import UnreadCounter
 
 
 # Blueprint for the Match Routes
@@ -17,44 +18,39 @@ match_bp = Blueprint('match_bp', __name__)
 match_schema = models.match.MatchSchema()
 
 #-----Match Routes-----
-def match_response_helper(matches,current_user_id):
+def match_response_helper(current_user_id, since=None, summaries=None):
     """
-    Helper function to create a response for a match.
+    Helper function to create a response for a user's matches - One Query However Many Matches
+    (see UserModelHelper.get_match_summaries), and One HGETALL for the Unread Badges.
+
+    Parameters:
+        current_user_id (str): The user whose matches to list.
+        since (datetime, optional): Only matches created after this.
+        summaries (list, optional): Rows already read with get_match_summaries - Shaped Without Querying Again.
     """
-    helper = MatchModelHelper()
     matches_response = []
-    for user_match in matches:
-        
-        helper = MatchModelHelper(user_match.id)
+    unread_counts = UnreadCounter().counts(current_user_id)
+    if summaries is None:
+        summaries = UserModelHelper(current_user_id).get_match_summaries(since=since)
+    for match_id, match_date, matched_user_id, matched_user_name, message_content, message_kind, last_activity_at, last_seq in summaries:
         # Get the Last Message in the Match
-        last_message = helper.get_last_message()
-        
-        if last_message:
-            if last_message.kind == "game":
-                last_message = "Active Game - Play Now! 🎮"
-            else:
-                last_message = last_message.message_content
-        else:
+        if message_content is None:
             last_message = "No Messages - Be the First! 🐔"
-        
-        # Get the Matched User Id
-        if user_match.matcher_id == current_user_id:
-            matched_user_id = user_match.matchee_id
+        elif message_kind == "game":
+            last_message = "Active Game - Play Now! 🎮"
         else:
-            matched_user_id = user_match.matcher_id
-        
-        # Get the Matched User Object
-        matched_user = models.user.User.query.get(matched_user_id)
+            last_message = message_content
 
-        
         # Serialize the Match Data and Add to the Response
         match_data = {
-            "match_id": str(user_match.id),
+            "match_id": str(match_id),
             "matched_user_id": matched_user_id,
-            "matched_user_name": matched_user.name,
-            "match_date": user_match.match_date.isoformat(),
+            "matched_user_name": matched_user_name,
+            "match_date": match_date.isoformat(),
             "last_message": last_message,
-            #"unread_count": 0
+            "last_activity_at": last_activity_at.isoformat(),
+            "unread_count": unread_counts.get(match_id, 0),
+            "last_seq": last_seq,
         }
         
         matches_response.append(match_data)
@@ -74,6 +70,9 @@ def get_matches():
         - matched_user_id: str
         - matched_user_name: str
         - last_message: str 
+        - last_activity_at: str - Time of the last message, else of the match; the list is ordered by it
+        - unread_count: int - Messages received in the match and not yet marked read
+        - last_seq: int - seq of the latest message (see /users/messages/since)
     """
     # Get current user and validate
     user_id = get_jwt_identity()
@@ -82,16 +81,12 @@ def get_matches():
         return jsonify({"error": "User not found."}), 404
     
     try:
-        # Get the Last Message in the Match
-        matches = UserModelHelper(user_id).get_user_matches()
+        # Matches with their Partner and Last Message, in One Query
+        matches_response = match_response_helper(user_id)
             
-        if not matches:
+        if not matches_response:
             return jsonify({"error": "No matches found."}), 404
         
-        # Create the response
-        matches_response = match_response_helper(matches,user_id)
-        # Return the response
-        
         # Return the response
         return jsonify(matches_response), 200
         
@@ -10,8 +10,10 @@ import logging
 
 from Backend.src.extensions import db, redis_client # Import the DB Instance
 import Backend.src.models as models # Import the Models and Schemas
+from Backend.src.services.admin_services import admin_protected
 from Backend.src.services.auth_service import validate_user_exists
 from Backend.src.services.swipe_pool_service import SwipePoolService
+from Backend.src.services.swipe_pool_worker import get_refill_metrics
 
 
 matchmaking_bp = Blueprint('matchmaking_bp', __name__)
@@ -21,7 +23,15 @@ matchmaking_bp = Blueprint('matchmaking_bp', __name__)
 @jwt_required()
 def get_swipe_pool():
     """
-    Get potential matches for the current user.
+    Get a page of potential matches for the current user.
+
+    Query Parameters:
+        - limit: int, optional (default 20)
+        - cursor: str, optional - the X-Next-Cursor header of the previous page.
+          Without one, the page continues after the last card served.
+
+    Response Headers:
+        - X-Next-Cursor: Opaque cursor for the next page
     
     Returns:
         JSON with list: A list of potential matches for the user, including:
@@ -32,6 +42,8 @@ def get_swipe_pool():
         - state: str
         - city: str
         - bio: str
+        - main_photo: str or null - URL of the main photo
+        - user_photos: list of str - URLs of the latest few gallery photos
     """
     # Get current user and validate
     user_id = get_jwt_identity()
@@ -45,12 +57,17 @@ def get_swipe_pool():
         return jsonify({"error": "Please set your dating preferences first."}), 400
     
     req_limit = request.args.get("limit", default=20,type=int)
+    req_cursor = request.args.get("cursor", default=None, type=str)
     pool_service = SwipePoolService()
 
     try:
         
-        # Generate swipe pool for the specific user
-        users_swipe_pool = pool_service.generate_swipe_pool(user_id, req_limit)
+        # Serve the swipe pool Cache-First, Generating Only on a Cold Miss
+        try:
+            swipe_pool_result = pool_service.get_swipe_pool(user_id, req_limit, cursor=req_cursor)
+        except ValueError as e:
+            return jsonify({"error": "Invalid cursor.", "details": str(e)}), 400
+        users_swipe_pool = swipe_pool_result["swipe_pool"]
         
         # Format profiles for response
         profiles = []
@@ -69,9 +86,10 @@ def get_swipe_pool():
         if len(profiles) == 0:
             return jsonify({"error": "No profiles found."}), 404
         
-        print(f"Swipe Pool for User: {user_id}")
-        print(json.dumps(profiles,indent=4))
-        return jsonify(profiles), 200
+        print(f"Swipe Pool for User: {user_id} - {len(profiles)} Profiles ({swipe_pool_result['source']})")
+        response = jsonify(profiles)
+        response.headers["X-Next-Cursor"] = swipe_pool_result["next_cursor"]
+        return response, 200
              
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -80,4 +98,22 @@ def get_swipe_pool():
         return jsonify({"error": "Validation error", "details": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
-    
\ No newline at end of file
+
+
+@matchmaking_bp.route('/users/swipe_pool/metrics', methods=['GET'])
+@admin_protected
+def get_swipe_pool_metrics():
+    """
+    Get Swipe Pool Refill Worker Metrics (Admin Only).
+    
+    Returns:
+        JSON with:
+        - queue_depth: int
+        - refills_total, refill_errors_total, cards_cached_total: float
+        - refill_latency_ms_last, refill_latency_ms_avg: float
+        - rows_scanned_last, rows_scanned_avg: float
+    """
+    try:
+        return jsonify(get_refill_metrics()), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to load swipe pool metrics", "details": str(e)}), 500
@@ -16,6 +16,8 @@ import Backend.src.models as models# Import the Models and Schemas
 from Backend.src.models import message
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from Backend.src.services.messaging_service import send_fcm_notification
+from Backend.src.services.recent_messages_service import RecentMessages, serialize_message
+from Backend.src.services.unread_counter_service import UnreadCounter
 
 
 #from Backend.src.sockets import get_private_chat_room
@@ -50,21 +52,25 @@ def save_message(message_dict):
         timeDate = datetime.now(timezone.utc)
         print(f"----Time Date----: {timeDate}")
         
-        message = models.message.Message(
-            messager_id=message_dict["messager_id"],
+        # Insert the Message and Update the Match's Last Message Together
+        message = models.match.Match.add_message(
             match_id=message_dict["match_id"],
+            messager_id=message_dict["messager_id"],
             message_content=message_dict["message_content"],
             kind=message_dict.get("kind"),  # Default to 'text' if not provided
-            message_date = timeDate  # Set to None for now, will be set later
+            message_date=timeDate,
         )
-        # Set the message date to the current time
-        
-        # Add the new message to the session
-        db.session.add(message)
+        # Read Before the Commit Expires Them
+        recipient_id, buffered = match.partner_id(user.id), serialize_message(message)
         # Commit the changes to the database
         db.session.commit()
+
+        # Badge the Recipient's Unread Count, and Buffer the Message for Chat History
+        UnreadCounter().record_message(recipient_id, buffered["match_id"])
+        RecentMessages().push(buffered)
     
     except SQLAlchemyError as e:
+        db.session.rollback()
         raise SQLAlchemyError(f"Database error occurred: {str(e)}")
     except ValidationError as e:
         raise ValidationError(f"Validation error occurred: {str(e)}")
@@ -163,14 +169,18 @@ def get_conversation():
 
         ---Optional---
         limit (int): The number of messages to return per page.
-        page (int): The page number for pagination.
+        before (str): Cursor from a previous page's pagination.before - the next page of older messages.
+        after (str): Cursor from a previous page's pagination.after - messages newer than that page.
+        include_total (bool): If True, also returns total_messages (costs a COUNT).
+        page (int): Legacy page number for OFFSET pagination - prefer before/after.
         all_messages (bool): If True, returns all messages between users.
 
     Request Headers:
         Authorization: JWT Token for the requesting user (Needs to Be Apart of the Match)
 
     Returns:
-        JSON response with message details and pagination metadata.
+        JSON response with message details and pagination metadata. Without a page, pagination is
+        {before, after, has_more} - Pass before/after Back Unchanged to Page.
     """
 
     # Validate Required Parameters
@@ -179,10 +189,16 @@ def get_conversation():
 
     # Extract Parameters, with Defaults
     match_id = request.args.get("match_id", type=int)
-    page = request.args.get("page", type=int, default=1)
+    page = request.args.get("page", type=int)
     limit = request.args.get("limit", type=int, default=20)
+    before = request.args.get("before")
+    after = request.args.get("after")
+    include_total = request.args.get("include_total", type=lambda x: x.lower() == "true", default=False)
     get_all = request.args.get("all_messages", type=lambda x: x.lower() == "true", default=False)
     print(f"Get All Messages: {get_all}")
+
+    if before and after:
+        return jsonify({"error": "Pass either 'before' or 'after', not both."}), 400
     
     
     # Get Match from Database
@@ -199,15 +215,20 @@ def get_conversation():
     if not user or not user_in_match:
         return jsonify({"error": "User not found in Match."}), 404
     
-    # Get Messages
-    conversation_data = MatchModelHelper(match_id=match_id).get_messages(limit, page, get_all)
+    # Get Messages - Keyset Pages Unless All Messages or a Legacy Page Number is Asked For
+    keyset = not get_all and page is None
+    try:
+        if keyset:
+            conversation_data = MatchModelHelper(match_id=match_id).get_messages_page(limit, before, after, include_total)
+        else:
+            conversation_data = MatchModelHelper(match_id=match_id).get_messages(limit, page or 1, get_all)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     # Extract only relevant messages
     messages_list = conversation_data["messages"]
-    print(f"Messages List: {messages_list}")
-    print(f"Type of Messages List: {type(messages_list)}")
-    # Check if Messages Exist
-    if not messages_list:
+    # Check if Messages Exist - Paging Past the End is an Empty Page, Not an Error
+    if not messages_list and not (before or after):
         return jsonify({"error": "No messages found in conversation."}), 404
     
     
@@ -220,7 +241,8 @@ def get_conversation():
         msgs_shaped.append({
             "kind":            m.kind,                   # always text for now
             "content":         m.message_content,        # rename field
-            "sentFromClient":  (m.messager_id == user_id)  # Bool
+            "sentFromClient":  (m.messager_id == user_id),  # Bool
+            "seq":             m.seq                     # Position in the Conversation - Resume /since From It
         })
             
     # Construct the Response, Base Message Return
@@ -232,7 +254,15 @@ def get_conversation():
     
 
     # Add Pagination Metadata if not getting all messages
-    if not get_all:
+    if keyset:
+        message_return["pagination"] = {
+            "before": conversation_data["before"],
+            "after": conversation_data["after"],
+            "has_more": conversation_data["has_more"],
+        }
+        if include_total:
+            message_return["total_messages"] = conversation_data["total_messages"]
+    elif not get_all:
         message_return["pagination"] = {
             "total_pages": conversation_data["total_pages"],
             "current_page": conversation_data["current_page"],
@@ -244,3 +274,105 @@ def get_conversation():
     return jsonify({
         **message_return
     }), 200
+
+
+@message_bp.route('/users/messages/since', methods=['GET'])
+@jwt_required()
+def get_messages_since():
+    """
+    Summary: Get the messages of a match after a seq, oldest first - the exact delta for a reconnecting client.
+
+    URL Params:
+        ---Required---
+        match_id (int): The ID of the match.
+        seq (int): The last seq the client holds (0 for the whole conversation).
+
+        ---Optional---
+        limit (int): Most messages returned (default 100, at most 500).
+
+    Request Headers:
+        Authorization: JWT Token for the requesting user (Needs to Be Apart of the Match)
+
+    Returns:
+        JSON response with the messages, `seq` (the last one returned - pass it back as seq while
+        has_more), and `has_more`.
+    """
+    match_id = request.args.get("match_id", type=int)
+    seq = request.args.get("seq", type=int)
+    limit = request.args.get("limit", type=int, default=100)
+    if match_id is None or seq is None:
+        return jsonify({"error": "Required parameters 'match_id' and 'seq' must be integers."}), 400
+    if seq < 0 or not 0 < limit <= 500:
+        return jsonify({"error": "seq must be at least 0, and limit between 1 and 500."}), 400
+
+    # Make sure the Requesting user is part of the match
+    user_id = get_jwt_identity()
+    match = models.match.Match.query.get(match_id)
+    if not match or user_id not in (match.matcher_id, match.matchee_id):
+        return jsonify({"error": "Match not found for user."}), 404
+
+    try:
+        delta = MatchModelHelper(match_id=match_id).get_messages_since(seq, limit)
+    except SQLAlchemyError as e:
+        return jsonify({"error": "Database error occurred.", "details": str(e)}), 500
+
+    return jsonify({
+        "match_id": str(match_id),
+        "messages": [{
+            "kind":            m.kind,
+            "content":         m.message_content,
+            "sentFromClient":  (m.messager_id == user_id),
+            "seq":             m.seq,
+        } for m in delta["messages"]],
+        "seq": delta["seq"],
+        "has_more": delta["has_more"],
+    }), 200
+
+
+@message_bp.route('/users/messages/read', methods=['POST'])
+@jwt_required()
+def mark_messages_read():
+    """
+    Summary: Mark every message received in a match as read, and reset its unread count.
+
+    Parameters:
+        JSON PAYLOAD object with the following fields:
+            - match_id str, required
+
+    Request Headers:
+        Authorization: JWT Token for the requesting user (Needs to Be Apart of the Match)
+
+    Returns:
+        JSON response with the number of messages marked read.
+    """
+    data = request.get_json() or {}
+    if data.get("match_id") is None:
+        return jsonify({"error": "Required field 'match_id' not found in request."}), 400
+
+    try:
+        match_id = int(data.get("match_id"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid match_id."}), 400
+
+    # Make sure the Requesting user is part of the match
+    user_id = get_jwt_identity()
+    match = models.match.Match.query.get(match_id)
+    if not match or user_id not in (match.matcher_id, match.matchee_id):
+        return jsonify({"error": "Match not found for user."}), 404
+
+    try:
+        # One Bulk UPDATE for Everything the Partner Sent that Wasn't Read Yet
+        marked_read = models.message.Message.query.filter(
+            models.message.Message.match_id == match_id,
+            models.message.Message.messager_id != user_id,
+            models.message.Message.message_read.is_(False),
+        ).update({"message_read": True}, synchronize_session=False)
+        db.session.commit()
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": "Database error occurred.", "details": str(e)}), 500
+
+    UnreadCounter().clear(user_id, match_id)
+
+    return jsonify({"status": "SUCCESS", "marked_read": marked_read}), 200
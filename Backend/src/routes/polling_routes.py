@@ -10,6 +10,8 @@ from flask_jwt_extended import get_jwt_identity, jwt_required
 from  Backend.src.extensions import db # Import the DB Instance
 import  Backend.src.models as models # Import the Models and Schemas
 from Backend.src.routes.match_routes import match_response_helper
+from Backend.src.services.sync_service import sync_user, touch_last_online
+from Backend.src.services.user_activity_service import touch_user_activity
 
 # Blueprint for the Match Routes
 polling_bp = Blueprint('polling_bp', __name__)
@@ -21,6 +23,65 @@ def poll_messages_helper():
     pass
 
 
+@polling_bp.route('/sync', methods=['GET'])
+@jwt_required()
+def sync():
+    """
+    Summary: Everything new for the user since their last sync - new matches, new messages grouped by match,
+    and partner profile changes - in one round trip, read from one snapshot. Replaces /poll/matches and /poll/messages.
+
+    URL Params:
+        ---Optional---
+        cursor (str): The cursor from the last sync - omit it to sync from scratch.
+
+    Request Headers:
+        Authorization: JWT Token for the requesting user
+
+    Returns:
+        JSON with:
+        - cursor: str - Pass it to the next sync
+        - has_more: bool - More messages are waiting - sync again right away with the new cursor
+        - matches: list - New matches and matches with new messages, shaped as in /users/matches
+        - removed_match_ids: list - Matches the user no longer has
+        - messages: dict - match_id -> new messages, oldest first, each with its seq
+        - profiles: list - Partners who are new or changed their profile, shaped as in /users/profile
+    """
+    user_id = get_jwt_identity()
+    try:
+        # First, Before Anything Else Touches the Session - the Sync Reads in its Own Snapshot
+        changes = sync_user(user_id, request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except SQLAlchemyError as e:
+        return jsonify({"error": "Database error occurred."}), 500
+
+    # The Cursor Replaces last_online as the Watermark - Presence is Still Recorded, but users is Written
+    # at Most Once per SYNC_LAST_ONLINE_INTERVAL, for the Pool's SQL Fallback and the Ranker
+    now = datetime.now(timezone.utc)
+    touch_last_online(user_id, now)
+    touch_user_activity(user_id, now)
+
+    messages = {}
+    for message in changes["messages"]:
+        messages.setdefault(str(message["match_id"]), []).append({
+            "kind":            message["kind"],
+            "content":         message["message"],
+            "sentFromClient":  (message["sender"] == user_id),
+            "seq":             message["seq"],
+            "timestamp":       message["timestamp"],
+        })
+
+    return jsonify({
+        "cursor": changes["cursor"],
+        "has_more": changes["has_more"],
+        "matches": match_response_helper(user_id, summaries=changes["matches"]),
+        "removed_match_ids": [str(match_id) for match_id in changes["removed_match_ids"]],
+        "messages": messages,
+        "profiles": changes["profiles"],
+    }), 200
+
+
+# Deprecated - Use /sync, which Doesn't Write last_online and Can't Miss a Message
 @polling_bp.route('/poll/matches', methods=['GET'])
 @jwt_required()
 def poll_matches():
@@ -31,20 +92,20 @@ def poll_matches():
         return jsonify({"error": "User not found."}), 404
     try:
         
-        helper = models.user.UserModelHelper(user_id)
-        new_matches = helper.get_new_matches()
+        # Matches Since the Last Poll, with their Partner and Last Message, in One Query
+        new_matches = match_response_helper(user_id, since=user.last_online)
                 
         # Update Last Online on Polling Matches
         # Needed to Prevent Infinite Loop of Sending Messages
         user.last_online = datetime.now(timezone.utc)
         db.session.commit()
+        touch_user_activity(user_id, user.last_online)
         
         if not new_matches:
             return jsonify({"status": "NONE"}), 200
         
-        response = match_response_helper(new_matches,user_id)     
         # Return the Response
-        return jsonify({"status": "NEW", **response}), 200
+        return jsonify({"status": "NEW", "matches": new_matches}), 200
     
     except SQLAlchemyError as e:
         return jsonify({"error": "Database error occurred."}), 500
@@ -53,6 +114,7 @@ def poll_matches():
     except Exception as e:
         return jsonify({"error": "An unexpected error occurred."}), 500
         
+# Deprecated - Use /sync
 @polling_bp.route('/poll/messages', methods=['GET'])
 @jwt_required()
 def poll_messages():
@@ -61,12 +123,21 @@ def poll_messages():
     if not user:
         return jsonify({"error": "User not found."}), 404
 
-    # Get the optional match_id from the query parameters
+    # Get the optional match_id (and seq, the last one the client holds) from the query parameters
     match_id = request.args.get('match_id', type=str)
+    seq = request.args.get('seq', type=int)
+    if seq is not None and not match_id:
+        return jsonify({"error": "'seq' needs a 'match_id'."}), 400
     try:
         helper = models.match.MatchModelHelper()
         
-        if match_id:
+        if seq is not None:
+            # Exactly the Messages After seq - Gap-Free, Unlike Comparing message_date to last_online
+            match = models.match.Match.query.get(int(match_id))
+            if not match or user_id not in (match.matcher_id, match.matchee_id):
+                return jsonify({"error": "Match not found for user."}), 404
+            new_messages = models.match.MatchModelHelper(match_id=match.id).get_messages_since(seq)["messages"]
+        elif match_id:
             # If match_id is provided, filter messages for that match
             new_messages = helper.get_new_messages(user, match_id=match_id)
         else:
@@ -78,6 +149,7 @@ def poll_messages():
         # Needed to Prevent Infinite Loop of Sending Messages
         user.last_online = datetime.now(timezone.utc)
         db.session.commit()
+        touch_user_activity(user_id, user.last_online)
         
         if not new_messages:
             return jsonify({"status": "NONE"}), 200
@@ -89,7 +161,8 @@ def poll_messages():
             msgs_shaped.append({
                 "kind":            "text",                   # always text for now
                 "content":         m.message_content,        # rename field
-                "sentFromClient":  (m.messager_id == user_id)  # Bool
+                "sentFromClient":  (m.messager_id == user_id),  # Bool
+                "seq":             m.seq
             })
                 
         # Construct the Response, Base Message Return
@@ -101,7 +174,7 @@ def poll_messages():
     
         
         # Return the Response
-        return jsonify({message_return}),200
+        return jsonify(message_return),200
     
     except SQLAlchemyError as e:
         return jsonify({"error": "Database error occurred."}), 500
@@ -13,3 +13,38 @@ def validate_required_params(request, required_params):
         if param not in request.keys() or request[param] is None:
             return False
     return True
+
+def parse_coordinates(data):
+    """
+    Parse Optional latitude/longitude from a Request Payload.
+
+    Returns:
+        tuple: (latitude, longitude) as floats, or None if the payload has no coordinates.
+
+    Raises:
+        ValueError: If only one is given, or either is out of range.
+    """
+    latitude, longitude = data.get("latitude"), data.get("longitude")
+    if latitude is None and longitude is None:
+        return None
+    if latitude is None or longitude is None:
+        raise ValueError("latitude and longitude must be provided together.")
+
+    latitude, longitude = float(latitude), float(longitude)
+    if not -90.0 <= latitude <= 90.0 or not -180.0 <= longitude <= 180.0:
+        raise ValueError("Coordinates out of range.")
+    return latitude, longitude
+
+def set_changed_fields(model, values):
+    """
+    Set Attributes on a Model, Reporting Which Ones Actually Changed.
+
+    Returns:
+        set: Names of the fields whose value differs from before.
+    """
+    changed = set()
+    for field, value in values.items():
+        if getattr(model, field) != value:
+            setattr(model, field, value)
+            changed.add(field)
+    return changed
@@ -16,6 +16,7 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 from flask_socketio import emit
 
 from Backend.src.services.messaging_service import send_fcm_notification
+from Backend.src.services.swipe_pool_service import SwipePoolService
 # Blueprint for the Swipe Routes
 swipe_bp = Blueprint('swipe_bp', __name__)
 
@@ -51,13 +52,11 @@ def notify_new_match(user_ids, new_match):
 def create_swipe():
     """
     Summary: Create a new swipe event or Update and add it to the database.
-    
-    # TODO: Check if Swipe Already Exists, Update Instead of Creating New If So
-    
+    The Pair's Swipe and Any Resulting Match are Written Atomically (see SwipeProcessor.process_new_swipe).
     
     Payload: JSON object with the following fields:
         - swipee_id, stry, required
-        - swipe_result: int, required
+        - swipe_result: str (PENDING - Right, REJECTED - Left), required
 
     Returns:
         str: A message indicating the success or failure of the swipe creation.
@@ -74,8 +73,15 @@ def create_swipe():
     
     try:
         processed_swipe = models.swipe.SwipeProcessor.process_new_swipe(swiper_id, swipee_id, swipe_result)
+    except LookupError as e:
+        return jsonify({"error": "Swipee not found.", "details": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": "Invalid swipe.", "details": str(e)}), 400
     except Exception as e:
        return jsonify({"error": "Failed to process swipe.", "details": str(e)}), 500
+
+    # Swiped Cards Leave the Cached Pool Without Moving the Others (Open Cursors Stay Valid)
+    SwipePoolService().remove_card(swiper_id, swipee_id)
    
     # Create New Match, Push to DB, and Emit MSG Back to Client
     if processed_swipe.swipe_result == "ACCEPTED":
@@ -89,9 +95,8 @@ def create_swipe():
             current_user.last_online = datetime.now(timezone.utc)
             db.session.commit()
             
-            # Create a new match event
-            new_match = models.match.Match().create_match(matcher_id=swiper_id,matchee_id=swipee_id)
-            if new_match is None:
+            # The Match was Created in the Swipe's Transaction
+            if processed_swipe.match_id is None:
                 return jsonify({"error": "Failed to create a new match."}), 500
             
             matched_user = models.user.User.query.get(swipee_id)
@@ -103,7 +108,7 @@ def create_swipe():
             #H - 000519.f1637da8f2c14d39b61d3653a8797532.1310
             
              # Notify Users of the New Match
-            return jsonify({"status": "NEW", "match_id": str(new_match.id)}), 201
+            return jsonify({"status": "NEW", "match_id": str(processed_swipe.match_id)}), 201
         
             # FCM Notifs
             #notify_new_match([swiper_id, swipee_id], new_match)
@@ -115,6 +120,49 @@ def create_swipe():
     #logging.info(f"Swipe created successfully! - {swipe}")
     return jsonify({"status": "SUCCESS"}), 201
 
+
+@swipe_bp.route('/users/swipes/batch', methods=['POST'])
+@jwt_required()
+def create_swipe_batch():
+    """
+    Summary: Submit Many Swipes at Once, Resolved in a Single Transaction.
+
+    Payload: JSON object with the following fields:
+        - swipes: list, required - up to SWIPE_BATCH_MAX objects of:
+            - swipee_id: str, required
+            - swipe_result: str (PENDING - Right, REJECTED - Left), required
+
+    Returns:
+        JSON:
+        - results: One per swipe, in order - swipee_id, status (SUCCESS, NEW, or INVALID),
+          swipe_result (the pair's resulting result), and match_id when status is NEW
+        - matches: The new matches - match_id and user_id
+    """
+    swiper_id = get_jwt_identity()
+    swipes = (request.get_json(silent=True) or {}).get('swipes')
+
+    if not isinstance(swipes, list) or not swipes:
+        return jsonify({"error": "swipes must be a non-empty list."}), 400
+    if len(swipes) > models.swipe.SWIPE_BATCH_MAX:
+        return jsonify({"error": f"At most {models.swipe.SWIPE_BATCH_MAX} swipes per batch."}), 400
+
+    try:
+        results = models.swipe.SwipeProcessor.process_swipe_batch(swiper_id, swipes)
+    except Exception as e:
+        return jsonify({"error": "Failed to process swipes.", "details": str(e)}), 500
+
+    # Swiped Cards Leave the Cached Pool Without Moving the Others (Open Cursors Stay Valid)
+    SwipePoolService().remove_cards(swiper_id, list({result["swipee_id"] for result in results if result["status"] != "INVALID"}))
+
+    matches = list({
+        result["swipee_id"]: {"match_id": result["match_id"], "user_id": result["swipee_id"]}
+        for result in results if result["status"] == "NEW"
+    }.values())
+    if matches:
+        print(f"New Matches Detected from Swipe Batch - {swiper_id} <--> {[match['user_id'] for match in matches]}")
+
+    return jsonify({"results": results, "matches": matches}), 201
+
     
 @swipe_bp.route('/users/swipes>', methods=['GET'])
 def get_swipes():
@@ -1,6 +1,7 @@
 # Author: Joshua Ferguson
 
 import logging
+from datetime import datetime, timezone
 
 from flask import Blueprint, json, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
@@ -16,8 +17,20 @@ from Backend.src.extensions import (
 )
 from Backend.src.models.user import UserProfileSchema
 from Backend.src.routes.route_helpers import (
+    parse_coordinates,
+    set_changed_fields,
     validate_required_params,  # Import the Models and Schemas
 )
+from Backend.src.services.candidate_index_service import CandidateIndex
+from Backend.src.services.geo_index_service import GeoIndex
+from Backend.src.services.profile_card_service import ProfileCardCache
+from Backend.src.services.profile_change_service import (
+    PROFILE_CHANGE_DELETED,
+    PROFILE_CHANGE_PREFERENCES,
+    PROFILE_CHANGE_PROFILE,
+    publish_profile_change,
+)
+from Backend.src.services.user_activity_service import remove_user_activity
 
 user_bp = Blueprint("user_bp", __name__)
 
@@ -93,7 +106,12 @@ def init_preferences():
         dating_pref_exists.age_preference_lower = request.json.get("minAge")
         dating_pref_exists.age_preference_upper = request.json.get("maxAge")
         dating_pref_exists.interested_in = request.json.get("interestedIn").lower()
+        user.updated_at = datetime.now(timezone.utc) # Preferences Live in the User Snapshot
         db.session.commit()
+
+        # Move the User to their New Candidate Index Bucket, Refresh the Swipe Pools it Affects
+        CandidateIndex().index_user(user, dating_pref_exists)
+        publish_profile_change(user_id, PROFILE_CHANGE_PREFERENCES)
         return jsonify({"success": "User Dating Preferences Updated."}), 200
 
     try:
@@ -107,7 +125,12 @@ def init_preferences():
 
         # Add , Commit, and Close the Database Session
         db.session.add(dating_pref)
+        user.updated_at = datetime.now(timezone.utc) # Preferences Live in the User Snapshot
         db.session.commit()
+
+        # User Becomes a Swipe Candidate Once Preferences Exist
+        CandidateIndex().index_user(user, dating_pref)
+        publish_profile_change(user_id, PROFILE_CHANGE_PREFERENCES)
         db.session.close()
 
     except SQLAlchemyError as e1:
@@ -140,6 +163,8 @@ def init_profile():
         - state_code: str, required
         - city: str, required
         - bio: str, required
+        - latitude: float, optional (with longitude)
+        - longitude: float, optional (with latitude)
     """
     # Retrieve User Info from Request
     auth_user_id = get_jwt_identity()
@@ -156,15 +181,29 @@ def init_profile():
         print(f"User Profile Data: {json.dumps(profile_data, indent=4)}")
 
         # Update user profile
-        auth_user.age = profile_data["age"]
-        auth_user.name = profile_data["name"]
-        auth_user.gender = profile_data["gender"].lower()
-        auth_user.state = profile_data["state"].upper()
-        auth_user.city = profile_data["city"].lower()
-        auth_user.bio = profile_data["bio"]
+        new_values = {
+            "age": profile_data["age"],
+            "name": profile_data["name"],
+            "gender": profile_data["gender"].lower(),
+            "state": profile_data["state"].upper(),
+            "city": profile_data["city"].lower(),
+            "bio": profile_data["bio"],
+        }
+
+        coordinates = parse_coordinates(profile_data)
+        if coordinates:
+            new_values["latitude"], new_values["longitude"] = coordinates
+
+        changed_fields = set_changed_fields(auth_user, new_values)
 
         # Commit the changes to the database
         db.session.commit()
+
+        # Keep the Candidate and Geo Indexes in Sync with Location, Gender, and Age
+        CandidateIndex().index_user(auth_user)
+        GeoIndex().index_user(auth_user)
+        if changed_fields:
+            publish_profile_change(auth_user_id, PROFILE_CHANGE_PROFILE, changed_fields)
         db.session.close()
 
     except ValidationError as e:
@@ -257,6 +296,7 @@ def update_profile():
         - state_code: str
         - city: str
         - bio: str
+        - latitude, longitude: float (together)
     """
     auth_user_id = get_jwt_identity()
     auth_user = models.user.User.query.get(auth_user_id)
@@ -268,19 +308,33 @@ def update_profile():
         return jsonify({"error": "No data provided."}), 400
 
     try:
+        # Coordinates Aren't Part of the Profile Schema - Never Serialized Back Out
+        coordinates = parse_coordinates(data)
+        profile_fields = {field: value for field, value in data.items() if field not in ("latitude", "longitude")}
+
         # Load and validate the profile data (partial=True allows updating only some fields)
         profile_schema = UserProfileSchema(partial=True)
-        profile_data = profile_schema.load(request.json)
+        profile_data = profile_schema.load(profile_fields) if profile_fields else {}
 
         # Update only the provided fields, Ensure Proper Fields are Lowercase
-        for field, value in profile_data.items():
-            if field in ["gender", "city", "state"]:
-                setattr(auth_user, field, value.lower())
-            else:
-                setattr(auth_user, field, value)
+        new_values = {
+            field: value.lower() if field in ["gender", "city", "state"] else value
+            for field, value in profile_data.items()
+        }
+
+        if coordinates:
+            new_values["latitude"], new_values["longitude"] = coordinates
+
+        changed_fields = set_changed_fields(auth_user, new_values)
 
         # Commit the changes to the database
         db.session.commit()
+
+        # Keep the Candidate and Geo Indexes in Sync with Location, Gender, and Age
+        CandidateIndex().index_user(auth_user)
+        GeoIndex().index_user(auth_user)
+        if changed_fields:
+            publish_profile_change(auth_user_id, PROFILE_CHANGE_PROFILE, changed_fields)
         db.session.close()
 
     except ValidationError as e:
@@ -389,6 +443,9 @@ def upload_profile_picture():
 
     print(f"Profile Picture Saved at S3 URLS: {url}")
     # logging.log.info(f"Profile Picture Saved at S3 URL : {url}")
+
+    # Swipe Cards Embed Photo URLs - Reload the User's Card on Next Read
+    ProfileCardCache().invalidate(user_id)
     return jsonify({"success": "Profile Uploaded", "url": url}), 201
 
 
@@ -510,7 +567,7 @@ def delete_user_photo():
     if photo_id is None:
         return jsonify({"error": "No Photo ID Provided."}), 400
 
-    photo = db.session.query(models.userPhoto.UserPhoto).get(photo_id)
+    photo = db.session.query(models.photo.UserPhoto).get(photo_id)
     if photo is None:
         return jsonify({"error": "Photo not found."}), 404
 
@@ -518,6 +575,8 @@ def delete_user_photo():
         # Delete the Photo from S3 and DB
         media_storage_service.delete_file(photo.url, user_id)
 
+        # Swipe Cards Embed Photo URLs - Reload the User's Card on Next Read
+        ProfileCardCache().invalidate(user_id)
         return jsonify({"success": "Photo deleted successfully."}), 200
 
     except SQLAlchemyError as e:
@@ -559,6 +618,12 @@ def delete_user():
 
         user.deleted = True
         db.session.commit()
+
+        # Deleted Users Stop Appearing in Swipe Pools
+        CandidateIndex().remove_user(user_id)
+        remove_user_activity(user_id)
+        GeoIndex().remove_user(user_id)
+        publish_profile_change(user_id, PROFILE_CHANGE_DELETED)
         return jsonify({"success": "User deleted successfully."}), 200
 
     except SQLAlchemyError as e:
@@ -0,0 +1,181 @@
+"""Author: Joshua Ferguson
+
+Inverted Candidate Index for Swipe Pool Generation
+
+Users are Bucketed into Redis Sets by the Attributes Pool Generation Filters On,
+so a Pool Starts from a Union of a Few Sets Instead of a Scan of the Users Table.
+
+Keys:
+- `candidate_index:{state}:{city}:{gender}:{age_bucket}:{interested_in}` Set of user_ids
+- `candidate_index:keys:{state}:{city}` Set of "{gender}:{age_bucket}:{interested_in}" Buckets Present in a Location
+- `candidate_index:user:{user_id}` The Bucket Key a User Currently Lives In (for Moves/Removal)
+- `candidate_index:built` Marker Set Once the Index has been Backfilled (Until Then, Pools Fall Back to SQL)
+
+The Index is Updated by init_profile, update_profile, init_preferences, and delete_user.
+"""
+
+from Backend.src.extensions import redis_client
+from Backend.src.models.user import User
+from Backend.src.models.datingPreference import DatingPreference
+
+AGE_BUCKET_SIZE = 5 # Years per Age Bucket
+CANDIDATE_INDEX_BUILT_KEY = "candidate_index:built"
+CANDIDATE_INDEX_REBUILD_BATCH = 1000
+
+
+def age_bucket(age):
+    return age // AGE_BUCKET_SIZE
+
+def location_registry_key(state, city):
+    return f"candidate_index:keys:{state}:{city}"
+
+def bucket_key(state, city, bucket):
+    return f"candidate_index:{state}:{city}:{bucket}"
+
+def user_bucket_key(user_id):
+    return f"candidate_index:user:{user_id}"
+
+
+class CandidateIndex:
+    """
+    Maintains and Queries the Redis Candidate Index.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+
+    # -----Maintenance-----
+
+    def index_user(self, user, preferences=None):
+        """
+        Place a User in the Bucket Matching their Current Profile and Preferences,
+        Removing them from their Previous Bucket. Users Missing Any Indexed Field are Removed.
+
+        Parameters:
+            user (User): The user to (re)index.
+            preferences (DatingPreference, optional): The user's preferences, loaded if not given.
+        """
+        try:
+            if preferences is None:
+                preferences = DatingPreference.query.filter_by(user_id=user.id).first()
+
+            pipeline = self.redis.pipeline()
+            self._queue_index_user(pipeline, user, preferences, previous_key=self.redis.get(user_bucket_key(user.id)))
+            pipeline.execute()
+        except Exception as e:
+            # The Index is a Cache - a Failed Update Must Never Fail the Profile Write
+            print(f"Error updating candidate index for user {user.id}: {str(e)}")
+
+    def remove_user(self, user_id):
+        """Remove a User from the Index (e.g. on Account Deletion)."""
+        try:
+            previous_key = self.redis.get(user_bucket_key(user_id))
+            pipeline = self.redis.pipeline()
+            if previous_key:
+                pipeline.srem(previous_key, user_id)
+            pipeline.delete(user_bucket_key(user_id))
+            pipeline.execute()
+        except Exception as e:
+            print(f"Error removing user {user_id} from candidate index: {str(e)}")
+
+    def rebuild(self):
+        """
+        Backfill the Index from the users and datingpreferences Tables.
+
+        Returns:
+            int: Number of users indexed.
+        """
+        # Queries Fall Back to SQL While the Index is Rebuilt from Scratch
+        self.redis.delete(CANDIDATE_INDEX_BUILT_KEY)
+        for key in self.redis.scan_iter(match="candidate_index:*", count=CANDIDATE_INDEX_REBUILD_BATCH):
+            self.redis.delete(key)
+
+        indexed = 0
+        rows = (
+            User.query.outerjoin(DatingPreference, DatingPreference.user_id == User.id)
+            .add_entity(DatingPreference)
+            .yield_per(CANDIDATE_INDEX_REBUILD_BATCH)
+        )
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for user, preferences in rows:
+            self._queue_index_user(pipeline, user, preferences, previous_key=None)
+            indexed += 1
+            if indexed % CANDIDATE_INDEX_REBUILD_BATCH == 0:
+                pipeline.execute()
+        pipeline.set(CANDIDATE_INDEX_BUILT_KEY, "1")
+        pipeline.execute()
+
+        return indexed
+
+    # -----Queries-----
+
+    def is_built(self):
+        return bool(self.redis.exists(CANDIDATE_INDEX_BUILT_KEY))
+
+    def candidate_ids(self, user, preferences):
+        """
+        IDs of Users Whose Bucket is Compatible with the User and their Preferences.
+        Bucket Matching is Coarse on Age - Exact Age Bounds are Still Checked in SQL.
+
+        Parameters:
+            user (User): The user the pool is being generated for.
+            preferences (DatingPreference): The user's dating preferences.
+
+        Returns:
+            set: Candidate user IDs, or None if the index can't answer (not built / Redis down).
+        """
+        try:
+            if not self.is_built():
+                return None
+
+            buckets = self.redis.smembers(location_registry_key(user.state, user.city))
+            lower_bucket = age_bucket(preferences.age_preference_lower)
+            upper_bucket = age_bucket(preferences.age_preference_upper)
+
+            keys = []
+            for bucket in buckets:
+                gender, bucket_age, interested_in = bucket.rsplit(":", 2)
+                if preferences.interested_in != "any" and gender != preferences.interested_in:
+                    continue
+                if not lower_bucket <= int(bucket_age) <= upper_bucket:
+                    continue
+                if interested_in not in ("any", user.gender):
+                    continue
+                keys.append(bucket_key(user.state, user.city, bucket))
+
+            if not keys:
+                return set()
+
+            candidates = self.redis.sunion(keys)
+            candidates.discard(user.id)
+            return candidates
+
+        except Exception as e:
+            print(f"Error reading candidate index for user {user.id}: {str(e)}")
+            return None
+
+    # -----Helpers-----
+
+    def _queue_index_user(self, pipeline, user, preferences, previous_key):
+        """Queue the Redis Commands to Move a User into their Current Bucket."""
+        indexable = (
+            preferences is not None
+            and not user.deleted
+            and all(value is not None for value in (user.state, user.city, user.gender, user.age))
+        )
+        new_key = None
+
+        if indexable:
+            bucket = f"{user.gender}:{age_bucket(user.age)}:{preferences.interested_in}"
+            new_key = bucket_key(user.state, user.city, bucket)
+            pipeline.sadd(location_registry_key(user.state, user.city), bucket)
+
+        if previous_key and previous_key != new_key:
+            pipeline.srem(previous_key, user.id)
+
+        if new_key:
+            pipeline.sadd(new_key, user.id)
+            pipeline.set(user_bucket_key(user.id), new_key)
+        else:
+            pipeline.delete(user_bucket_key(user.id))
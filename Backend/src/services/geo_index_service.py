@@ -0,0 +1,252 @@
+"""Author: Joshua Ferguson
+
+Grid-Cell Geo Index for Distance-Based Swipe Candidates
+
+Users with Coordinates are Bucketed into Fixed Lat/Lon Grid Cells. A Radius Search Starts at
+the User's Cell and Expands Ring by Ring (Cells at Chebyshev Distance 1, 2, ...) Until it has
+Enough Candidates or the Ring Lies Beyond the Max Radius, then Exact Distances are Computed
+with a Vectorized Haversine.
+
+Keys:
+- `geo_cell:{row}:{col}` Set of user_ids in a Cell
+- `geo_cell:user:{user_id}` The Cell Key a User Currently Lives In (for Moves/Removal)
+- `geo_coords` Hash of user_id -> "lat,lon"
+- `geo_index:built` Marker Set Once Backfilled (Until Then, Pools Match on State/City)
+
+Users Without Coordinates Keep Matching on Exact State/City.
+"""
+
+import math
+
+import numpy as np
+
+from Backend.src.extensions import redis_client
+from Backend.src.utils import EnvManager
+
+GEO_CELL_DEGREES = 0.25 # Cell Height/Width in Degrees (~28 km of Latitude)
+GEO_INDEX_BUILT_KEY = "geo_index:built"
+GEO_COORDS_KEY = "geo_coords"
+GEO_INDEX_REBUILD_BATCH = 1000
+GEO_MIN_CANDIDATES = 2000 # Stop Expanding Rings Once This Many Candidates are Found
+DEFAULT_MAX_DISTANCE_KM = 80.0
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+GRID_ROWS = int(round(180 / GEO_CELL_DEGREES))
+GRID_COLS = int(round(360 / GEO_CELL_DEGREES))
+
+
+def max_distance_km():
+    """Search Radius - SWIPE_POOL_MAX_DISTANCE_KM, Default 80 km."""
+    distance = EnvManager().load_env_var("SWIPE_POOL_MAX_DISTANCE_KM")
+    return float(distance) if distance else DEFAULT_MAX_DISTANCE_KM
+
+def has_coordinates(user):
+    return user.latitude is not None and user.longitude is not None
+
+
+# -----Grid Math-----
+
+def cell_of(latitude, longitude):
+    """(row, col) of the Grid Cell Containing a Point."""
+    row = min(int((latitude + 90.0) / GEO_CELL_DEGREES), GRID_ROWS - 1)
+    col = int((longitude + 180.0) / GEO_CELL_DEGREES) % GRID_COLS
+    return row, col
+
+def ring_cells(row, col, ring):
+    """Cells at Chebyshev Distance `ring` from (row, col), Wrapping at the Antimeridian."""
+    if ring == 0:
+        return [(row, col)]
+
+    cells = set()
+    for d in range(-ring, ring + 1):
+        for r, c in ((row - ring, col + d), (row + ring, col + d), (row + d, col - ring), (row + d, col + ring)):
+            if 0 <= r < GRID_ROWS:
+                cells.add((r, c % GRID_COLS))
+    return sorted(cells)
+
+def ring_min_distance_km(latitude, ring):
+    """Lower Bound on the Distance from a Point to Any Cell in a Ring (Narrowest Cell Side)."""
+    if ring == 0:
+        return 0.0
+    # Cells Narrow Towards the Poles - Bound with the Widest Latitude the Ring Can Reach
+    widest_latitude = min(abs(latitude) + ring * GEO_CELL_DEGREES, 89.9)
+    cell_km = GEO_CELL_DEGREES * KM_PER_DEGREE * math.cos(math.radians(widest_latitude))
+    return (ring - 1) * cell_km
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Great-Circle Distance from One Point to Arrays of Points, in km."""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def expand_rings(latitude, longitude, cell_members, min_candidates, max_distance):
+    """
+    Collect Members of Cells Ring by Ring Around a Point.
+
+    Parameters:
+        latitude (float), longitude (float): Search center.
+        cell_members (callable): list of (row, col) -> list of member collections, one per cell.
+        min_candidates (int): Stop once this many members are collected.
+        max_distance (float): Stop once a ring can't contain anything within this many km.
+
+    Returns:
+        list: Collected members (unfiltered by exact distance).
+    """
+    row, col = cell_of(latitude, longitude)
+    collected = []
+    ring = 0
+    while ring_min_distance_km(latitude, ring) <= max_distance and ring <= GRID_COLS // 2:
+        for members in cell_members(ring_cells(row, col, ring)):
+            collected.extend(members)
+        if len(collected) >= min_candidates:
+            break
+        ring += 1
+    return collected
+
+
+def geo_cell_key(row, col):
+    return f"geo_cell:{row}:{col}"
+
+def user_cell_key(user_id):
+    return f"geo_cell:user:{user_id}"
+
+
+class GeoIndex:
+    """
+    Maintains and Queries the Redis Geo Grid Index.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+
+    # -----Maintenance-----
+
+    def index_user(self, user):
+        """Move a User into the Cell of their Current Coordinates (or Out of the Index if they have None)."""
+        try:
+            pipeline = self.redis.pipeline()
+            self._queue_index_user(pipeline, user, previous_key=self.redis.get(user_cell_key(user.id)))
+            pipeline.execute()
+        except Exception as e:
+            # The Index is a Cache - a Failed Update Must Never Fail the Profile Write
+            print(f"Error updating geo index for user {user.id}: {str(e)}")
+
+    def remove_user(self, user_id):
+        try:
+            previous_key = self.redis.get(user_cell_key(user_id))
+            pipeline = self.redis.pipeline()
+            if previous_key:
+                pipeline.srem(previous_key, user_id)
+            pipeline.delete(user_cell_key(user_id))
+            pipeline.hdel(GEO_COORDS_KEY, user_id)
+            pipeline.execute()
+        except Exception as e:
+            print(f"Error removing user {user_id} from geo index: {str(e)}")
+
+    def rebuild(self):
+        """
+        Backfill the Index from users.latitude/longitude.
+
+        Returns:
+            int: Number of users indexed.
+        """
+        from Backend.src.models.user import User
+
+        # Pools Fall Back to State/City While the Index is Rebuilt from Scratch
+        self.redis.delete(GEO_INDEX_BUILT_KEY, GEO_COORDS_KEY)
+        for key in self.redis.scan_iter(match="geo_cell:*", count=GEO_INDEX_REBUILD_BATCH):
+            self.redis.delete(key)
+
+        indexed = 0
+        rows = User.query.filter(
+            User.latitude.isnot(None),
+            User.longitude.isnot(None),
+        ).yield_per(GEO_INDEX_REBUILD_BATCH)
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for user in rows:
+            self._queue_index_user(pipeline, user, previous_key=None)
+            indexed += 1
+            if indexed % GEO_INDEX_REBUILD_BATCH == 0:
+                pipeline.execute()
+        pipeline.set(GEO_INDEX_BUILT_KEY, "1")
+        pipeline.execute()
+
+        return indexed
+
+    # -----Queries-----
+
+    def is_built(self):
+        return bool(self.redis.exists(GEO_INDEX_BUILT_KEY))
+
+    def nearby(self, user, max_distance=None, min_candidates=GEO_MIN_CANDIDATES):
+        """
+        Users Within max_distance km of a User, Found by Expanding Rings of Cells.
+
+        Parameters:
+            user (User): The user the pool is being generated for (must have coordinates).
+            max_distance (float, optional): Radius in km, defaults to SWIPE_POOL_MAX_DISTANCE_KM.
+            min_candidates (int): Stop expanding once this many users are in range of the rings.
+
+        Returns:
+            dict: user_id -> distance in km, or None if the index can't answer (not built / no coordinates / Redis down).
+        """
+        try:
+            if not has_coordinates(user) or not self.is_built():
+                return None
+
+            max_distance = max_distance or max_distance_km()
+
+            def cell_members(cells):
+                pipeline = self.redis.pipeline(transaction=False)
+                for row, col in cells:
+                    pipeline.smembers(geo_cell_key(row, col))
+                return pipeline.execute()
+
+            candidate_ids = [
+                candidate_id
+                for candidate_id in expand_rings(user.latitude, user.longitude, cell_members, min_candidates, max_distance)
+                if candidate_id != user.id
+            ]
+            if not candidate_ids:
+                return {}
+
+            coordinates = self.redis.hmget(GEO_COORDS_KEY, candidate_ids)
+            located = [(candidate_id, coords) for candidate_id, coords in zip(candidate_ids, coordinates) if coords]
+            if not located:
+                return {}
+
+            latitudes, longitudes = np.array(
+                [[float(value) for value in coords.split(",")] for _, coords in located]
+            ).T
+            distances = haversine_km(user.latitude, user.longitude, latitudes, longitudes)
+
+            return {
+                candidate_id: float(distance)
+                for (candidate_id, _), distance in zip(located, distances)
+                if distance <= max_distance
+            }
+
+        except Exception as e:
+            print(f"Error reading geo index for user {user.id}: {str(e)}")
+            return None
+
+    # -----Helpers-----
+
+    def _queue_index_user(self, pipeline, user, previous_key):
+        new_key = None
+        if has_coordinates(user) and not user.deleted:
+            new_key = geo_cell_key(*cell_of(user.latitude, user.longitude))
+
+        if previous_key and previous_key != new_key:
+            pipeline.srem(previous_key, user.id)
+
+        if new_key:
+            pipeline.sadd(new_key, user.id)
+            pipeline.set(user_cell_key(user.id), new_key)
+            pipeline.hset(GEO_COORDS_KEY, user.id, f"{user.latitude},{user.longitude}")
+        else:
+            pipeline.delete(user_cell_key(user.id))
+            pipeline.hdel(GEO_COORDS_KEY, user.id)
@@ -231,30 +231,37 @@ class LLMService:
             "bio": messager.bio if messager.bio else "No bio available",
         }
         
-        match_helper = models.match.MatchModelHelper(match.id)
-        conversation_hist = match_helper.get_messages(limit=5)["messages"]
-        conversation_hist = [msg.message_content for msg in conversation_hist]
-        last_msg = match_helper.get_last_message()
+        # Recent Conversation from the Match's Message Buffer, Newest First
+        from Backend.src.services.recent_messages_service import RecentMessages, serialize_message
+        conversation_hist = RecentMessages().recent(match.id, 5)
+        last_msg = conversation_hist[0]
+        conversation_hist = [msg["message"] for msg in conversation_hist]
         # Generate a reply using the LLM service
-        new_message = models.message.Message(
+        new_message = models.match.Match.add_message(
             match_id= match.id,
             messager_id = messager_id ,
             message_content = self.reply_to_message(
                 user_profile = messager_profile,
                 conversation_history= conversation_hist,
-                incoming_message = last_msg.message_content,
-                kind=last_msg.kind,
+                incoming_message = last_msg["message"],
+                kind=last_msg["kind"],
             ),
-            kind= last_msg.kind,
+            kind= last_msg["kind"],
             message_date= datetime.now(timezone.utc),
         )
+        # Read Before the Commit Expires Them
+        recipient_id, buffered = match.partner_id(messager_id), serialize_message(new_message)
         
         # Add the new message to the database
         from Backend.src.extensions import db
-        db.session.add(new_message)
         db.session.commit()
+
+        # Badge the Recipient's Unread Count, and Buffer the Message for Chat History
+        from Backend.src.services.unread_counter_service import UnreadCounter
+        UnreadCounter().record_message(recipient_id, match.id)
+        RecentMessages().push(buffered)
         
-        print(f"Reply created for match ID {match.id} - Message ID: {new_message.id}")
+        print(f"Reply created for match ID {match.id} - Message ID: {buffered['id']}")
         return new_message
         
         
@@ -0,0 +1,82 @@
+"""Author: Joshua Ferguson
+
+Message Log Flusher - Runs as its Own Process (see scripts/message_log_flusher.py)
+
+Drains the Async Chat Message Log (message_log_service.py) into `messages` in a Consumer Group (see stream_flusher.py
+for the Read, Retry, Backoff and Dead Letter Loop) - Each Batch is Inserted with Match.insert_messages (One Multi-Row
+INSERT, Keeping the seqs they were Logged With, One UPDATE of the Matches' Last Messages) and Committed in One
+Transaction, then Counted Unread for its Recipients.
+
+A Crash Replays a Batch - Harmless, a Message Already Inserted is Skipped by Id. A Message that Keeps Failing is
+Dead-Lettered After MESSAGE_FLUSH_MAX_ATTEMPTS (Redis_Utils --action requeue_dead_messages Puts it Back).
+
+Keys:
+- Consumer Group `message_flusher` on `messages:log`
+- `messages:log:attempts` Hash of entry_id -> Failed Attempts, for Entries Still Pending
+- `messages:log:dead` Stream of Entries that Couldn't be Written, with the Error
+- `messages:log:metrics` Hash - flushed_total, batches_total, retried_total, dead_lettered_total, flush_latency_ms_last
+"""
+
+from Backend.src.extensions import db
+from Backend.src.services.message_log_service import MESSAGE_LOG_STREAM, MessageLog, logged_message_row
+from Backend.src.services.stream_flusher import StreamLogFlusher
+from Backend.src.services.unread_counter_service import UnreadCounter
+
+MESSAGE_LOG_GROUP = "message_flusher"
+MESSAGE_LOG_ATTEMPTS_KEY = "messages:log:attempts"
+MESSAGE_LOG_DEAD_STREAM = "messages:log:dead"
+MESSAGE_LOG_METRICS_KEY = "messages:log:metrics"
+MESSAGE_FLUSH_BATCH = 500 # Entries Written per Transaction
+MESSAGE_FLUSH_BLOCK_MS = 200 # Longest a Message Waits in the Log While Traffic is Low
+MESSAGE_FLUSH_CLAIM_IDLE_MS = 30000 # Entries Read but Unacknowledged this Long Belong to a Dead Flusher
+MESSAGE_FLUSH_MAX_ATTEMPTS = 5 # Failed Writes of One Entry Before it's Dead-Lettered
+MESSAGE_FLUSH_MAX_BACKOFF_S = 30 # Longest Wait Between Retries While Postgres is Down
+
+
+class MessageLogFlusher(StreamLogFlusher):
+    """
+    Flushes the Async Chat Message Log to Postgres in Batches.
+    """
+
+    name = "Message Log Flusher"
+    entry_name = "messages"
+    stream = MESSAGE_LOG_STREAM
+    group = MESSAGE_LOG_GROUP
+    attempts_key = MESSAGE_LOG_ATTEMPTS_KEY
+    dead_stream = MESSAGE_LOG_DEAD_STREAM
+    metrics_key = MESSAGE_LOG_METRICS_KEY
+    default_batch_size = MESSAGE_FLUSH_BATCH
+    block_ms = MESSAGE_FLUSH_BLOCK_MS
+    claim_idle_ms = MESSAGE_FLUSH_CLAIM_IDLE_MS
+    max_attempts = MESSAGE_FLUSH_MAX_ATTEMPTS
+    max_backoff_s = MESSAGE_FLUSH_MAX_BACKOFF_S
+
+    def _write(self, entries):
+        """Insert Entries and Update their Matches' Last Messages in One Transaction, then Count Them Unread."""
+        from Backend.src.models.match import Match
+
+        with self.app.app_context():
+            try:
+                rows = [logged_message_row(entry) for _, entry in entries]
+                # A Message that Can't Keep its seq Takes a New One from the Same Counter, Past Any Still Logged
+                inserted = Match.insert_messages(rows, next_seq=MessageLog(self.redis).next_seq)
+
+                recipients = {}
+                if inserted:
+                    for match_id, matcher_id, matchee_id in db.session.query(Match.id, Match.matcher_id, Match.matchee_id).filter(
+                        Match.id.in_({row["match_id"] for row in rows})
+                    ):
+                        recipients[match_id] = (matcher_id, matchee_id)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+        # Replayed Entries were Counted the First Time
+        unread = UnreadCounter(self.redis)
+        for row in rows:
+            if row["id"] in inserted and row["match_id"] in recipients:
+                matcher_id, matchee_id = recipients[row["match_id"]]
+                unread.record_message(matchee_id if row["messager_id"] == matcher_id else matcher_id, row["match_id"])
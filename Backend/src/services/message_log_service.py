@@ -0,0 +1,182 @@
+"""Author: Joshua Ferguson
+
+Asynchronous Chat Persistence - the Message Log
+
+With CHAT_PERSISTENCE=async, a Chat Message Never Waits on Postgres:
+1. It Gets its messages.id Up Front (Reserved from the Table's Sequence in Blocks), its seq in the Match (from
+   the Match's Counter in Redis) and a Log Sequence Number (its Entry ID in the `messages:log` Stream) - the seq
+   and the Entry are Taken in One Script, so a Match's Messages are Logged in seq Order - and is Broadcast Straight Away
+2. The Message Log Flusher (message_log_flusher.py) Inserts Logged Messages in Batches, Retrying Until they're In
+
+Strict Mode (CHAT_PERSISTENCE=strict, the Default) Commits Each Message Before Broadcasting It, as Before -
+and the Socket Falls Back to It Whenever the Log Can't Take a Message. While Async Mode is On, Strict Saves
+Take their seqs from the Same Counter (see Match.add_message), so the Two Never Hand Out the Same seq.
+
+A seq Taken But Never Inserted (a Rolled-Back Save, a Dead-Lettered Message) Leaves a Gap, and a Logged Message
+can Reach Postgres After a Higher seq - Readers Hold their Cursors at a Recent Gap (see held_seq).
+
+Keys:
+- `messages:log` Stream of {seq, id, match_id, sender, message, kind, timestamp} Messages as Sent, in Order
+- `match:{match_id}:seq` The Match's Last seq Handed Out - Seeded from matches.last_seq When Missing
+
+The Flusher Inserts with ON CONFLICT (id) DO NOTHING, so Replaying an Entry After a Crash is Harmless -
+Delivery is At-Least-Once, and a Message is as Durable as the Stream (Run Redis with appendonly yes;
+appendfsync always Leaves No Loss Window).
+"""
+
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import select, text
+
+from Backend.src.extensions import db, redis_client
+from Backend.src.models.message import MESSAGE_CONTENT_LENGTH
+from Backend.src.services.recent_messages_service import RecentMessages
+from Backend.src.utils import EnvManager
+
+MESSAGE_LOG_STREAM = "messages:log"
+MESSAGE_ID_BLOCK = 100 # messages.id Values Reserved per Sequence Round Trip
+
+# KEYS: match:{match_id}:seq, [Log Stream to Append the Message To]
+# ARGV: Floor (the Match's last_seq, or '' if Not Read), then the Message's Fields as Name, Value Pairs
+# Returns {seq, Entry ID}, or false if the Counter is Missing and No Floor was Given
+MESSAGE_SEQ_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current and ARGV[1] == '' then
+    return false
+end
+if ARGV[1] ~= '' and (not current or tonumber(current) < tonumber(ARGV[1])) then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+local seq = redis.call('INCR', KEYS[1])
+if KEYS[2] then
+    return {seq, redis.call('XADD', KEYS[2], '*', 'seq', seq, unpack(ARGV, 2))}
+end
+return {seq}
+"""
+
+# Reserved but Unused messages.id Values, Shared by this Process - Lost on Exit, Leaving Harmless Gaps
+_reserved_ids = deque()
+_reserved_ids_lock = threading.Lock()
+
+
+def reserve_message_id():
+    """
+    The Next messages.id for a Logged Message - One nextval Round Trip per MESSAGE_ID_BLOCK Messages.
+    Strict Mode Inserts Draw on the Same Sequence, so Ids Never Collide.
+    """
+    with _reserved_ids_lock:
+        if not _reserved_ids:
+            # Its Own Connection - nextval Ignores Transactions, and the Request's Session is Left Alone
+            with db.engine.connect() as conn:
+                _reserved_ids.extend(conn.execute(
+                    text("SELECT nextval(pg_get_serial_sequence('messages', 'id')) FROM generate_series(1, :block)"),
+                    {"block": MESSAGE_ID_BLOCK},
+                ).scalars())
+        return _reserved_ids.popleft()
+
+
+def message_seq_key(match_id):
+    return f"match:{match_id}:seq"
+
+
+class MessageLog:
+    """
+    Appends Chat Messages to the Persistence Log.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+        self.seq_script = self.redis.register_script(MESSAGE_SEQ_SCRIPT)
+
+    @staticmethod
+    def is_enabled():
+        """Async Persistence is On When CHAT_PERSISTENCE is async - Strict Otherwise."""
+        return EnvManager().load_env_var("CHAT_PERSISTENCE") == "async"
+
+    def append(self, match_id, messager_id, message_content, kind="text"):
+        """
+        Accept a Message for Asynchronous Persistence, and Buffer it for Chat History.
+
+        Parameters:
+            match_id (int): The match the message belongs to.
+            messager_id (str): The sender.
+            message_content (str): The message.
+            kind (str, optional): text or game.
+
+        Returns:
+            dict: The message as broadcast (see serialize_message), with its reserved id, its seq in the match
+                  and its log sequence number `log_seq` - or None if it can't be logged (the caller then saves it strictly).
+        """
+        if not message_content or len(message_content) > MESSAGE_CONTENT_LENGTH:
+            return None
+        try:
+            message = {
+                "id": reserve_message_id(),
+                "match_id": int(match_id),
+                "sender": messager_id,
+                "message": message_content,
+                "kind": kind or "text",
+                # Naive UTC, as message_date is Stored
+                "timestamp": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+            }
+            fields = [str(part) for field in message.items() for part in field]
+            keys = [message_seq_key(message["match_id"]), MESSAGE_LOG_STREAM]
+            logged = self.seq_script(keys=keys, args=["", *fields])
+            if not logged:
+                # The Match's First Message Since Redis Last Held its Counter
+                logged = self.seq_script(keys=keys, args=[self._last_seq(message["match_id"]), *fields])
+            message["seq"], message["log_seq"] = int(logged[0]), logged[1]
+        except Exception as e:
+            print(f"Error appending to message log, saving message directly: {str(e)}")
+            return None
+
+        # Chat History Includes it Before it's Flushed
+        RecentMessages(self.redis).push({key: value for key, value in message.items() if key != "log_seq"})
+        return message
+
+    def next_seq(self, match_id, last_seq):
+        """
+        Take a Match's Next seq Without Logging a Message - for Strict Saves While Async Mode is On, and
+        Logged Messages the Flusher Has to Renumber.
+
+        Parameters:
+            match_id (int): The match ID.
+            last_seq (int): The match's last_seq, read under its row lock - the counter never hands out a seq at or below it.
+
+        Returns:
+            int: The seq.
+        """
+        return int(self.seq_script(keys=[message_seq_key(match_id)], args=[last_seq])[0])
+
+    def backlog(self):
+        """Messages Logged and Not Yet Flushed (or Dead-Lettered)."""
+        return self.redis.xlen(MESSAGE_LOG_STREAM)
+
+    # -----Helpers-----
+
+    @staticmethod
+    def _last_seq(match_id):
+        from Backend.src.models.match import Match
+
+        # Its Own Connection, as in reserve_message_id
+        with db.engine.connect() as conn:
+            last_seq = conn.execute(select(Match.last_seq).where(Match.id == match_id)).scalar()
+        if last_seq is None:
+            raise LookupError(f"Match {match_id} not found")
+        return last_seq
+
+
+def logged_message_row(entry):
+    """A Log Entry as a messages Row"""
+    return {
+        "id": int(entry["id"]),
+        "seq": int(entry["seq"]),
+        "match_id": int(entry["match_id"]),
+        "messager_id": entry["sender"],
+        "message_content": entry["message"],
+        "kind": entry["kind"],
+        "message_date": datetime.fromisoformat(entry["timestamp"]),
+        "message_read": False,
+    }
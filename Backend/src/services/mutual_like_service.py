@@ -0,0 +1,228 @@
+"""Author: Joshua Ferguson
+
+Mutual-Like Detector - "Has the Other User Already Swiped Right on Me?"
+
+Per-User `liked_by` Sets Answer it in Redis, so a Swipe Can Tell it Makes a Match Before Touching SQL.
+The Check and the Update are One Lua Script (SREM on the Swiper's Set Doubles as the Membership Check),
+so Two Simultaneous Mutual Swipes Can't Both Miss Each Other.
+
+A Pair's Swipe Row (swiper, swipee, result) Means:
+- PENDING: swiper is in liked_by:{swipee}
+- ACCEPTED / REJECTED: Neither User is in the Other's Set
+
+`swipes` Stays the Source of Truth - Both Swipe Paths Keep the Sets in Step (see SwipeProcessor), and
+reconcile() Repairs Drift Between Them (e.g. After a Redis Failover), Along with ACCEPTED Pairs Missing a Match.
+
+Keys:
+- `liked_by:{user_id}` Set of user_ids Whose Right Swipe on the User is Still PENDING
+- `liked_by:built` Marker Set Once Backfilled from `swipes` (Until Then, Nothing Relies on the Sets)
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, func
+
+from Backend.src.extensions import db, redis_client
+
+LIKED_BY_BUILT_KEY = "liked_by:built"
+LIKED_BY_REBUILD_BATCH = 1000
+
+# KEYS: liked_by:{swiper}, liked_by:{swipee}, [Log Stream to Append the Swipe To]
+# ARGV: swiper_id, swipee_id, swipe_result (PENDING | REJECTED), swipe_date
+# Returns the Pair's Resulting swipe_result
+RESOLVE_SWIPE_SCRIPT = """
+local pair_result = ARGV[3]
+if ARGV[3] == 'REJECTED' then
+    redis.call('SREM', KEYS[1], ARGV[2])
+    redis.call('SREM', KEYS[2], ARGV[1])
+elseif redis.call('SREM', KEYS[1], ARGV[2]) == 1 then
+    pair_result = 'ACCEPTED'
+else
+    redis.call('SADD', KEYS[2], ARGV[1])
+end
+if KEYS[3] then
+    redis.call('XADD', KEYS[3], '*', 'swiper_id', ARGV[1], 'swipee_id', ARGV[2], 'swipe_result', ARGV[3], 'swipe_date', ARGV[4])
+end
+return pair_result
+"""
+
+
+def liked_by_key(user_id):
+    return f"liked_by:{user_id}"
+
+
+class MutualLikeDetector:
+    """
+    Maintains and Queries the Per-User liked_by Sets.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+        self.resolve_script = self.redis.register_script(RESOLVE_SWIPE_SCRIPT)
+
+    # -----Queries-----
+
+    def is_built(self):
+        return bool(self.redis.exists(LIKED_BY_BUILT_KEY))
+
+    # -----Maintenance-----
+
+    def resolve_swipes(self, swiper_id, swipe_results, log_stream=None):
+        """
+        Resolve Swipes by One User Against the Sets, Updating Them, in One Pipeline.
+
+        Parameters:
+            swiper_id (str): The user who swiped.
+            swipe_results (dict): swipee_id -> PENDING (Right) or REJECTED (Left).
+            log_stream (str, optional): Also append each swipe to this stream, atomically with its resolution.
+
+        Returns:
+            dict: swipee_id -> the pair's resulting swipe_result (ACCEPTED if the swipee already liked swiper_id).
+        """
+        swipe_date = datetime.now(timezone.utc).isoformat()
+        pipeline = self.redis.pipeline(transaction=False)
+        for swipee_id, swipe_result in swipe_results.items():
+            keys = [liked_by_key(swiper_id), liked_by_key(swipee_id)]
+            if log_stream:
+                keys.append(log_stream)
+            self.resolve_script(keys=keys, args=[swiper_id, swipee_id, swipe_result, swipe_date], client=pipeline)
+        return dict(zip(swipe_results, pipeline.execute()))
+
+    def record_swipes(self, swiper_id, pair_results):
+        """
+        Bring the Sets in Line with Swipes Already Resolved in `swipes`. Called After a Direct Swipe Write.
+
+        Parameters:
+            swiper_id (str): The user who swiped.
+            pair_results (dict): swipee_id -> the pair's resulting swipe_result.
+        """
+        if not pair_results:
+            return
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for swipee_id, swipe_result in pair_results.items():
+                if swipe_result == "PENDING":
+                    pipeline.sadd(liked_by_key(swipee_id), swiper_id)
+                else:
+                    pipeline.srem(liked_by_key(swipee_id), swiper_id)
+                    pipeline.srem(liked_by_key(swiper_id), swipee_id)
+            pipeline.execute()
+        except Exception as e:
+            # reconcile() Repairs a Missed Update - Never Fail the Swipe Over It
+            print(f"Error recording likes for {swiper_id}: {str(e)}")
+
+    def rebuild(self):
+        """
+        Backfill the Sets from PENDING Rows in `swipes`. Run Before Enabling SWIPE_WRITE_BEHIND,
+        or After Draining the Swipe Log - Swipes Still in it are Not in `swipes` Yet.
+
+        Returns:
+            int: Number of pending likes written.
+        """
+        from Backend.src.models.swipe import Swipe
+
+        self.redis.delete(LIKED_BY_BUILT_KEY)
+        for key in self.redis.scan_iter(match="liked_by:*", count=LIKED_BY_REBUILD_BATCH):
+            self.redis.delete(key)
+
+        written = 0
+        rows = Swipe.query.with_entities(Swipe.swiper_id, Swipe.swipee_id).filter(
+            Swipe.swipe_result == "PENDING"
+        ).yield_per(LIKED_BY_REBUILD_BATCH)
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for swiper_id, swipee_id in rows:
+            pipeline.sadd(liked_by_key(swipee_id), swiper_id)
+            written += 1
+            if written % LIKED_BY_REBUILD_BATCH == 0:
+                pipeline.execute()
+        pipeline.set(LIKED_BY_BUILT_KEY, "1")
+        pipeline.execute()
+
+        return written
+
+    def reconcile(self, log_stream=None):
+        """
+        Repair Drift Between the Sets and `swipes`, and Insert Matches Missing for ACCEPTED Pairs.
+
+        Pairs with a Swipe Still in the Write-Behind Log are Skipped - Redis is Ahead of `swipes` for Them
+        Until it's Flushed. A Swipe Written During the Pass Can Still be "Repaired" the Wrong Way; the
+        Next Pass Puts it Back, Since Each Pass Converges on `swipes`.
+
+        Parameters:
+            log_stream (str, optional): The write-behind swipe log, if enabled.
+
+        Returns:
+            dict: {"added", "removed", "matches_created"} counts.
+        """
+        from Backend.src.models.match import Match
+        from Backend.src.models.swipe import Swipe
+
+        unflushed = self._logged_pairs(log_stream)
+
+        # Every PENDING Like in `swipes`, Grouped by the User Liked
+        expected = {}
+        rows = Swipe.query.with_entities(Swipe.swiper_id, Swipe.swipee_id).filter(
+            Swipe.swipe_result == "PENDING"
+        ).yield_per(LIKED_BY_REBUILD_BATCH)
+        for swiper_id, swipee_id in rows:
+            expected.setdefault(swipee_id, set()).add(swiper_id)
+
+        unflushed |= self._logged_pairs(log_stream)
+
+        # Users with a Set in Redis but No PENDING Likes Left in `swipes`
+        user_ids = set(expected)
+        for key in self.redis.scan_iter(match="liked_by:*", count=LIKED_BY_REBUILD_BATCH):
+            if key != LIKED_BY_BUILT_KEY:
+                user_ids.add(key.split(":", 1)[1])
+
+        added = removed = 0
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), LIKED_BY_REBUILD_BATCH):
+            batch = user_ids[start:start + LIKED_BY_REBUILD_BATCH]
+            pipeline = self.redis.pipeline(transaction=False)
+            for user_id in batch:
+                pipeline.smembers(liked_by_key(user_id))
+            cached_sets = pipeline.execute()
+
+            for user_id, cached in zip(batch, cached_sets):
+                wanted = expected.get(user_id, set())
+                missing = {liker_id for liker_id in wanted - cached if frozenset((liker_id, user_id)) not in unflushed}
+                extra = {liker_id for liker_id in cached - wanted if frozenset((liker_id, user_id)) not in unflushed}
+                if missing:
+                    pipeline.sadd(liked_by_key(user_id), *missing)
+                if extra:
+                    pipeline.srem(liked_by_key(user_id), *extra)
+                added += len(missing)
+                removed += len(extra)
+            pipeline.execute()
+
+        # ACCEPTED Pairs Whose Match Insert was Lost
+        unmatched = (
+            db.session.query(Swipe.swiper_id, Swipe.swipee_id)
+            .outerjoin(Match, and_(
+                func.least(Match.matcher_id, Match.matchee_id) == func.least(Swipe.swiper_id, Swipe.swipee_id),
+                func.greatest(Match.matcher_id, Match.matchee_id) == func.greatest(Swipe.swiper_id, Swipe.swipee_id),
+            ))
+            .filter(Swipe.swipe_result == "ACCEPTED", Match.id.is_(None))
+            .all()
+        )
+        matches_created = 0
+        for swiper_id, swipee_id in unmatched:
+            _, created = Match.insert_pairs(swiper_id, [swipee_id])[swipee_id]
+            matches_created += created
+        db.session.commit()
+
+        return {"added": added, "removed": removed, "matches_created": matches_created}
+
+    # -----Helpers-----
+
+    def _logged_pairs(self, log_stream):
+        """Pairs with a Swipe Still Waiting in the Write-Behind Log."""
+        if not log_stream:
+            return set()
+        return {
+            frozenset((entry["swiper_id"], entry["swipee_id"]))
+            for _, entry in self.redis.xrange(log_stream)
+            if entry
+        }
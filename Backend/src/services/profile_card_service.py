@@ -0,0 +1,168 @@
+"""Author: Joshua Ferguson
+
+Shared Profile Card Cache
+
+Swipe Pools Hold Only user_ids - the Card Shown for a User Lives Once, in `profile:{user_id}`,
+However Many Pools Queue Them. A Page is Hydrated with One Pipelined HGETALL per Card, and Cards
+Missing from the Cache (Expired or Evicted) are Loaded in One IN Query and Written Back.
+
+Cards are a UserSchema Dump Plus the User's Photo URLs, so the Client Needs No Per-Card
+/users/profile_picture Call:
+- main_photo: Latest Main Photo URL, or None
+- user_photos: Latest CARD_GALLERY_PHOTOS Gallery Photo URLs
+
+Keys:
+- `profile:{user_id}` Hash of Card Field -> JSON-Encoded Value
+
+A Profile Edit Rewrites the One Hash (see profile_change_service.py) Instead of Every Pool Holding the Card,
+and Photo Uploads/Deletes Invalidate it.
+"""
+
+import json
+from datetime import timedelta
+
+from sqlalchemy import and_, func, or_
+
+from Backend.src.extensions import db, redis_client
+from Backend.src.models.photo import UserPhoto
+from Backend.src.models.user import User, UserSchema
+
+PROFILE_CARD_TTL = timedelta(hours=24) # Outlives a Swipe Pool, so Queued Cards Rarely Miss
+CARD_GALLERY_PHOTOS = 3 # Gallery Photos Embedded per Card
+
+
+def profile_card_key(user_id):
+    return f"profile:{user_id}"
+
+
+def card_photos(user_ids):
+    """
+    Photo URLs for Many Users in One Query - the Latest Main Photo and Latest Few Gallery Photos Each.
+
+    Parameters:
+        user_ids (list): The users to load photos for.
+
+    Returns:
+        dict: user_id -> {"main_photo": url or None, "user_photos": [url, ...]}, for every user_id given.
+    """
+    photos = {user_id: {"main_photo": None, "user_photos": []} for user_id in user_ids}
+    if not user_ids:
+        return photos
+
+    # Rank Each User's Main and Gallery Photos Newest First, then Keep the Head of Each
+    photo_rank = func.row_number().over(
+        partition_by=(UserPhoto.user_id, UserPhoto.is_main_photo),
+        order_by=(UserPhoto.upload_date.desc(), UserPhoto.id.desc()),
+    ).label("photo_rank")
+    ranked = (
+        db.session.query(UserPhoto.user_id, UserPhoto.url, UserPhoto.is_main_photo, photo_rank)
+        .filter(UserPhoto.user_id.in_(list(user_ids)))
+        .subquery()
+    )
+    rows = (
+        db.session.query(ranked.c.user_id, ranked.c.url, ranked.c.is_main_photo)
+        .filter(
+            or_(
+                and_(ranked.c.is_main_photo.is_(True), ranked.c.photo_rank == 1),
+                and_(ranked.c.is_main_photo.is_(False), ranked.c.photo_rank <= CARD_GALLERY_PHOTOS),
+            )
+        )
+        .order_by(ranked.c.user_id, ranked.c.photo_rank)
+        .all()
+    )
+
+    for user_id, url, is_main_photo in rows:
+        if is_main_photo:
+            photos[user_id]["main_photo"] = url
+        else:
+            photos[user_id]["user_photos"].append(url)
+    return photos
+
+
+def build_cards(users):
+    """
+    Serialize Users into Swipe Cards, with Photo URLs Batch-Loaded for All of Them.
+
+    Parameters:
+        users (list): User models, in the order the cards should be returned.
+
+    Returns:
+        list: Card dicts.
+    """
+    cards = UserSchema(many=True).dump(users)
+    photos = card_photos([card["id"] for card in cards])
+    for card in cards:
+        card.update(photos[card["id"]])
+    return cards
+
+
+class ProfileCardCache:
+    """
+    Reads and Writes Shared Profile Cards.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+
+    def cache_cards(self, cards, pipeline=None):
+        """
+        Write Cards to the Cache.
+
+        Parameters:
+            cards (list): Serialized users (UserSchema dumps).
+            pipeline (Pipeline, optional): Queue the writes on this pipeline instead of executing them.
+        """
+        own_pipeline = pipeline is None
+        if own_pipeline:
+            pipeline = self.redis.pipeline() # MULTI - Readers Never See a Card Between the Delete and the Write
+
+        for card in cards:
+            # Replace, Don't Merge - a Field Cleared on the Profile Must Clear on the Card
+            pipeline.delete(profile_card_key(card["id"]))
+            pipeline.hset(profile_card_key(card["id"]), mapping={field: json.dumps(value) for field, value in card.items()})
+            pipeline.expire(profile_card_key(card["id"]), PROFILE_CARD_TTL)
+
+        if own_pipeline:
+            pipeline.execute()
+
+    def get_cards(self, user_ids):
+        """
+        Hydrate Cards for a List of Users, Loading Any Missing from the Database.
+
+        Parameters:
+            user_ids (list): The users to hydrate.
+
+        Returns:
+            dict: user_id -> card, without users that no longer exist or were deleted.
+        """
+        if not user_ids:
+            return {}
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipeline.hgetall(profile_card_key(user_id))
+
+        cards = {}
+        for user_id, fields in zip(user_ids, pipeline.execute()):
+            if fields:
+                cards[user_id] = {field: json.loads(value) for field, value in fields.items()}
+
+        missing_ids = [user_id for user_id in user_ids if user_id not in cards]
+        if missing_ids:
+            cards.update(self._load_cards(missing_ids))
+        return cards
+
+    def invalidate(self, user_id):
+        try:
+            self.redis.delete(profile_card_key(user_id))
+        except Exception as e:
+            # The Card Still Expires on its TTL - Never Fail the Write Over It
+            print(f"Error invalidating profile card for user {user_id}: {str(e)}")
+
+    # -----Helpers-----
+
+    def _load_cards(self, user_ids):
+        users = User.query.filter(User.id.in_(user_ids), User.deleted.isnot(True)).all()
+        loaded = build_cards(users)
+        self.cache_cards(loaded)
+        return {card["id"]: card for card in loaded}
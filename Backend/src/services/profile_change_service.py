@@ -0,0 +1,203 @@
+"""Author: Joshua Ferguson
+
+Profile Change Events - Targeted Swipe Pool Invalidation
+
+Profile and Preference Writes (init_profile, update_profile, init_preferences, delete_user) Publish
+an Event to a Redis Stream. The Refill Worker Consumes it in a Consumer Group and Touches Only the
+Pools Affected, Instead of Waiting Out the 12 Hour Pool TTL:
+- The Changed User's Own Pool is Dropped (and Queued for Refill) When their Preferences or
+  Matching Attributes (Age, Gender, Location) Change - Who they Should See has Changed
+- The Changed User's Shared Profile Card (`profile:{user_id}`) is Rewritten Once, and Pools Showing
+  it (Found with the `swipe_pool:in:{user_id}` Reverse Index) Drop it When the Two Users No Longer
+  Match Each Other
+- A Deleted User's Card is Removed from Every Pool Showing it
+
+Keys:
+- `profile_changes` Stream of {user_id, kind, fields} Events (Approximately Capped at PROFILE_CHANGE_STREAM_MAXLEN)
+- Consumer Group `swipe_pool_invalidator` on the Stream
+"""
+
+import os
+import socket
+
+import redis
+
+from Backend.src.extensions import redis_client
+from Backend.src.services.geo_index_service import has_coordinates, haversine_km, max_distance_km
+from Backend.src.services.profile_card_service import ProfileCardCache, build_cards
+from Backend.src.services.swipe_pool_service import SwipePoolService, swipe_pool_in_key
+
+PROFILE_CHANGE_STREAM = "profile_changes"
+PROFILE_CHANGE_GROUP = "swipe_pool_invalidator"
+PROFILE_CHANGE_STREAM_MAXLEN = 100000
+PROFILE_CHANGE_BATCH = 100 # Events Read per Poll
+
+PROFILE_CHANGE_PROFILE = "profile"
+PROFILE_CHANGE_PREFERENCES = "preferences"
+PROFILE_CHANGE_DELETED = "deleted"
+
+# Fields Pool Generation Filters On - Changing Any of These Changes Who Matches Whom
+MATCHING_FIELDS = {"age", "gender", "state", "city", "latitude", "longitude"}
+
+
+def publish_profile_change(user_id, kind, fields=()):
+    """
+    Publish a Profile Change Event for the Swipe Pool Invalidator.
+
+    Parameters:
+        user_id (str): The user whose profile or preferences changed.
+        kind (str): PROFILE_CHANGE_PROFILE, PROFILE_CHANGE_PREFERENCES, or PROFILE_CHANGE_DELETED.
+        fields (iterable, optional): Names of the changed profile fields.
+    """
+    try:
+        redis_client.xadd(
+            PROFILE_CHANGE_STREAM,
+            {"user_id": user_id, "kind": kind, "fields": ",".join(sorted(fields))},
+            maxlen=PROFILE_CHANGE_STREAM_MAXLEN,
+            approximate=True,
+        )
+    except Exception as e:
+        # Pools Still Expire on their TTL - Never Fail the Profile Write Over the Event
+        print(f"Error publishing profile change for user {user_id}: {str(e)}")
+
+
+def users_match(user, preferences, other, other_preferences):
+    """
+    Whether Two Users Belong in Each Other's Swipe Pools - the Same Checks as generate_swipe_pool.
+
+    Parameters:
+        user (User), preferences (DatingPreference): One user and their preferences.
+        other (User), other_preferences (DatingPreference): The other user and their preferences.
+
+    Returns:
+        bool: True if each user is within the other's gender/age preferences and they're close enough.
+    """
+    if preferences is None or other_preferences is None or other.deleted:
+        return False
+    if None in (user.age, other.age):
+        return False
+
+    if has_coordinates(user) and has_coordinates(other):
+        nearby = float(haversine_km(user.latitude, user.longitude, other.latitude, other.longitude)) <= max_distance_km()
+    else:
+        nearby = user.state == other.state and user.city == other.city
+
+    return (
+        nearby
+        and preferences.interested_in in ("any", other.gender)
+        and other_preferences.interested_in in ("any", user.gender)
+        and preferences.age_preference_lower <= other.age <= preferences.age_preference_upper
+        and other_preferences.age_preference_lower <= user.age <= other_preferences.age_preference_upper
+    )
+
+
+class SwipePoolInvalidator:
+    """
+    Consumes Profile Change Events, Rewriting the Changed Card and Dropping it from Pools it No Longer Belongs In.
+    """
+
+    def __init__(self, consumer_name=None, redis_conn=None):
+        self.redis = redis_conn or redis_client
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.pool_service = SwipePoolService()
+        self.group_ready = False
+        self.pending_checked = False # Re-Handle Our Own Unacknowledged Events Once, After a Crash
+
+    def consume(self, count=PROFILE_CHANGE_BATCH):
+        """
+        Apply One Batch of Profile Change Events, Without Blocking.
+
+        Returns:
+            int: Number of events applied.
+        """
+        self._ensure_group()
+
+        events = []
+        if not self.pending_checked:
+            events = self._read("0", count)
+            if len(events) < count:
+                self.pending_checked = True
+        if not events:
+            events = self._read(">", count)
+
+        applied = 0
+        for event_id, event in events:
+            try:
+                self.apply(event["user_id"], event["kind"], set(filter(None, event.get("fields", "").split(","))))
+                applied += 1
+            except Exception as e:
+                # Acknowledged Anyway - the Pool TTL Still Bounds How Long a Missed Change Lingers
+                print(f"Error applying profile change {event_id}: {str(e)}")
+            self.redis.xack(PROFILE_CHANGE_STREAM, PROFILE_CHANGE_GROUP, event_id)
+
+        return applied
+
+    def apply(self, user_id, kind, fields):
+        """
+        Apply a Single Profile Change to the Swipe Pools it Affects.
+
+        Parameters:
+            user_id (str): The user whose profile changed.
+            kind (str): The kind of change (see publish_profile_change).
+            fields (set): Names of the changed profile fields.
+        """
+        from Backend.src.models.datingPreference import DatingPreference
+        from Backend.src.models.user import User
+
+        owner_ids = self.redis.smembers(swipe_pool_in_key(user_id))
+        user = User.query.get(user_id)
+
+        if kind == PROFILE_CHANGE_DELETED or user is None or user.deleted:
+            for owner_id in owner_ids:
+                self.pool_service.remove_card(owner_id, user_id)
+            self.pool_service.drop_swipe_pool(user_id)
+            ProfileCardCache().invalidate(user_id)
+            return
+
+        # Every Pool Reads the Card from Here - One Write Covers All of Them
+        ProfileCardCache().cache_cards(build_cards([user]))
+
+        matching_changed = kind == PROFILE_CHANGE_PREFERENCES or bool(fields & MATCHING_FIELDS)
+        if matching_changed:
+            # Their Own Pool was Built for Their Old Attributes
+            self.pool_service.drop_swipe_pool(user_id)
+            self.pool_service.schedule_refill(user_id)
+
+        if not owner_ids or not matching_changed:
+            return
+
+        # Drop the Card from Pools Whose Owner No Longer Matches
+        preferences = DatingPreference.query.filter_by(user_id=user_id).first()
+        owners = (
+            User.query.outerjoin(DatingPreference, DatingPreference.user_id == User.id)
+            .add_entity(DatingPreference)
+            .filter(User.id.in_(list(owner_ids)))
+            .all()
+        )
+        stale_owner_ids = set(owner_ids) - {owner.id for owner, _ in owners}
+        stale_owner_ids |= {
+            owner.id for owner, owner_preferences in owners
+            if not users_match(owner, owner_preferences, user, preferences)
+        }
+
+        for owner_id in stale_owner_ids:
+            self.pool_service.remove_card(owner_id, user_id)
+
+    # -----Helpers-----
+
+    def _read(self, start_id, count):
+        """Events After start_id - "0" for This Consumer's Unacknowledged Events, ">" for New Ones."""
+        response = self.redis.xreadgroup(
+            PROFILE_CHANGE_GROUP, self.consumer_name, {PROFILE_CHANGE_STREAM: start_id}, count=count
+        )
+        return response[0][1] if response else []
+
+    def _ensure_group(self):
+        if self.group_ready:
+            return
+        try:
+            self.redis.xgroup_create(PROFILE_CHANGE_STREAM, PROFILE_CHANGE_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self.group_ready = True
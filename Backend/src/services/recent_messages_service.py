@@ -0,0 +1,156 @@
+"""Author: Joshua Ferguson
+
+Recent Messages Ring Buffer - the Newest Messages of Each Match, Capped, in Redis
+
+Every Message Save (REST, Socket Chat, LLM Reply) LPUSHes the Message and LTRIMs to the Cap, so Chat History
+on Join Reads One List Instead of Querying messages. A Buffer Too Short for a Read is a Miss - the Read Falls
+Back to SQL and Refills It, Keeping Anything Pushed Meanwhile.
+
+Keys:
+- `match:{match_id}:recent` List of JSON Messages, Newest First, at Most RECENT_MESSAGES_LIMIT
+  (Plus the End Sentinel While the Whole Conversation Fits, so a Short Conversation Isn't a Miss Forever)
+
+messages Stays the Source of Truth - Buffers Expire After RECENT_MESSAGES_TTL Untouched, and Reads Sort by
+(message_date, id), so Pushes Landing Out of Order Still Read Back in Order. A Logged Message (Async Mode)
+is Buffered with the seq it was Logged With, Before it's Flushed - a Refill Replaces it with the Flushed Copy.
+"""
+
+import json
+from datetime import timezone
+
+import redis
+
+from Backend.src.extensions import redis_client
+
+RECENT_MESSAGES_LIMIT = 50 # Messages Kept per Match
+RECENT_MESSAGES_TTL = 7 * 24 * 60 * 60 # Seconds - a Quiet Match's Buffer Expires
+RECENT_MESSAGES_END = "END" # Tail Sentinel - the Buffer Holds the Whole Conversation
+
+
+def recent_messages_key(match_id):
+    return f"match:{match_id}:recent"
+
+
+def serialize_message(message):
+    """A Message as Buffered and Emitted to Chat Clients - Serialize Before Committing, Saving a Reload"""
+    message_date = message.message_date
+    if message_date.tzinfo is not None:
+        # message_date is Stored as Naive UTC - Match What's Read Back from SQL
+        message_date = message_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        "id": message.id,
+        "match_id": message.match_id,
+        "sender": message.messager_id,
+        "message": message.message_content,
+        "kind": message.kind,
+        "timestamp": message_date.isoformat(),
+        "seq": message.seq,
+    }
+
+
+class RecentMessages:
+    """
+    Maintains and Reads the Per-Match Recent Message Buffers.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+
+    def recent(self, match_id, limit):
+        """
+        The Newest Messages of a Match, from the Buffer - or SQL on a Miss, Refilling the Buffer.
+
+        Parameters:
+            match_id (int): The match ID.
+            limit (int): How many messages, at most RECENT_MESSAGES_LIMIT.
+
+        Returns:
+            list: Serialized messages (see serialize_message), newest first.
+        """
+        limit = min(limit, RECENT_MESSAGES_LIMIT)
+        try:
+            buffered, complete = self._read(match_id)
+            if complete or len(buffered) >= limit:
+                return buffered[:limit]
+        except Exception as e:
+            print(f"Error reading recent messages for match {match_id}: {str(e)}")
+
+        return self.fill(match_id)[:limit]
+
+    def push(self, message):
+        """
+        Buffer a Newly Saved Message. Called After the Message is Committed.
+
+        Parameters:
+            message (dict): The saved message, from serialize_message.
+        """
+        key = recent_messages_key(message["match_id"])
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.lpush(key, json.dumps(message))
+            pipeline.ltrim(key, 0, RECENT_MESSAGES_LIMIT - 1)
+            pipeline.expire(key, RECENT_MESSAGES_TTL)
+            pipeline.execute()
+        except Exception as e:
+            print(f"Error buffering message for match {message['match_id']}: {str(e)}")
+            # A Buffer Missing a Message Would Serve Stale History - Drop it so the Next Read Refills
+            try:
+                self.redis.delete(key)
+            except Exception:
+                pass
+
+    def fill(self, match_id):
+        """
+        Refill a Match's Buffer from SQL, Merged with Whatever was Pushed While SQL was Read.
+
+        Parameters:
+            match_id (int): The match ID.
+
+        Returns:
+            list: The buffered messages, newest first.
+        """
+        from Backend.src.models.model_helpers import MatchModelHelper
+
+        page = MatchModelHelper(match_id=match_id).get_messages_page(limit=RECENT_MESSAGES_LIMIT)
+        from_sql = [serialize_message(message) for message in page["messages"]]
+        key = recent_messages_key(match_id)
+
+        try:
+            with self.redis.pipeline() as pipeline:
+                # Optimistic - a Push Between the Read and the Write Aborts it, and the Buffer is Left for the Next Read
+                pipeline.watch(key)
+                pushed, _ = self._parse(pipeline.lrange(key, 0, -1))
+                merged = self._newest_first(pushed + from_sql)[:RECENT_MESSAGES_LIMIT]
+
+                entries = [json.dumps(message) for message in merged]
+                if not page["has_more"]:
+                    entries.append(RECENT_MESSAGES_END)
+
+                pipeline.multi()
+                pipeline.delete(key)
+                pipeline.rpush(key, *entries)
+                pipeline.ltrim(key, 0, RECENT_MESSAGES_LIMIT - 1)
+                pipeline.expire(key, RECENT_MESSAGES_TTL)
+                pipeline.execute()
+                return merged
+        except redis.WatchError:
+            pass
+        except Exception as e:
+            print(f"Error filling recent messages for match {match_id}: {str(e)}")
+        return from_sql
+
+    # -----Helpers-----
+
+    def _read(self, match_id):
+        """(Buffered Messages Newest First, Whether the Buffer Holds the Whole Conversation)"""
+        return self._parse(self.redis.lrange(recent_messages_key(match_id), 0, -1))
+
+    def _parse(self, entries):
+        complete = bool(entries) and entries[-1] == RECENT_MESSAGES_END
+        messages = [json.loads(entry) for entry in entries if entry != RECENT_MESSAGES_END]
+        return self._newest_first(messages), complete
+
+    @staticmethod
+    def _newest_first(messages):
+        unique = {message["id"]: message for message in messages}
+        return sorted(unique.values(), key=lambda message: (message["timestamp"], message["id"]), reverse=True)
@@ -0,0 +1,226 @@
+"""Author: Joshua Ferguson
+
+Stream Log Flusher - the Consumer Group Loop Behind the Write-Behind Logs (swipe_log_flusher.py, message_log_flusher.py)
+
+Drains a Redis Stream into Postgres in a Consumer Group:
+1. Read Up to batch_size Entries - Our Own Unacknowledged Ones First (After a Crash or a Failed Batch), then
+   Entries Another Flusher Left Idle for claim_idle_ms, then New Ones
+2. Write Them with the Subclass' _write - One Transaction per Batch
+3. XACK and XDEL the Batch
+
+A Batch is Acknowledged Only After its Commit, so a Crash Replays it - _write Must Make a Replay Harmless.
+If a Batch Fails, its Entries are Retried One by One:
+- If Postgres is Down, Nothing is Acknowledged, and the Flusher Backs Off and Retries
+- Otherwise a Failing Entry Stays Pending, Retried Each Batch, and Goes to the Dead Letter Stream
+  After max_attempts (requeue_dead_entries Puts it Back)
+
+Keys (Named by Each Subclass):
+- The Consumer Group on the Stream
+- attempts_key Hash of entry_id -> Failed Attempts, for Entries Still Pending
+- dead_stream Stream of Entries that Couldn't be Written, with the Error
+- metrics_key Hash - flushed_total, batches_total, retried_total, dead_lettered_total, flush_latency_ms_last
+"""
+
+import os
+import socket
+import time
+
+import redis
+from sqlalchemy import text
+
+from Backend.src.extensions import db, redis_client
+
+
+class StreamLogFlusher:
+    """
+    Flushes a Redis Stream Log to Postgres in Batches. Subclasses Name the Stream and its Keys and Implement _write.
+    """
+
+    name = "Stream Log Flusher" # For Logs
+    entry_name = "entries" # What One Entry Is, for Logs
+    stream = None
+    group = None
+    attempts_key = None
+    dead_stream = None
+    metrics_key = None
+    default_batch_size = 500 # Entries Written per Transaction
+    block_ms = 1000 # Longest an Entry Waits in the Log While Traffic is Low
+    claim_idle_ms = 60000 # Entries Read but Unacknowledged this Long Belong to a Dead Flusher
+    max_attempts = 5 # Failed Writes of One Entry Before it's Dead-Lettered
+    max_backoff_s = 30 # Longest Wait Between Retries While Postgres is Down
+
+    def __init__(self, app, batch_size=None, consumer_name=None, redis_conn=None):
+        """
+        Parameters:
+            app (Flask): The Flask App - Each Batch is Written in its Own App Context
+            batch_size (int, optional): Max Entries Written per Transaction - defaults to default_batch_size
+            consumer_name (str, optional): This Flusher's Name in the Consumer Group
+        """
+        self.app = app
+        self.batch_size = batch_size or self.default_batch_size
+        self.redis = redis_conn or redis_client
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.running = False
+        self.group_ready = False
+        self.pending_checked = False
+        self.backoff_s = 0 # Set While Postgres is Failing Every Write
+
+    def run(self):
+        """Flush Until Stopped."""
+        self.running = True
+        print(f"{self.name} Started - {self.consumer_name}, Batch Size {self.batch_size}")
+
+        while self.running:
+            try:
+                self.flush_once(block_ms=self.block_ms)
+            except redis.RedisError as e:
+                print(f"{self.name} Redis Error: {str(e)}")
+                time.sleep(1)
+            if self.backoff_s:
+                time.sleep(self.backoff_s)
+
+        print(f"{self.name} Stopped")
+
+    def stop(self):
+        self.running = False
+
+    def flush_once(self, block_ms=None):
+        """
+        Write One Batch of Logged Entries.
+
+        Parameters:
+            block_ms (int, optional): Block this long for new entries if none are waiting.
+
+        Returns:
+            int: Number of entries written (not counting dead-lettered ones).
+        """
+        self._ensure_group()
+        entries = self._next_batch(block_ms)
+        if not entries:
+            return 0
+
+        start = time.perf_counter()
+        failed = {}
+        try:
+            self._write(entries)
+        except Exception as e:
+            print(f"Error flushing {len(entries)} {self.entry_name}, retrying one by one: {str(e)}")
+            for entry in entries:
+                try:
+                    self._write([entry])
+                except Exception as entry_error:
+                    failed[entry[0]] = entry_error
+
+        # Nothing Went In and Postgres is Down - the Entries Aren't at Fault. Leave Them All Pending and Back Off
+        if failed and len(failed) == len(entries) and not self._database_up():
+            self.backoff_s = min(max(self.backoff_s * 2, 1), self.max_backoff_s)
+            self.pending_checked = False
+            print(f"{self.name} Backing Off {self.backoff_s} s - Every Write Failed")
+            return 0
+        self.backoff_s = 0
+
+        # Entries Still Failing are Retried with the Next Batch, Up to max_attempts
+        dead, retried = [], []
+        if failed:
+            pipeline = self.redis.pipeline()
+            for entry_id in failed:
+                pipeline.hincrby(self.attempts_key, entry_id, 1)
+            for entry_id, attempts in zip(failed, pipeline.execute()):
+                (dead if attempts >= self.max_attempts else retried).append(entry_id)
+            if retried:
+                self.pending_checked = False
+
+        done_ids = [entry_id for entry_id, _ in entries if entry_id not in retried]
+        pipeline = self.redis.pipeline()
+        for entry_id, entry in entries:
+            if entry_id in dead:
+                pipeline.xadd(self.dead_stream, {**entry, "entry_id": entry_id, "error": str(failed[entry_id])[:500]})
+        if done_ids:
+            pipeline.xack(self.stream, self.group, *done_ids)
+            pipeline.xdel(self.stream, *done_ids)
+            pipeline.hdel(self.attempts_key, *done_ids)
+        pipeline.hincrby(self.metrics_key, "flushed_total", len(entries) - len(failed))
+        pipeline.hincrby(self.metrics_key, "batches_total", 1)
+        pipeline.hincrby(self.metrics_key, "retried_total", len(retried))
+        pipeline.hincrby(self.metrics_key, "dead_lettered_total", len(dead))
+        pipeline.hset(self.metrics_key, "flush_latency_ms_last", int((time.perf_counter() - start) * 1000))
+        pipeline.execute()
+
+        if dead:
+            print(f"Dead-Lettered {len(dead)} {self.entry_name.title()} to {self.dead_stream}")
+        return len(entries) - len(failed)
+
+    # -----Helpers-----
+
+    def _write(self, entries):
+        """Write [(entry_id, entry), ...] to Postgres in One Transaction - Raising if Nothing Was Written."""
+        raise NotImplementedError
+
+    def _database_up(self):
+        with self.app.app_context():
+            try:
+                db.session.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                return False
+            finally:
+                db.session.remove()
+
+    def _next_batch(self, block_ms):
+        if not self.pending_checked:
+            entries = self._read("0", None)
+            if len(entries) < self.batch_size:
+                self.pending_checked = True
+            if entries:
+                return entries
+
+        _, claimed, *_ = self.redis.xautoclaim(
+            self.stream, self.group, self.consumer_name,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size,
+        )
+        # Entries Deleted While Pending Come Back Empty
+        claimed = [(entry_id, entry) for entry_id, entry in claimed if entry]
+        if claimed:
+            return claimed
+
+        return self._read(">", block_ms)
+
+    def _read(self, start_id, block_ms):
+        """Entries After start_id - "0" for This Consumer's Unacknowledged Entries, ">" for New Ones."""
+        response = self.redis.xreadgroup(
+            self.group, self.consumer_name, {self.stream: start_id}, count=self.batch_size, block=block_ms
+        )
+        return [(entry_id, entry) for entry_id, entry in response[0][1] if entry] if response else []
+
+    def _ensure_group(self):
+        if self.group_ready:
+            return
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self.group_ready = True
+
+
+def requeue_dead_entries(stream, dead_stream, redis_conn=None):
+    """
+    Move Dead-Lettered Entries Back onto their Log for Another Try, Once Whatever Failed Them is Fixed.
+
+    Parameters:
+        stream (str): The log - e.g. SWIPE_LOG_STREAM.
+        dead_stream (str): Its dead letter stream - e.g. SWIPE_LOG_DEAD_STREAM.
+
+    Returns:
+        int: Number of entries requeued.
+    """
+    redis_conn = redis_conn or redis_client
+    requeued = 0
+    for entry_id, entry in redis_conn.xrange(dead_stream):
+        logged = {key: value for key, value in entry.items() if key not in ("entry_id", "error")}
+        pipeline = redis_conn.pipeline()
+        pipeline.xadd(stream, logged)
+        pipeline.xdel(dead_stream, entry_id)
+        pipeline.execute()
+        requeued += 1
+    return requeued
@@ -0,0 +1,189 @@
+"""Author: Joshua Ferguson
+
+Per-User Swipe Exclusion Filter - "Already Swiped / Rejected Me"
+
+Replaces the Correlated NOT EXISTS Subqueries Against `swipes` During Pool Generation
+with an In-Memory Membership Check.
+
+A Swipe Row (swiper, swipee, result) Excludes:
+- swipee From the swiper's Pool, Always
+- swiper From the swipee's Pool, Once the Result is ACCEPTED or REJECTED
+
+Keys:
+- `swipe_exclusion:{user_id}` Set of Excluded user_ids (Exact)
+- `swipe_exclusion:{user_id}:bloom` Bloom Filter Bitmap, Only for Heavy Swipers (> BLOOM_THRESHOLD)
+- `swipe_exclusion:built` Marker Set Once Backfilled from `swipes` (Until Then, Pools Use SQL)
+
+Heavy Swipers are Checked Against the Bloom Filter (One GET of a Fixed-Size Bitmap)
+Instead of Loading their Whole Set. A False Positive Only Hides a Candidate from One Pool.
+"""
+
+import hashlib
+
+from Backend.src.extensions import redis_binary_client, redis_client
+
+SWIPE_EXCLUSION_BUILT_KEY = "swipe_exclusion:built"
+SWIPE_EXCLUSION_REBUILD_BATCH = 1000
+
+BLOOM_THRESHOLD = 5000 # Exclusion Set Size at which a User Gets a Bloom Filter
+BLOOM_BITS = 1 << 20 # 128 KB Bitmap - ~0.7% False Positives at 100k Swipes
+BLOOM_HASHES = 7
+
+
+def swipe_exclusion_key(user_id):
+    return f"swipe_exclusion:{user_id}"
+
+def swipe_exclusion_bloom_key(user_id):
+    return f"swipe_exclusion:{user_id}:bloom"
+
+
+def bloom_offsets(member):
+    """Bit Offsets for a Member - Double Hashing over One blake2b Digest."""
+    digest = hashlib.blake2b(member.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:], "big") | 1
+    return [(h1 + i * h2) % BLOOM_BITS for i in range(BLOOM_HASHES)]
+
+def bloom_contains(bitmap, member):
+    """Check a Member Against a Bitmap Read with GET (Redis Bit 0 is the High Bit of Byte 0)."""
+    for offset in bloom_offsets(member):
+        byte = offset >> 3
+        if byte >= len(bitmap) or not bitmap[byte] & (0x80 >> (offset & 7)):
+            return False
+    return True
+
+def build_bloom(members):
+    bitmap = bytearray(BLOOM_BITS // 8)
+    for member in members:
+        for offset in bloom_offsets(member):
+            bitmap[offset >> 3] |= 0x80 >> (offset & 7)
+    return bytes(bitmap)
+
+
+class SwipeExclusionFilter:
+    """
+    Maintains and Queries the Per-User Swipe Exclusion Sets.
+    """
+
+    def __init__(self, redis_conn=None, raw_redis_conn=None):
+        self.redis = redis_conn or redis_client
+        # Bloom Bitmaps are Binary - Read Them Without Response Decoding
+        self.raw_redis = raw_redis_conn or redis_binary_client
+
+    # -----Maintenance-----
+
+    def record_swipe(self, swiper_id, swipee_id, swipe_result):
+        """
+        Record a Swipe by swiper_id on swipee_id with the Pair's Resulting swipe_result.
+        Called Alongside SwipeProcessor.process_new_swipe.
+        """
+        self.record_swipes(swiper_id, {swipee_id: swipe_result})
+
+    def record_swipes(self, swiper_id, swipe_results):
+        """
+        Record Several Swipes by swiper_id in One Pipeline.
+
+        Parameters:
+            swiper_id (str): The user who swiped.
+            swipe_results (dict): swipee_id -> the pair's resulting swipe_result.
+        """
+        if not swipe_results:
+            return
+        try:
+            pipeline = self.redis.pipeline()
+            self._queue_exclusion(pipeline, swiper_id, *swipe_results)
+            for swipee_id, swipe_result in swipe_results.items():
+                if swipe_result in ("ACCEPTED", "REJECTED"):
+                    self._queue_exclusion(pipeline, swipee_id, swiper_id)
+            pipeline.scard(swipe_exclusion_key(swiper_id))
+            pipeline.exists(swipe_exclusion_bloom_key(swiper_id))
+            *_, swiper_exclusions, has_bloom = pipeline.execute()
+
+            # Promote to a Bloom Filter Once a User Becomes a Heavy Swiper
+            if swiper_exclusions > BLOOM_THRESHOLD and not has_bloom:
+                self._build_user_bloom(swiper_id)
+        except Exception as e:
+            # Exclusions are a Cache over `swipes` - Never Fail the Swipe Over Them
+            print(f"Error recording swipe exclusions for {swiper_id}: {str(e)}")
+
+    def rebuild(self):
+        """
+        Backfill Every User's Exclusion Set from the swipes Table.
+
+        Returns:
+            int: Number of swipe rows processed.
+        """
+        from Backend.src.models.swipe import Swipe
+
+        # Pools Fall Back to SQL While the Sets are Rebuilt from Scratch
+        self.redis.delete(SWIPE_EXCLUSION_BUILT_KEY)
+        for key in self.redis.scan_iter(match="swipe_exclusion:*", count=SWIPE_EXCLUSION_REBUILD_BATCH):
+            self.redis.delete(key)
+
+        processed = 0
+        rows = Swipe.query.with_entities(Swipe.swiper_id, Swipe.swipee_id, Swipe.swipe_result).yield_per(SWIPE_EXCLUSION_REBUILD_BATCH)
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for swiper_id, swipee_id, swipe_result in rows:
+            pipeline.sadd(swipe_exclusion_key(swiper_id), swipee_id)
+            if swipe_result in ("ACCEPTED", "REJECTED"):
+                pipeline.sadd(swipe_exclusion_key(swipee_id), swiper_id)
+            processed += 1
+            if processed % SWIPE_EXCLUSION_REBUILD_BATCH == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        # Heavy Swipers Get their Bloom Filters Up Front
+        for key in self.redis.scan_iter(match="swipe_exclusion:*", count=SWIPE_EXCLUSION_REBUILD_BATCH):
+            if key.endswith(":bloom") or key == SWIPE_EXCLUSION_BUILT_KEY:
+                continue
+            if self.redis.scard(key) > BLOOM_THRESHOLD:
+                self._build_user_bloom(key.split(":", 1)[1])
+
+        self.redis.set(SWIPE_EXCLUSION_BUILT_KEY, "1")
+        return processed
+
+    # -----Queries-----
+
+    def is_built(self):
+        return bool(self.redis.exists(SWIPE_EXCLUSION_BUILT_KEY))
+
+    def filter_candidates(self, user_id, candidate_ids):
+        """
+        Drop Candidates the User has Already Swiped on, or who have Rejected/Matched the User.
+
+        Parameters:
+            user_id (str): The user the pool is being generated for.
+            candidate_ids (set): Candidate user IDs.
+
+        Returns:
+            set: The remaining candidate IDs, or None if the filter can't answer (not built / Redis down).
+        """
+        try:
+            if not self.is_built():
+                return None
+
+            bitmap = self.raw_redis.get(swipe_exclusion_bloom_key(user_id))
+            if bitmap:
+                return {candidate_id for candidate_id in candidate_ids if not bloom_contains(bitmap, candidate_id)}
+
+            return set(candidate_ids) - self.redis.smembers(swipe_exclusion_key(user_id))
+
+        except Exception as e:
+            print(f"Error reading swipe exclusions for user {user_id}: {str(e)}")
+            return None
+
+    # -----Helpers-----
+
+    def _queue_exclusion(self, pipeline, user_id, *excluded_ids):
+        pipeline.sadd(swipe_exclusion_key(user_id), *excluded_ids)
+
+        # Keep an Existing Bloom Filter in Step with the Set
+        if self.redis.exists(swipe_exclusion_bloom_key(user_id)):
+            for excluded_id in excluded_ids:
+                for offset in bloom_offsets(excluded_id):
+                    pipeline.setbit(swipe_exclusion_bloom_key(user_id), offset, 1)
+
+    def _build_user_bloom(self, user_id):
+        members = self.redis.smembers(swipe_exclusion_key(user_id))
+        self.raw_redis.set(swipe_exclusion_bloom_key(user_id), build_bloom(members))
@@ -0,0 +1,105 @@
+"""Author: Joshua Ferguson
+
+Swipe Log Flusher - Runs as its Own Process (see scripts/swipe_log_flusher.py)
+
+Drains the Write-Behind Swipe Log (swipe_log_service.py) into `swipes` in a Consumer Group (see stream_flusher.py
+for the Read, Retry, Backoff and Dead Letter Loop) - Each Batch is Upserted with swipe_upsert in as Few Multi-Row
+Statements as Possible, Matches are Inserted for Any Pair Left ACCEPTED, and it's Committed in One Transaction.
+
+A Crash Replays a Batch - Harmless, the Upsert Leaves a Pair Unchanged When a Swipe is Applied Again. A Swipe that
+Keeps Failing (e.g. on a Since-Deleted User) is Dead-Lettered After SWIPE_FLUSH_MAX_ATTEMPTS
+(Redis_Utils --action requeue_dead_swipes Puts it Back).
+
+Keys:
+- Consumer Group `swipe_flusher` on `swipes:log`
+- `swipes:log:attempts` Hash of entry_id -> Failed Attempts, for Entries Still Pending
+- `swipes:log:dead` Stream of Entries that Couldn't be Written, with the Error
+- `swipes:log:metrics` Hash - flushed_total, batches_total, retried_total, dead_lettered_total, flush_latency_ms_last
+"""
+
+from datetime import datetime
+
+from Backend.src.extensions import db
+from Backend.src.services.stream_flusher import StreamLogFlusher
+from Backend.src.services.swipe_log_service import SWIPE_LOG_STREAM
+
+SWIPE_LOG_GROUP = "swipe_flusher"
+SWIPE_LOG_ATTEMPTS_KEY = "swipes:log:attempts"
+SWIPE_LOG_DEAD_STREAM = "swipes:log:dead"
+SWIPE_LOG_METRICS_KEY = "swipes:log:metrics"
+SWIPE_FLUSH_BATCH = 1000 # Entries Written per Transaction
+SWIPE_FLUSH_BLOCK_MS = 1000 # Longest a Swipe Waits in the Log While Traffic is Low
+SWIPE_FLUSH_CLAIM_IDLE_MS = 60000 # Entries Read but Unacknowledged this Long Belong to a Dead Flusher
+SWIPE_FLUSH_MAX_ATTEMPTS = 5 # Failed Writes of One Entry Before it's Dead-Lettered
+SWIPE_FLUSH_MAX_BACKOFF_S = 30 # Longest Wait Between Retries While Postgres is Down
+
+
+def swipe_waves(entries):
+    """
+    Split Log Entries into Waves with at Most One Swipe per Pair Each, Keeping Log Order Within a Pair -
+    One INSERT ... ON CONFLICT Can't Update the Same Row Twice.
+
+    Parameters:
+        entries (list): [(entry_id, {"swiper_id", "swipee_id", "swipe_result", "swipe_date"}), ...] in log order.
+
+    Returns:
+        list: Lists of swipe rows, to be upserted in order.
+    """
+    waves = []
+    pair_counts = {}
+    for _, entry in entries:
+        pair = frozenset((entry["swiper_id"], entry["swipee_id"]))
+        wave = pair_counts.get(pair, 0)
+        pair_counts[pair] = wave + 1
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append({
+            "swiper_id": entry["swiper_id"],
+            "swipee_id": entry["swipee_id"],
+            "swipe_result": entry["swipe_result"],
+            "swipe_date": datetime.fromisoformat(entry["swipe_date"]),
+        })
+    return waves
+
+
+class SwipeLogFlusher(StreamLogFlusher):
+    """
+    Flushes the Write-Behind Swipe Log to Postgres in Bulk.
+    """
+
+    name = "Swipe Log Flusher"
+    entry_name = "swipes"
+    stream = SWIPE_LOG_STREAM
+    group = SWIPE_LOG_GROUP
+    attempts_key = SWIPE_LOG_ATTEMPTS_KEY
+    dead_stream = SWIPE_LOG_DEAD_STREAM
+    metrics_key = SWIPE_LOG_METRICS_KEY
+    default_batch_size = SWIPE_FLUSH_BATCH
+    block_ms = SWIPE_FLUSH_BLOCK_MS
+    claim_idle_ms = SWIPE_FLUSH_CLAIM_IDLE_MS
+    max_attempts = SWIPE_FLUSH_MAX_ATTEMPTS
+    max_backoff_s = SWIPE_FLUSH_MAX_BACKOFF_S
+
+    def _write(self, entries):
+        """Upsert Entries and Insert Matches for Pairs they Leave ACCEPTED, in One Transaction."""
+        from Backend.src.models.match import Match
+        from Backend.src.models.swipe import swipe_upsert
+
+        with self.app.app_context():
+            try:
+                accepted = {} # swiper_id -> swipee_ids, for Pairs Left ACCEPTED
+                for wave in swipe_waves(entries):
+                    for swiper_id, swipee_id, swipe_result in db.session.execute(swipe_upsert(wave)):
+                        if swipe_result == "ACCEPTED":
+                            accepted.setdefault(swiper_id, set()).add(swipee_id)
+
+                # Usually Already Made When the Swipe Was Logged - Idempotent, and Covers a Lost liked_by Set
+                for swiper_id, swipee_ids in accepted.items():
+                    Match.insert_pairs(swiper_id, list(swipee_ids))
+
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
@@ -0,0 +1,68 @@
+"""Author: Joshua Ferguson
+
+Write-Behind Swipe Log
+
+With SWIPE_WRITE_BEHIND Enabled, a Swipe Never Touches Postgres in the Request (Unless it Makes a Match):
+1. The Mutual-Like Detector (mutual_like_service.py) Resolves it and Appends it to the `swipes:log` Stream, in One Script
+2. The Swipe Log Flusher (swipe_log_flusher.py) Drains the Stream into `swipes` in Bulk Upserts
+
+Mutual Likes are Detected in Redis, so Match Latency Doesn't Depend on the Flush Interval - a Right Swipe
+on Someone Who Already Liked You is ACCEPTED by the Script, and the Match is Written Straight Away.
+
+Keys:
+- `swipes:log` Stream of {swiper_id, swipee_id, swipe_result, swipe_date} Swipes as Sent, in Order
+
+Entries are Applied with the Same Resolving Upsert as a Direct Swipe (see swipe_upsert), so Replaying
+One After a Crash Leaves the Pair Unchanged - Delivery is At-Least-Once.
+"""
+
+from Backend.src.extensions import redis_client
+from Backend.src.services.mutual_like_service import MutualLikeDetector
+from Backend.src.utils import EnvManager
+
+SWIPE_LOG_STREAM = "swipes:log"
+
+
+class SwipeLog:
+    """
+    Appends Swipes to the Write-Behind Log, Resolving Mutual Likes in Redis.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+        self.detector = MutualLikeDetector(self.redis)
+
+    def is_enabled(self):
+        """Write-Behind is On When SWIPE_WRITE_BEHIND is Set and the liked_by Sets are Backfilled."""
+        if EnvManager().load_env_var("SWIPE_WRITE_BEHIND") not in ("1", "true", "True"):
+            return False
+        try:
+            return self.detector.is_built()
+        except Exception as e:
+            print(f"Error checking swipe log: {str(e)}")
+            return False
+
+    def append_many(self, swiper_id, swipe_results):
+        """
+        Log Swipes by One User and Resolve Each Pair, in One Pipeline.
+
+        Parameters:
+            swiper_id (str): The user who swiped.
+            swipe_results (dict): swipee_id -> PENDING (Right) or REJECTED (Left).
+
+        Returns:
+            dict: swipee_id -> the pair's resulting swipe_result, or None if Redis is unavailable
+                  (the caller then writes the swipes to Postgres directly).
+        """
+        if not swipe_results:
+            return {}
+        try:
+            return self.detector.resolve_swipes(swiper_id, swipe_results, log_stream=SWIPE_LOG_STREAM)
+        except Exception as e:
+            print(f"Error appending to swipe log, writing swipes directly: {str(e)}")
+            return None
+
+    def append(self, swiper_id, swipee_id, swipe_result):
+        """Log a Single Swipe - see append_many. Returns the Pair's Resulting swipe_result, or None."""
+        pair_results = self.append_many(swiper_id, {swipee_id: swipe_result})
+        return pair_results[swipee_id] if pair_results is not None else None
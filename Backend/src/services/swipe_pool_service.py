@@ -1,115 +1,232 @@
 """Author: Joshua Ferguson
 
 Service for Generating and Caching Potential Matches in a Redis DB, to be retrieved and used by the Client
-TODO - Testing and Validating Swipe Pool Generation and Cache
 
+Swipe Pools are Served Cache-First:
+- Warm: Cards are Read from `swipe_pool:{user_id}` in Redis (No SQL)
+- Low Water: When Fewer than SWIPE_POOL_LOW_WATER_MARK Cards are Left After a Page, the User is Queued for the Refill Worker
+- Cold Miss: The Pool is Generated Synchronously and Cached, then the Requested Page is Served from it
+
+Pagination is Keyset-Based with an Opaque Cursor (see encode_cursor):
+- Cache: Every Cached Card has a Fixed, Increasing Position (its Score). A Page is the Next `limit`
+  Cards Strictly After the Cursor's Position - Swipes Remove Cards and Refills Append Them, Neither
+  Moves Another Card, so Pages Never Repeat or Skip a Card
+- Database (Redis Down): Pages are Ordered by (created_at, id) Descending and Continue After the Cursor's Row
+
+Pools Hold Only Card user_ids - Cards are Hydrated per Page from the Shared `profile:{user_id}`
+Cache (see profile_card_service.py), so a Profile Lives Once in Redis However Many Pools Queue it.
+
+Keys:
+- `swipe_pool:{user_id}` Sorted Set of Card user_ids -> Position
+- `swipe_pool:{user_id}:seq` Position Counter (No TTL, so Positions Keep Increasing Across Regenerations)
+- `swipe_pool:{user_id}:served` Set of Served Card IDs Trimmed from the Pool, Still Excluded from Refills
+- `swipe_pool:positions` Sorted Set of user_id -> Last Position Served (Cursorless Requests Continue From Here)
+- `swipe_pool:in:{card_user_id}` Reverse Index - Set of user_ids Whose Pool Holds that Card (see profile_change_service.py)
 """
 
-import json, asyncio
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import joinedload
-from sqlalchemy import and_, exists, literal, not_, or_, select
+import base64
+import json
+import time
+from datetime import datetime, timedelta, timezone
 
+import redis
+from sqlalchemy import and_, exists, func, not_, or_
 
 from Backend.src.extensions import db, redis_client # Import the DB Instance
-from Backend.src.models.user import User, UserSchema
+from Backend.src.models.user import User
 from Backend.src.models.swipe import Swipe
-from Backend.src.models.datingPreference import DatingPreference  
-from datetime import datetime, timedelta
-
-SWIPE_POOL_ENSURED_SIZE = 100
-# TODO Add Pagination (Page and Page_Size) to Swipe Pool Generation
-# TODO Develop Match Scoring Algorithm for Swipe Pool Generation
-    # - Location Proximity
-    # - Age Proximity
-    # - Last Active
-    # - Interests
-    # - Profile Completeness
-    # - Profile Picture
+from Backend.src.models.datingPreference import DatingPreference
+from Backend.src.models.photo import UserPhoto
+from Backend.src.services.candidate_index_service import CandidateIndex
+from Backend.src.services.geo_index_service import GeoIndex
+from Backend.src.services.profile_card_service import ProfileCardCache, build_cards
+from Backend.src.services.swipe_exclusion_service import SwipeExclusionFilter
+from Backend.src.services.swipe_ranking_service import SwipeRanker, candidate_features
+from Backend.src.services.user_activity_service import UserActivity, active_window
+from Backend.src.services.user_snapshot_service import get_user_snapshot
+
+SWIPE_POOL_ENSURED_SIZE = 100 # Target Size of a Cached Pool After a Refill
+SWIPE_POOL_LOW_WATER_MARK = 20 # Refill in the Background Once the Cached Pool Drops Below This
+SWIPE_POOL_TTL = timedelta(hours=12)
+SWIPE_POOL_REFILL_QUEUE = "swipe_pool:refill_queue" # Sorted Set of user_id -> Enqueue Time
+SWIPE_POOL_READ_POSITIONS = "swipe_pool:positions" # Sorted Set of user_id -> Last Position Served
+CANDIDATE_BLOCK_SIZE = 2000 # Candidates Pulled and Scored per Generation (see swipe_ranking_service.py)
+CURSOR_SOURCE_CACHE = "cache"
+CURSOR_SOURCE_DATABASE = "db"
+KEYSET_EPOCH = datetime(1970, 1, 1) # Sort Key for Rows Missing created_at
+# TODO Extend Match Scoring (swipe_ranking_service.py) with Interests
 # END TODO
 
+
+# -----Redis Keys-----
+
+def swipe_pool_key(user_id):
+    """Redis Sorted Set of a User's Cached Card IDs, Scored by Position"""
+    return f"swipe_pool:{user_id}"
+
+def swipe_pool_seq_key(user_id):
+    """Redis Counter Handing Out Card Positions for a User's Pool"""
+    return f"swipe_pool:{user_id}:seq"
+
+def swipe_pool_served_key(user_id):
+    """Redis Set of Served Cards Trimmed from a User's Pool, Excluded From Refills Until it Expires"""
+    return f"swipe_pool:{user_id}:served"
+
+def swipe_pool_in_key(card_user_id):
+    """Redis Set of user_ids Whose Cached Pool Holds a User's Card"""
+    return f"swipe_pool:in:{card_user_id}"
+
+
 class SwipePoolService:
     """
     Service class for managing the swipe pool and potential matches for a user.
     """
 
-    def __init__(self):
-        pass
-        
-    async def ensure_swipe_pool(self, user_id):
+    def __init__(self, score_weights=None):
+        self.last_rows_scanned = 0 # Candidate Rows Read by the Last generate_swipe_pool Call
+        self.last_keyset = None # (created_at ISO, user_id) of the Last Row of the Last Keyset Page
+        self.ranker = SwipeRanker(score_weights)
+
+    def ensure_swipe_pool(self, user_id):
         """
-        Asynchronous background task to ensure the user's swipe pool remains at the desired size.
-        
+        Tops up the user's cached swipe pool to SWIPE_POOL_ENSURED_SIZE.
+        Called by the Refill Worker (see swipe_pool_worker.py) for Queued Users.
+
         Parameters:
             user_id (int): The ID of the user.
+
+        Returns:
+            int: The number of cards added to the cached pool.
         """
-        while True:
-            current_size = redis_client.llen(f"swipe_pool:{user_id}")
-            if current_size >= SWIPE_POOL_ENSURED_SIZE:
-                break
-            await self.generate_and_cache_swipe_pool(user_id, limit=(SWIPE_POOL_ENSURED_SIZE - current_size))
-            await asyncio.sleep(10)
-    
-    def generate_swipe_pool(self, user_id, limit=20):
+        position, current_size = self._remaining_after_read_position(user_id)
+        if current_size >= SWIPE_POOL_ENSURED_SIZE:
+            return 0
+
+        # Served Cards Leave the Pool at Refill Time, Keeping it Bounded
+        self._trim_served(user_id, position)
+        response = self.generate_and_cache_swipe_pool(user_id, limit=(SWIPE_POOL_ENSURED_SIZE - current_size))
+        return response["swipe_pool_cached"]
+
+    def schedule_refill(self, user_id):
+        """
+        Queue a Background Refill of the User's Swipe Pool for the Refill Worker.
+        The Queue is a Sorted Set Keyed by user_id, so a User is Never Queued Twice.
+
+        Parameters:
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if the user was queued, False if they were already waiting.
+        """
+        # ZADD NX Keeps the Original Enqueue Time, Preserving FIFO Order
+        return bool(redis_client.zadd(SWIPE_POOL_REFILL_QUEUE, {user_id: time.time()}, nx=True))
+
+    def generate_swipe_pool(self, user_id, limit=20, exclude_ids=None, keyset=False, after=None):
         """
         Generates the swipe pool and finds potential matches for the user.
-        
+
         Parameters:
             user_id (int): The ID of the user.
             limit (int, optional): The maximum number of potential matches to generate. Defaults to 20.
-        
+            exclude_ids (iterable, optional): User IDs to leave out, e.g. cards already cached or served.
+            keyset (bool, optional): Return a stable (created_at, id) Descending Page Instead of a Ranked Block -
+                Used when Paging Straight from Postgres. The Last Row's Position is Left in self.last_keyset.
+            after (tuple, optional): (created_at ISO string, user_id) to continue a keyset page after.
+
         Returns:
             list: A list of potential matches for the user.
         """
         print(f"\nGenerating swipe pool for user: {user_id}")
-        
-        current_user = User.query.get(user_id)
-        print(f"Current User: {current_user}")
-        print(f"Current User State: {current_user.state if current_user else 'None'}")
-        print(f"Current User City: {current_user.city if current_user else 'None'}")
 
+        current_user = User.query.get(user_id)
         if not current_user:
             print("Current User Not Found")
             return []
-         
+
         # Get current user's dating preferences
         current_user_preferences = DatingPreference.query.filter_by(user_id=user_id).first()
-        print(f"Current User Preferences: {current_user_preferences}")
         if not current_user_preferences:
             print("Current User Preferences Not Found")
             return []  # If user has no preferences set, return empty list
-        
-        active_date = datetime.now() - timedelta(weeks=2)
-        
-        # Exclude users swiped on by the current user (regardless of result) or involved in an "ACCEPTED" swipe
-        swipe_exclusion_exists = exists().where(
-            or_(
-                and_(Swipe.swiper_id == user_id, Swipe.swipee_id == User.id),
-                and_(Swipe.swiper_id == User.id, Swipe.swipee_id == user_id, Swipe.swipe_result == "ACCEPTED"),
+
+        # Dormant Accounts Stay Out of Pools
+        active_date = datetime.now(timezone.utc) - active_window()
+
+        # Users with Coordinates Match by Distance (Geo Index Ring Search) Instead of Exact State/City
+        distances = GeoIndex().nearby(current_user)
+        if distances is not None:
+            candidate_ids = set(distances)
+        else:
+            # Start from the Shared User Snapshot (NumPy Masks), Else the Candidate Index When Built -
+            # Primary Key Lookups Instead of a Table Scan
+            candidate_ids = get_user_snapshot().candidate_ids(current_user, current_user_preferences)
+            if candidate_ids is None:
+                candidate_ids = CandidateIndex().candidate_ids(current_user, current_user_preferences)
+        swipes_filtered = False
+        last_active = None
+        if candidate_ids is not None:
+            if exclude_ids:
+                candidate_ids -= set(exclude_ids)
+
+            # Keep Only Recently Active Candidates (users:last_online Score Range) When Backfilled
+            last_active = UserActivity().filter_active(candidate_ids, since=active_date)
+            if last_active is not None:
+                candidate_ids = set(last_active)
+
+            # Drop Already Swiped / Rejected-Me Candidates in Memory When the Exclusion Sets are Built
+            remaining_ids = SwipeExclusionFilter().filter_candidates(user_id, candidate_ids)
+            if remaining_ids is not None:
+                candidate_ids = remaining_ids
+                swipes_filtered = True
+
+            if not candidate_ids:
+                self.last_rows_scanned = 0
+                return []
+            base_query = User.query.filter(User.id.in_(list(candidate_ids)))
+            if distances is None:
+                # Location is Re-Checked so a Stale Snapshot/Index Entry Can't Leak Across Cities
+                base_query = base_query.filter(
+                    User.state == current_user.state,
+                    User.city == current_user.city,
+                )
+        else:
+            base_query = User.query.filter(
+                User.id != user_id,
+                User.state == current_user.state,  # Same City and State
+                User.city == current_user.city,
             )
-        ).correlate(User) 
-
-        
-        # Exclude users who have rejected the current user
-        current_user_rejected_exists = exists().where(
-                and_(
-                    Swipe.swiper_id == User.id,
-                    Swipe.swipee_id == user_id,
-                    Swipe.swipe_result == "REJECTED"
+
+            # Leave Out Cards Already Sitting in the User's Cache or Already Served
+            if exclude_ids:
+                base_query = base_query.filter(User.id.notin_(list(exclude_ids)))
+
+        if last_active is None:
+            # last_online is Stored as Naive UTC
+            base_query = base_query.filter(User.last_online >= active_date.replace(tzinfo=None))
+
+        if not swipes_filtered:
+            # Exclude users swiped on by the current user (regardless of result) or involved in an "ACCEPTED" swipe
+            swipe_exclusion_exists = exists().where(
+                or_(
+                    and_(Swipe.swiper_id == user_id, Swipe.swipee_id == User.id),
+                    and_(Swipe.swiper_id == User.id, Swipe.swipee_id == user_id, Swipe.swipe_result == "ACCEPTED"),
                 )
-        ).correlate(User) 
-            
-        # Base query for potential matches
-        base_query = User.query.filter(
-            User.id != user_id,
-            User.state == current_user.state,  # Same City and State
-            User.city == current_user.city, # Exclude users the current user has swiped on
-            not_(swipe_exclusion_exists),          #Exclude users who rejected the current use
-            not_(current_user_rejected_exists)    # Exclude users with "ACCEPTED" result
-        )
-        
-        print(str(base_query.statement.compile(compile_kwargs={"literal_binds": True})))
- 
+            ).correlate(User)
+
+            # Exclude users who have rejected the current user
+            current_user_rejected_exists = exists().where(
+                    and_(
+                        Swipe.swiper_id == User.id,
+                        Swipe.swipee_id == user_id,
+                        Swipe.swipe_result == "REJECTED"
+                    )
+            ).correlate(User)
+
+            base_query = base_query.filter(
+                not_(swipe_exclusion_exists),          # Exclude users the current user has swiped on
+                not_(current_user_rejected_exists)    # Exclude users who rejected the current user
+            )
+
         # Filtered Query for potential matches with Additional Dating Preferences
         filtered_query = base_query.join(DatingPreference, DatingPreference.user_id == User.id).filter(
             or_(
@@ -125,91 +242,303 @@ class SwipePoolService:
             DatingPreference.age_preference_lower <= current_user.age,
             DatingPreference.age_preference_upper >= current_user.age
         )
-        
-        # Barb - PENDING
-        # Paula PENDING
-        #Brittany - PENDING
-        #Angela - PENDING
-        # Kristina - PENDING
-        # Bar Cohen
-        
-        print(str(base_query))
-        print(str(filtered_query))
 
-        # Fetch Results from Filtered Query with Limit
-        potential_matches = filtered_query.limit(limit).all()
-        print(f"\nPotential Matches Found: {len(potential_matches)}")
-        for match in potential_matches:
-            print(f"Match: {match.name} (ID: {match.id}, Age: {match.age}, Gender: {match.gender})")
+        if keyset:
+            potential_matches = self._keyset_page(filtered_query, limit, after)
+            print(f"Potential Matches Found: {len(potential_matches)} (Keyset Page)")
+            return build_cards(potential_matches)
+
+        # Pull a Block of Candidates as Columns, Score Them in One Vectorized Pass, and Keep the Top-k
+        candidate_block = filtered_query.with_entities(
+            User.id, User.state, User.city, User.age, User.last_online,
+            User.name, User.bio, User.gender,
+            exists().where(UserPhoto.user_id == User.id, UserPhoto.is_main_photo.is_(True)).label("has_photo"),
+        ).limit(CANDIDATE_BLOCK_SIZE).all()
+        self.last_rows_scanned = len(candidate_block)
+
+        ranked_ids = self.rank_candidates(candidate_block, current_user, limit, last_active, distances)
 
-        # Serialize and Return List of Potential Matches (Users)
-        schema_populated = UserSchema(many=True).dump(potential_matches)
-        return schema_populated
+        # Load the Chosen Profiles and Put Them Back in Ranked Order
+        users_by_id = {user.id: user for user in User.query.filter(User.id.in_(ranked_ids)).all()} if ranked_ids else {}
+        potential_matches = [users_by_id[ranked_id] for ranked_id in ranked_ids if ranked_id in users_by_id]
+        print(f"Potential Matches Found: {len(potential_matches)} (Ranked from {len(candidate_block)} Candidates)")
+
+        # Serialize and Return List of Potential Matches (Users), with their Photo URLs Batch-Loaded
+        return build_cards(potential_matches)
+
+    def rank_candidates(self, candidate_block, current_user, limit, last_active=None, distances=None):
+        """
+        Score a Block of Candidate Rows and Return the Best `limit` IDs, Best First.
 
+        Parameters:
+            candidate_block (list): Candidate rows (see candidate_features for the columns).
+            current_user (User): The user the pool is being generated for.
+            limit (int): Number of candidates to keep.
+            last_active (dict, optional): user_id -> last online epoch seconds from users:last_online.
+            distances (dict, optional): user_id -> distance in km from the geo index.
 
+        Returns:
+            list: Candidate user IDs in ranked order.
+        """
+        if not candidate_block:
+            return []
 
+        candidate_ids, features = candidate_features(candidate_block, current_user, last_active, distances)
+        scores = self.ranker.score(features, now=time.time())
+        return [candidate_ids[index] for index in self.ranker.top_k(scores, limit)]
 
-    async def cache_swipe_pool(self, user_id, swipe_pool):
+    def cache_swipe_pool(self, user_id, swipe_pool):
         """
-        Caches the pre-computed potential swipes in Redis.
-        
+        Appends pre-computed potential swipes to the user's cached pool in Redis.
+
         Parameters:
             user_id (int): The ID of the user.
-            swipe_pool (list): The list of potential swipes to cache.
+            swipe_pool (list): The list of potential swipes to cache, in the order they should be served.
         """
+        if not swipe_pool:
+            return
+
+        # Reserve a Block of Positions After Everything Already Queued - INCRBY Keeps Concurrent Refills Disjoint
+        last_position = redis_client.incrby(swipe_pool_seq_key(user_id), len(swipe_pool))
+        first_position = last_position - len(swipe_pool) + 1
+
         pipeline = redis_client.pipeline()
-        
-        for match in swipe_pool:
-            pipeline.lpush(f"swipe_pool:{user_id}", json.dumps(match))
-            
-        pipeline.expire(f"swipe_pool:{user_id}", timedelta(hours=12))
-        
-        await asyncio.to_thread(pipeline.execute)
-    
-    async def generate_and_cache_swipe_pool(self, user_id, limit=20):
+
+        # NX - a Card Already Queued Keeps its Original Position, so Open Cursors Never See it Twice
+        pipeline.zadd(
+            swipe_pool_key(user_id),
+            {card["id"]: first_position + offset for offset, card in enumerate(swipe_pool)},
+            nx=True,
+        )
+        pipeline.expire(swipe_pool_key(user_id), SWIPE_POOL_TTL)
+
+        # The Freshly Generated Cards Refresh the Shared Profile Cache
+        ProfileCardCache().cache_cards(swipe_pool, pipeline=pipeline)
+
+        # Reverse Index so a Profile Change Can Find Every Pool Showing the Card
+        for card in swipe_pool:
+            pipeline.sadd(swipe_pool_in_key(card["id"]), user_id)
+            pipeline.expire(swipe_pool_in_key(card["id"]), SWIPE_POOL_TTL)
+
+        pipeline.execute()
+
+    def generate_and_cache_swipe_pool(self, user_id, limit=20):
         """
         Generates and caches the potential matches for the user.
-        
+
         Parameters:
             user_id (int): The ID of the user.
             limit (int, optional): The maximum number of potential matches to generate. Defaults to 20.
-        
+
         Returns:
             dict: A dictionary containing the status of the operation and the number of cached potential matches.
         """
-        swipe_pool = self.generate_swipe_pool(user_id, limit=limit)
-        if swipe_pool:
-            await self.cache_swipe_pool(user_id, swipe_pool)
-            
+        swipe_pool = self.generate_swipe_pool(user_id, limit=limit, exclude_ids=self._queued_and_served_ids(user_id))
+        self.cache_swipe_pool(user_id, swipe_pool)
+
         response = {"status": "success", "swipe_pool_cached": len(swipe_pool)}
-        
+
         return response
-    
-    async def get_swipe_pool(self, user_id, limit=20):
+
+    def get_swipe_pool(self, user_id, limit=20, cursor=None):
         """
-        Retrieves the swipe pool for the user.
-        
+        Retrieves a page of the swipe pool for the user, Cache-First.
+
+        Pages are Read, Not Popped: a Page Continues Strictly After the Cursor's Position, so Swipes
+        (Which Remove Cards) and Refills (Which Append Cards) Never Shift What the Next Page Returns.
+
         Parameters:
             user_id (int): The ID of the user.
             limit (int, optional): The maximum number of users to retrieve from the swipe pool. Defaults to 20.
-        
+            cursor (str, optional): The next_cursor of the previous page. Without one, the page continues
+                from the last card served to the user.
+
+        Returns:
+            dict: A dictionary containing the swipe pool page, where it was served from
+                  ("cache", "generated", or "database" when Redis is unavailable), and the next_cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        position = decode_cursor(cursor)
+
+        try:
+            # A Database Cursor (Issued While Redis was Down) Starts the Cached Pool Over
+            after = position["s"] if position and position["src"] == CURSOR_SOURCE_CACHE else None
+            page, remaining = self._read_cached_page(user_id, limit, after)
+
+            source = "cache"
+            if not page and remaining == 0:
+                # Cold Miss - Generate a Full Pool Now, Cache it, and Serve the First Page of it
+                generated = self.generate_swipe_pool(
+                    user_id,
+                    limit=limit + SWIPE_POOL_ENSURED_SIZE,
+                    exclude_ids=self._queued_and_served_ids(user_id),
+                )
+                self.cache_swipe_pool(user_id, generated)
+                page, remaining = self._read_cached_page(user_id, limit, after)
+                source = "generated"
+
+        except redis.RedisError as e:
+            # Redis Unavailable - Page Straight from Postgres, Uncached
+            print(f"Swipe pool cache unavailable, falling back to database: {str(e)}")
+            keyset_after = (position["s"], position["id"]) if position and position["src"] == CURSOR_SOURCE_DATABASE else None
+            swipe_pool = self.generate_swipe_pool(user_id, limit, keyset=True, after=keyset_after)
+            next_cursor = encode_cursor(CURSOR_SOURCE_DATABASE, *self.last_keyset) if swipe_pool else None
+            return {"swipe_pool": swipe_pool, "source": "database", "next_cursor": next_cursor}
+
+        # Top Up in the Background Before the User Runs Dry
+        if remaining < SWIPE_POOL_LOW_WATER_MARK:
+            self.schedule_refill(user_id)
+
+        swipe_pool = [card for card, _ in page]
+        next_cursor = None
+        if page:
+            last_card, last_position = page[-1]
+            next_cursor = encode_cursor(CURSOR_SOURCE_CACHE, last_position, last_card["id"])
+            self._mark_served(user_id, last_position)
+
+        return {"swipe_pool": swipe_pool, "source": source, "next_cursor": next_cursor}
+
+    def remove_card(self, user_id, card_user_id):
+        """Drop a Card (Swiped, or No Longer a Match) from the User's Cached Pool (Positions of Other Cards Don't Move)."""
+        self.remove_cards(user_id, [card_user_id])
+
+    def remove_cards(self, user_id, card_user_ids):
+        """Drop Several Cards from the User's Cached Pool in One Pipeline."""
+        if not card_user_ids:
+            return
+        try:
+            pipeline = redis_client.pipeline()
+            pipeline.zrem(swipe_pool_key(user_id), *card_user_ids)
+            for card_user_id in card_user_ids:
+                pipeline.srem(swipe_pool_in_key(card_user_id), user_id)
+            pipeline.execute()
+        except redis.RedisError as e:
+            print(f"Error removing cards from swipe pool: {str(e)}")
+
+    def drop_swipe_pool(self, user_id):
+        """
+        Discard a User's Cached Cards (e.g. After their Preferences Change). The Position Counter and
+        Served Set are Kept, so Open Cursors Continue into the Regenerated Pool Without Repeats.
+        """
+        card_ids = redis_client.zrange(swipe_pool_key(user_id), 0, -1)
+
+        pipeline = redis_client.pipeline()
+        for card_id in card_ids:
+            pipeline.srem(swipe_pool_in_key(card_id), user_id)
+        pipeline.delete(swipe_pool_key(user_id))
+        pipeline.execute()
+
+    # -----Helpers-----
+
+    def _read_cached_page(self, user_id, limit, after):
+        """
+        Read up to `limit` Cards Positioned Strictly After `after` (Default: the User's Last Served Position).
+
         Returns:
-            dict: A dictionary containing the swipe pool for the user.
+            tuple: (list of (card, position), number of cards queued after the page)
+        """
+        if after is None:
+            after = redis_client.zscore(SWIPE_POOL_READ_POSITIONS, user_id) or 0
+
+        ids_and_positions = redis_client.zrangebyscore(
+            swipe_pool_key(user_id), f"({after}", "+inf", start=0, num=limit, withscores=True
+        )
+        if not ids_and_positions:
+            return [], 0
+
+        remaining = redis_client.zcount(swipe_pool_key(user_id), f"({ids_and_positions[-1][1]}", "+inf")
+        cards = ProfileCardCache().get_cards([card_id for card_id, _ in ids_and_positions])
+
+        page = [
+            (cards[card_id], int(position))
+            for card_id, position in ids_and_positions
+            if card_id in cards # Deleted Since it was Queued
+        ]
+        return page, remaining
+
+    def _mark_served(self, user_id, position):
+        """Advance the User's Read Position (GT - Never Moves Backwards when Pages are Re-Read)."""
+        try:
+            redis_client.zadd(SWIPE_POOL_READ_POSITIONS, {user_id: position}, gt=True)
+        except redis.RedisError as e:
+            print(f"Error recording swipe pool read position: {str(e)}")
+
+    def _remaining_after_read_position(self, user_id):
+        position = redis_client.zscore(SWIPE_POOL_READ_POSITIONS, user_id) or 0
+        return position, redis_client.zcount(swipe_pool_key(user_id), f"({position}", "+inf")
+
+    def _trim_served(self, user_id, position):
+        """
+        Move Cards at or Before the Read Position (Seen but Not Swiped) Out of the Pool, Keeping Only
+        their IDs in the Served Set so Refills Don't Serve Them Again.
         """
+        served_ids = redis_client.zrangebyscore(swipe_pool_key(user_id), "-inf", position)
+        if served_ids:
+            pipeline = redis_client.pipeline()
+            pipeline.sadd(swipe_pool_served_key(user_id), *served_ids)
+            pipeline.expire(swipe_pool_served_key(user_id), SWIPE_POOL_TTL)
+            pipeline.zrem(swipe_pool_key(user_id), *served_ids)
+            for served_id in served_ids:
+                pipeline.srem(swipe_pool_in_key(served_id), user_id)
+            pipeline.execute()
+
+    def _queued_and_served_ids(self, user_id):
+        """IDs Currently Queued in the User's Cached Pool or Already Served and Trimmed from it."""
         pipeline = redis_client.pipeline()
-        
-        pipeline.lrange(f"swipe_pool:{user_id}", 0, limit - 1)
-        result = await asyncio.to_thread(pipeline.execute)
-        
-        selected_swipe_pool = [json.loads(user) for user in result[0]] if result[0] else []
-        
-        pipeline.ltrim(f"swipe_pool:{user_id}", limit, -1)  
-        await asyncio.to_thread(pipeline.execute)
-        
-        if user_id not in self.background_tasks:
-            self.background_tasks.add(user_id)
-            asyncio.create_task(self.ensure_swipe_pool(user_id))
-        
-        return {"swipe_pool": selected_swipe_pool}
+        pipeline.zrange(swipe_pool_key(user_id), 0, -1)
+        pipeline.smembers(swipe_pool_served_key(user_id))
+        queued, served = pipeline.execute()
+
+        return set(queued) | set(served)
+
+    def _keyset_page(self, filtered_query, limit, after):
+        """One Page of Candidates in Stable (created_at, id) Descending Order, Continuing After `after`."""
+        created_at = func.coalesce(User.created_at, KEYSET_EPOCH)
+        query = filtered_query
+        if after is not None:
+            after_created_at, after_id = datetime.fromisoformat(after[0]), after[1]
+            query = query.filter(
+                or_(created_at < after_created_at, and_(created_at == after_created_at, User.id < after_id))
+            )
+
+        rows = query.add_columns(created_at.label("keyset_created_at")).order_by(
+            created_at.desc(), User.id.desc()
+        ).limit(limit).all()
+        self.last_rows_scanned = len(rows)
 
+        if rows:
+            last_user, last_created_at = rows[-1]
+            self.last_keyset = (last_created_at.isoformat(), last_user.id)
+        return [user for user, _ in rows]
 
+
+# -----Cursors-----
+
+def encode_cursor(source, position, user_id):
+    """Opaque Page Cursor: the Source it Pages, the Last Position (Score) Served, and that Card's User ID"""
+    payload = json.dumps({"src": source, "s": position, "id": user_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """
+    Parameters:
+        cursor (str): A cursor from encode_cursor, or None.
+
+    Returns:
+        dict: {"src", "s", "id"}, or None if no cursor was given.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if position["src"] not in (CURSOR_SOURCE_CACHE, CURSOR_SOURCE_DATABASE) or position["id"] is None:
+            raise ValueError("Unknown cursor source")
+        return position
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
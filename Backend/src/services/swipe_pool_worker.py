@@ -0,0 +1,186 @@
+"""Author: Joshua Ferguson
+
+Swipe Pool Refill Worker - Runs as its Own Process (see scripts/swipe_pool_worker.py)
+
+The API only Queues Users whose Cached Pool Ran Low (SwipePoolService.schedule_refill).
+This Worker Drains the Queue in Batches and Refills Each User's Pool on a Bounded
+Thread Pool, One Thread per Pooled DB Connection.
+
+Queue:
+- `swipe_pool:refill_queue` Sorted Set of user_id -> Enqueue Time (ZADD NX, so No Duplicates)
+
+Metrics (Hash `swipe_pool:metrics`):
+- refills_total, refill_errors_total, cards_cached_total
+- refill_latency_ms_last, refill_latency_ms_total
+- rows_scanned_last, rows_scanned_total
+- Queue Depth is Read Live with ZCARD
+
+Between Batches the Worker also Refreshes the Shared User Snapshot (user_snapshot_service.py)
+Every snapshot_refresh_interval Seconds - it is the Snapshot's Single Writer - and Applies
+Pending Profile Change Events to the Pools they Affect (profile_change_service.py).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Backend.src.extensions import db, redis_client
+from Backend.src.services.profile_change_service import SwipePoolInvalidator
+from Backend.src.services.swipe_pool_service import SWIPE_POOL_REFILL_QUEUE, SwipePoolService
+from Backend.src.services.user_snapshot_service import UserSnapshot
+
+SWIPE_POOL_METRICS_KEY = "swipe_pool:metrics"
+REFILL_BATCH_SIZE = 50 # Users Popped from the Queue per Batch
+REFILL_QUEUE_POLL_TIMEOUT = 5 # Seconds to Block Waiting for Work
+USER_SNAPSHOT_REFRESH_INTERVAL = 30 # Seconds Between Incremental User Snapshot Refreshes
+
+
+def get_refill_metrics():
+    """
+    Current Refill Worker Metrics, Including Live Queue Depth and Averages.
+
+    Returns:
+        dict: Metric name -> value
+    """
+    pipeline = redis_client.pipeline()
+    pipeline.zcard(SWIPE_POOL_REFILL_QUEUE)
+    pipeline.hgetall(SWIPE_POOL_METRICS_KEY)
+    queue_depth, raw_metrics = pipeline.execute()
+
+    metrics = {field: float(value) for field, value in raw_metrics.items()}
+    refills = metrics.get("refills_total", 0)
+
+    metrics["queue_depth"] = queue_depth
+    metrics["refill_latency_ms_avg"] = (metrics.get("refill_latency_ms_total", 0) / refills) if refills else 0
+    metrics["rows_scanned_avg"] = (metrics.get("rows_scanned_total", 0) / refills) if refills else 0
+    return metrics
+
+
+class SwipePoolRefillWorker:
+    """
+    Drains the Swipe Pool Refill Queue, Refilling Many Users' Pools at Once.
+    """
+
+    def __init__(self, app, db_connections=4, batch_size=REFILL_BATCH_SIZE, snapshot_refresh_interval=USER_SNAPSHOT_REFRESH_INTERVAL):
+        """
+        Parameters:
+            app (Flask): The Flask App - Each Refill Runs in its Own App Context
+            db_connections (int): Max Concurrent Refills, Should Match the Process' DB Pool Size
+            batch_size (int): Max Users Popped from the Queue per Batch
+            snapshot_refresh_interval (int): Seconds Between User Snapshot Refreshes, 0 Disables
+        """
+        self.app = app
+        self.db_connections = db_connections
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(max_workers=db_connections, thread_name_prefix="swipe-pool-refill")
+        self.running = False
+
+        self.snapshot_refresh_interval = snapshot_refresh_interval
+        self.user_snapshot = UserSnapshot(writable=True) if snapshot_refresh_interval else None
+        self.next_snapshot_refresh = 0
+
+        self.invalidator = SwipePoolInvalidator()
+
+    def run(self):
+        """Process Batches Until Stopped."""
+        self.running = True
+        print(f"Swipe Pool Refill Worker Started - {self.db_connections} DB Connections, Batch Size {self.batch_size}")
+        try:
+            while self.running:
+                self.refresh_user_snapshot()
+                self.apply_profile_changes()
+                self.run_once()
+        finally:
+            self.executor.shutdown(wait=True)
+            print("Swipe Pool Refill Worker Stopped")
+
+    def stop(self):
+        self.running = False
+
+    def run_once(self, timeout=REFILL_QUEUE_POLL_TIMEOUT):
+        """
+        Pop One Batch of Users and Refill Their Pools Concurrently.
+
+        Returns:
+            int: Number of users processed.
+        """
+        user_ids = self.pop_batch(timeout)
+        if not user_ids:
+            return 0
+
+        # Bounded by the Executor - Never More Refills in Flight than DB Connections
+        results = list(self.executor.map(self.refill_user, user_ids))
+
+        print(f"Refilled {sum(1 for ok in results if ok)}/{len(user_ids)} Swipe Pools - Queue Depth {redis_client.zcard(SWIPE_POOL_REFILL_QUEUE)}")
+        return len(user_ids)
+
+    def refresh_user_snapshot(self):
+        """Apply Changed Users to the Shared User Snapshot, at Most Once per Interval."""
+        if self.user_snapshot is None or time.monotonic() < self.next_snapshot_refresh:
+            return
+
+        self.next_snapshot_refresh = time.monotonic() + self.snapshot_refresh_interval
+        with self.app.app_context():
+            try:
+                changed = self.user_snapshot.refresh()
+                if changed:
+                    print(f"User Snapshot Refreshed - {changed} Users Updated")
+            except Exception as e:
+                print(f"Error refreshing user snapshot: {str(e)}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def apply_profile_changes(self):
+        """Patch or Drop the Swipe Pools Affected by Pending Profile Change Events."""
+        with self.app.app_context():
+            try:
+                applied = self.invalidator.consume()
+                if applied:
+                    print(f"Applied {applied} Profile Changes to Swipe Pools")
+            except Exception as e:
+                print(f"Error applying profile changes: {str(e)}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def pop_batch(self, timeout):
+        """Block for the First Queued User, then Take up to batch_size - 1 More Without Blocking."""
+        first = redis_client.bzpopmin(SWIPE_POOL_REFILL_QUEUE, timeout=timeout)
+        if not first:
+            return []
+
+        _, user_id, _ = first
+        rest = redis_client.zpopmin(SWIPE_POOL_REFILL_QUEUE, self.batch_size - 1) if self.batch_size > 1 else []
+        return [user_id] + [queued_user_id for queued_user_id, _ in rest]
+
+    def refill_user(self, user_id):
+        """
+        Refill a Single User's Pool and Record Latency / Rows Scanned.
+
+        Returns:
+            bool: True on success, False if the refill failed.
+        """
+        with self.app.app_context():
+            pool_service = SwipePoolService()
+            start = time.perf_counter()
+            try:
+                cards_cached = pool_service.ensure_swipe_pool(user_id)
+            except Exception as e:
+                print(f"Error refilling swipe pool for user {user_id}: {str(e)}")
+                db.session.rollback()
+                redis_client.hincrby(SWIPE_POOL_METRICS_KEY, "refill_errors_total", 1)
+                return False
+            finally:
+                db.session.remove() # Return the Connection to the Pool
+
+            latency_ms = (time.perf_counter() - start) * 1000
+
+            pipeline = redis_client.pipeline()
+            pipeline.hincrby(SWIPE_POOL_METRICS_KEY, "refills_total", 1)
+            pipeline.hincrby(SWIPE_POOL_METRICS_KEY, "cards_cached_total", cards_cached)
+            pipeline.hset(SWIPE_POOL_METRICS_KEY, "refill_latency_ms_last", round(latency_ms, 3))
+            pipeline.hincrbyfloat(SWIPE_POOL_METRICS_KEY, "refill_latency_ms_total", latency_ms)
+            pipeline.hset(SWIPE_POOL_METRICS_KEY, "rows_scanned_last", pool_service.last_rows_scanned)
+            pipeline.hincrby(SWIPE_POOL_METRICS_KEY, "rows_scanned_total", pool_service.last_rows_scanned)
+            pipeline.execute()
+            return True
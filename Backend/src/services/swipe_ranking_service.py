@@ -0,0 +1,165 @@
+"""Author: Joshua Ferguson
+
+Vectorized Scoring and Ranking of Swipe Candidates
+
+A Block of Candidates is Scored in One NumPy Pass, then the Top-k are Picked with
+argpartition (O(n)) and Only Those k are Sorted.
+
+Score Components (Each Normalized to [0, 1]):
+- location: 1.0 at 0 km Falling Linearly to 0.0 at LOCATION_DISTANCE_SPAN_KM When the Distance is
+  Known (Geo Index), Else 1.0 Same City, 0.5 Same State, 0.0 Otherwise
+- age_proximity: 1.0 Same Age, Falling Linearly to 0.0 at AGE_PROXIMITY_SPAN Years Apart
+- last_active: Halves Every LAST_ACTIVE_HALF_LIFE_DAYS Since last_online
+- profile_completeness: Fraction of Profile Fields Filled In (name, bio, age, gender, city)
+- profile_picture: 1.0 if the Candidate has a Main Photo
+
+Weights Default to DEFAULT_SCORE_WEIGHTS, and Can be Overridden per Instance or with the
+SWIPE_SCORE_WEIGHTS Environment Variable (JSON, e.g. '{"location": 0.5, "last_active": 0.3}').
+"""
+
+import json
+from datetime import timezone
+
+import numpy as np
+
+from Backend.src.utils import EnvManager
+
+DEFAULT_SCORE_WEIGHTS = {
+    "location": 0.30,
+    "age_proximity": 0.25,
+    "last_active": 0.25,
+    "profile_completeness": 0.10,
+    "profile_picture": 0.10,
+}
+AGE_PROXIMITY_SPAN = 10.0 # Years
+LOCATION_DISTANCE_SPAN_KM = 100.0
+LAST_ACTIVE_HALF_LIFE_DAYS = 3.0
+SECONDS_PER_DAY = 86400.0
+
+
+def load_score_weights():
+    """Default Weights, Overridden by any Weights Set in SWIPE_SCORE_WEIGHTS."""
+    weights = dict(DEFAULT_SCORE_WEIGHTS)
+    override = EnvManager().load_env_var("SWIPE_SCORE_WEIGHTS")
+    if override:
+        weights.update({name: float(value) for name, value in json.loads(override).items()})
+    return weights
+
+
+def candidate_features(rows, user, last_active=None, distances=None):
+    """
+    Columnar Features for a Block of Candidate Rows.
+
+    Parameters:
+        rows (list): Rows with id, state, city, age, last_online, name, bio, gender, has_photo.
+        user (User): The user the pool is being generated for.
+        last_active (dict, optional): user_id -> epoch seconds, fresher than row.last_online (e.g. users:last_online).
+        distances (dict, optional): user_id -> distance in km (geo index).
+
+    Returns:
+        tuple: (list of candidate ids, dict of feature arrays for SwipeRanker.score)
+    """
+    n = len(rows)
+    nan = float("nan")
+    user_age = user.age if user.age is not None else nan
+
+    features = {
+        "same_city": np.fromiter((row.state == user.state and row.city == user.city for row in rows), dtype=bool, count=n),
+        "same_state": np.fromiter((row.state == user.state for row in rows), dtype=bool, count=n),
+        "distance_km": np.fromiter(((distances or {}).get(row.id, nan) for row in rows), dtype=np.float64, count=n),
+        "age_gap": np.fromiter((row.age - user_age if row.age is not None else nan for row in rows), dtype=np.float64, count=n),
+        "last_online": np.fromiter((_last_online(row, last_active, nan) for row in rows), dtype=np.float64, count=n),
+        "filled_fields": np.fromiter(
+            (sum(value is not None for value in (row.name, row.bio, row.age, row.gender, row.city)) for row in rows),
+            dtype=np.float64,
+            count=n,
+        ),
+        "has_photo": np.fromiter((bool(row.has_photo) for row in rows), dtype=bool, count=n),
+    }
+    return [row.id for row in rows], features
+
+
+def _last_online(row, last_active, default):
+    if last_active and row.id in last_active:
+        return last_active[row.id]
+    # last_online is Stored as Naive UTC
+    return row.last_online.replace(tzinfo=timezone.utc).timestamp() if row.last_online else default
+
+
+class SwipeRanker:
+    """
+    Scores a Block of Candidates and Returns the Best k.
+    """
+
+    def __init__(self, weights=None):
+        """
+        Parameters:
+            weights (dict, optional): Component name -> weight. Unknown components raise ValueError.
+        """
+        self.weights = dict(weights) if weights is not None else load_score_weights()
+        unknown = set(self.weights) - set(DEFAULT_SCORE_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown score components: {', '.join(sorted(unknown))}")
+
+    def score(self, features, now):
+        """
+        Weighted Score for Every Candidate in the Block.
+
+        Parameters:
+            features (dict): Arrays of equal length n:
+                - same_city (bool), same_state (bool)
+                - distance_km (float, optional, NaN if unknown)
+                - age_gap (float, NaN if unknown)
+                - last_online (float, epoch seconds, NaN if unknown)
+                - filled_fields (int, 0-5), has_photo (bool)
+            now (float): Current time in epoch seconds.
+
+        Returns:
+            np.ndarray: float64 scores of length n.
+        """
+        location = np.where(features["same_city"], 1.0, np.where(features["same_state"], 0.5, 0.0))
+        if "distance_km" in features:
+            distance = features["distance_km"]
+            by_distance = 1.0 - np.minimum(np.nan_to_num(distance, nan=0.0) / LOCATION_DISTANCE_SPAN_KM, 1.0)
+            location = np.where(np.isnan(distance), location, by_distance)
+
+        age_proximity = 1.0 - np.minimum(np.abs(features["age_gap"]) / AGE_PROXIMITY_SPAN, 1.0)
+        age_proximity = np.nan_to_num(age_proximity, nan=0.0)
+
+        days_inactive = np.maximum(now - features["last_online"], 0.0) / SECONDS_PER_DAY
+        last_active = np.nan_to_num(np.exp2(-days_inactive / LAST_ACTIVE_HALF_LIFE_DAYS), nan=0.0)
+
+        components = {
+            "location": location,
+            "age_proximity": age_proximity,
+            "last_active": last_active,
+            "profile_completeness": features["filled_fields"] / 5.0,
+            "profile_picture": features["has_photo"].astype(np.float64),
+        }
+
+        scores = np.zeros(len(location), dtype=np.float64)
+        for name, weight in self.weights.items():
+            if weight:
+                scores += weight * components[name]
+        return scores
+
+    def top_k(self, scores, k):
+        """
+        Indices of the k Highest Scores, Best First.
+
+        Parameters:
+            scores (np.ndarray): Candidate scores.
+            k (int): Number of candidates to keep.
+
+        Returns:
+            np.ndarray: Indices into `scores`, ordered by descending score.
+        """
+        n = len(scores)
+        if k <= 0 or n == 0:
+            return np.empty(0, dtype=np.intp)
+        if k < n:
+            # Partition so the k Best Sit in the Last k Slots, then Sort Only Those
+            best = np.argpartition(scores, n - k)[n - k:]
+        else:
+            best = np.arange(n)
+        return best[np.argsort(-scores[best], kind="stable")]
@@ -0,0 +1,193 @@
+"""Author: Joshua Ferguson
+
+Delta Sync - Everything a Client is Missing Since its Last Sync, in One Round Trip and One Snapshot
+
+The Cursor (Opaque to Clients, URL-Safe) Carries Two Watermarks - Neither is users.last_online, so Syncs
+Don't Depend on Writing the users Table:
+- The seq the Client Holds for Each of its Matches - a Match Missing from the Cursor is New, a Match Whose
+  last_seq Moved Past its seq has the Messages seq + 1 .. last_seq New (see Match.add_message), and a Match
+  in the Cursor but No Longer the User's was Removed. A seq Only Moves Up to a Gap Still Expected to Fill
+  (see held_seq) - the Messages Past it are Sent Again, and the Client Upserts Messages by id
+- max(users.updated_at) as of the Last Sync - Partners Updated Since Then (Less SYNC_PROFILE_OVERLAP, for
+  Updates Committed Late) are Sent Again. Profiles are Upserted by the Client, so Sending One Twice is Harmless
+
+Everything is Read in One REPEATABLE READ Transaction - the Matches, their Messages, the Profiles and the
+New Cursor All Come from the Same Snapshot, so the Next Sync Picks Up Exactly Where this One Left Off.
+
+last_online is Still What the Swipe Pool's SQL Fallback and the Ranker Read When the Activity Index Has No
+Score, so touch_last_online Writes it - but at Most Once per SYNC_LAST_ONLINE_INTERVAL, Not Every Poll.
+"""
+
+import base64
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Integer, column, func, or_, values
+
+from Backend.src.extensions import db
+import Backend.src.models as models
+from Backend.src.models.message import held_seq
+from Backend.src.models.model_helpers import UserModelHelper
+from Backend.src.services.recent_messages_service import serialize_message
+
+SYNC_MESSAGE_LIMIT = 500 # Messages per Sync - has_more Tells the Client to Sync Again
+SYNC_PROFILE_OVERLAP = timedelta(seconds=30) # Profile Updates Stamped this Long Before Committing Still Sync
+SYNC_LAST_ONLINE_INTERVAL = timedelta(minutes=5) # last_online is Written at Most this Often by Syncs
+
+
+def encode_sync_cursor(watermark, seqs):
+    """
+    Parameters:
+        watermark (datetime): max(users.updated_at) as of the sync, or None.
+        seqs (dict): match_id -> the seq the client now holds.
+
+    Returns:
+        str: An opaque cursor for the next sync.
+    """
+    raw = f"{watermark.isoformat() if watermark else ''}|" + ",".join(f"{match_id}:{seq}" for match_id, seq in sorted(seqs.items()))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_sync_cursor(cursor):
+    """
+    Parameters:
+        cursor (str): A cursor from encode_sync_cursor, or None for a first sync.
+
+    Returns:
+        tuple: (watermark or None, {match_id: seq})
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if not cursor:
+        return None, {}
+    try:
+        watermark, seqs = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        seqs = dict(tuple(int(part) for part in pair.split(":")) for pair in seqs.split(",") if pair)
+        return (datetime.fromisoformat(watermark) if watermark else None), seqs
+    except Exception:
+        raise ValueError("Invalid sync cursor.")
+
+
+def serialize_profile(user):
+    """A Partner's Basic Profile, as GET /users/profile Returns It"""
+    return {
+        "userID": user.id,
+        "age": str(user.age) if user.age is not None else None,
+        "name": user.name,
+        "gender": user.gender,
+        "state": user.state,
+        "city": user.city,
+        "bio": user.bio,
+    }
+
+
+def sync_user(user_id, cursor=None, limit=SYNC_MESSAGE_LIMIT):
+    """
+    Everything Changed for a User Since a Cursor. Runs in its Own Transaction - Call it Before the
+    Request Touches the Session, so the Snapshot Isolation Applies.
+
+    Parameters:
+        user_id (str): The syncing user.
+        cursor (str, optional): The cursor from the last sync - None to sync from scratch.
+        limit (int): Most messages returned.
+
+    Returns:
+        dict: Of
+            - matches: get_match_summaries rows for new matches and matches with new messages
+            - removed_match_ids: Matches in the cursor the user no longer has
+            - messages: New messages (see serialize_message), ordered by (match_id, seq)
+            - profiles: Partners new or updated since the cursor (see serialize_profile)
+            - cursor: The cursor for the next sync
+            - has_more: Whether messages were left out (sync again with the new cursor)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    Message, User = models.message.Message, models.user.User
+    watermark, known_seqs = decode_sync_cursor(cursor)
+
+    if db.engine.dialect.name == "postgresql":
+        db.session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    try:
+        summaries = UserModelHelper(user_id).get_match_summaries()
+
+        # Matches are Read Whole Every Sync - the Match List is One Indexed Query, and the seqs Tell What Changed
+        seqs = {row.id: row.last_seq for row in summaries}
+        changed = [row for row in summaries if row.id not in known_seqs or row.last_seq > known_seqs[row.id]]
+        removed_match_ids = sorted(match_id for match_id in known_seqs if match_id not in seqs)
+        new_partner_ids = {row.partner_id for row in summaries if row.id not in known_seqs}
+
+        # New Messages of Every Changed Match in One Query - a Range Scan on ix_messages_match_id_seq per Match
+        messages, has_more = [], False
+        from_seqs = [(row.id, known_seqs.get(row.id, 0)) for row in changed if row.last_seq > known_seqs.get(row.id, 0)]
+        if from_seqs:
+            known = values(column("match_id", Integer), column("seq", Integer), name="known").data(from_seqs)
+            messages = (
+                Message.query.join(known, Message.match_id == known.c.match_id)
+                .filter(Message.seq > known.c.seq)
+                .order_by(Message.match_id, Message.seq)
+                .limit(limit + 1)
+                .all()
+            )
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+
+            # Each Changed Match's seq Moves Through the Messages Sent - Matches Past the Cut Keep their Old seq
+            sent = {}
+            for message in messages:
+                sent.setdefault(message.match_id, []).append((message.seq, message.message_date))
+            for match_id, seq in from_seqs:
+                seqs[match_id] = held_seq(seq, sent.get(match_id, []))
+            messages = [serialize_message(message) for message in messages]
+
+        # Partners Updated Since the Last Sync, and Every Partner of a New Match
+        partner_ids = {row.partner_id for row in summaries}
+        profiles = []
+        if partner_ids:
+            profile_filter = User.id.in_(new_partner_ids)
+            if watermark is not None:
+                profile_filter = or_(profile_filter, User.updated_at > watermark - SYNC_PROFILE_OVERLAP)
+            profiles = [serialize_profile(user) for user in User.query.filter(User.id.in_(partner_ids), profile_filter)]
+
+        # Taken in the Same Snapshot, so Nothing Updated After it is Skipped Next Time
+        new_watermark = db.session.query(func.max(User.updated_at)).scalar() or watermark
+    finally:
+        # Read-Only - End the Snapshot, Returning the Connection with its Default Isolation.
+        # Everything Returned was Serialized Above, so Nothing Reloads After
+        db.session.rollback()
+
+    return {
+        "matches": changed,
+        "removed_match_ids": removed_match_ids,
+        "messages": messages,
+        "profiles": profiles,
+        "cursor": encode_sync_cursor(new_watermark, seqs),
+        "has_more": has_more,
+    }
+
+
+def touch_last_online(user_id, now=None):
+    """
+    Record that a Syncing User is Online, Throttled - One Conditional UPDATE that Only Writes When last_online
+    is Older than SYNC_LAST_ONLINE_INTERVAL. updated_at is Left Alone, so Presence Isn't a Profile Change.
+
+    Parameters:
+        user_id (str): The syncing user.
+        now (datetime, optional): Defaults to now.
+
+    Returns:
+        bool: Whether last_online was written.
+    """
+    User = models.user.User
+    now = now or datetime.now(timezone.utc)
+    try:
+        written = User.query.filter(
+            User.id == user_id,
+            or_(User.last_online.is_(None), User.last_online < now - SYNC_LAST_ONLINE_INTERVAL),
+        ).update({"last_online": now, "updated_at": User.updated_at}, synchronize_session=False)
+        db.session.commit()
+        return written > 0
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error recording last online for user {user_id}: {str(e)}")
+        return False
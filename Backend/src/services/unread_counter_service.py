@@ -0,0 +1,117 @@
+"""Author: Joshua Ferguson
+
+Unread Counters - Per-User Hash of match_id -> Messages Received and Not Yet Read
+
+Saving a Message Increments the Recipient's Field, and Marking a Match Read Deletes It,
+so Badges for Every Match are One HGETALL - No COUNT Over messages per Match.
+
+Keys:
+- `unread:{user_id}` Hash of match_id -> Unread Count (Matches with Nothing Unread have No Field)
+
+messages.message_read Stays the Source of Truth - rebuild() Recomputes the Hashes from It.
+"""
+
+from sqlalchemy import case, func
+
+from Backend.src.extensions import db, redis_client
+
+UNREAD_REBUILD_BATCH = 1000
+
+
+def unread_key(user_id):
+    return f"unread:{user_id}"
+
+
+class UnreadCounter:
+    """
+    Maintains and Queries the Per-User Unread Hashes.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+
+    # -----Queries-----
+
+    def counts(self, user_id):
+        """
+        Unread Counts for All of a User's Matches.
+
+        Parameters:
+            user_id (str): The user ID.
+
+        Returns:
+            dict: match_id (int) -> unread count, for matches with unread messages ({} if Redis is down).
+        """
+        try:
+            return {int(match_id): int(count) for match_id, count in self.redis.hgetall(unread_key(user_id)).items()}
+        except Exception as e:
+            # Badges are a Cache over messages.message_read - Never Fail the Match List Over Them
+            print(f"Error reading unread counts for user {user_id}: {str(e)}")
+            return {}
+
+    # -----Maintenance-----
+
+    def record_message(self, recipient_id, match_id):
+        """
+        Count a Newly Saved Message Against its Recipient. Called After the Message is Committed.
+
+        Parameters:
+            recipient_id (str): The user the message was sent to.
+            match_id (int): The match it was sent in.
+        """
+        try:
+            self.redis.hincrby(unread_key(recipient_id), match_id, 1)
+        except Exception as e:
+            # rebuild() Repairs a Missed Increment - Never Fail the Message Over It
+            print(f"Error counting unread message for user {recipient_id}: {str(e)}")
+
+    def clear(self, user_id, match_id):
+        """
+        Reset a Match's Count Once its Messages are Marked Read.
+
+        Parameters:
+            user_id (str): The user who read the messages.
+            match_id (int): The match read.
+        """
+        try:
+            self.redis.hdel(unread_key(user_id), match_id)
+        except Exception as e:
+            print(f"Error clearing unread count for user {user_id}: {str(e)}")
+
+    def rebuild(self):
+        """
+        Recompute the Hashes from Unread Rows in `messages`. Messages Saved While it Runs Can be Miscounted
+        Until their Match is Next Read - Run it Off-Peak.
+
+        Returns:
+            int: Number of (user, match) counts written.
+        """
+        from Backend.src.models.match import Match
+        from Backend.src.models.message import Message
+
+        for key in self.redis.scan_iter(match="unread:*", count=UNREAD_REBUILD_BATCH):
+            self.redis.delete(key)
+
+        # The Recipient is Whichever Side of the Match Didn't Send the Message
+        recipient_id = case(
+            (Message.messager_id == Match.matcher_id, Match.matchee_id),
+            else_=Match.matcher_id,
+        )
+        rows = (
+            db.session.query(recipient_id, Message.match_id, func.count(Message.id))
+            .join(Match, Match.id == Message.match_id)
+            .filter(Message.message_read.is_(False))
+            .group_by(recipient_id, Message.match_id)
+            .yield_per(UNREAD_REBUILD_BATCH)
+        )
+
+        written = 0
+        pipeline = self.redis.pipeline(transaction=False)
+        for user_id, match_id, count in rows:
+            pipeline.hset(unread_key(user_id), match_id, count)
+            written += 1
+            if written % UNREAD_REBUILD_BATCH == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        return written
@@ -0,0 +1,132 @@
+"""Author: Joshua Ferguson
+
+User Activity Index - Sorted Set of user_id Scored by last_online (Epoch Seconds)
+
+Lets Pool Generation Drop Dormant Accounts from a Candidate Set in One ZMSCORE,
+Before Any DB Hit, Instead of Filtering last_online in SQL.
+
+Keys:
+- `users:last_online` Sorted Set of user_id -> last_online
+- `users:last_online:built` Marker Set Once Backfilled from `users` (Until Then, Pools Filter in SQL)
+
+Kept Current by the Polling Routes, Logins, Socket Connects (cache_user_status), and User.set_online.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from Backend.src.extensions import redis_client
+from Backend.src.utils import EnvManager
+
+USER_ACTIVITY_KEY = "users:last_online"
+USER_ACTIVITY_BUILT_KEY = "users:last_online:built"
+USER_ACTIVITY_BATCH = 1000
+DEFAULT_ACTIVE_DAYS = 14 # Candidates Must have been Online Within This Many Days
+
+
+def active_window():
+    """How Recently a Candidate Must have been Online - SWIPE_POOL_ACTIVE_DAYS, Default 14 Days."""
+    days = EnvManager().load_env_var("SWIPE_POOL_ACTIVE_DAYS")
+    return timedelta(days=int(days) if days else DEFAULT_ACTIVE_DAYS)
+
+
+def touch_user_activity(user_id, when=None):
+    """
+    Record that a User was Online.
+
+    Parameters:
+        user_id (str): The user ID.
+        when (datetime, optional): When they were online, defaults to now.
+    """
+    try:
+        if not user_id:
+            return
+        when = when or datetime.now(timezone.utc)
+        if when.tzinfo is None:
+            # last_online Reloads from its Column as Naive UTC - Don't Let timestamp() Read it as Local Time
+            when = when.replace(tzinfo=timezone.utc)
+        redis_client.zadd(USER_ACTIVITY_KEY, {user_id: when.timestamp()})
+    except Exception as e:
+        # Activity is a Cache over users.last_online - Never Fail the Request Over It
+        print(f"Error recording activity for user {user_id}: {str(e)}")
+
+
+def remove_user_activity(user_id):
+    try:
+        redis_client.zrem(USER_ACTIVITY_KEY, user_id)
+    except Exception as e:
+        print(f"Error removing activity for user {user_id}: {str(e)}")
+
+
+class UserActivity:
+    """
+    Queries and Rebuilds the User Activity Sorted Set.
+    """
+
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn or redis_client
+
+    def is_built(self):
+        return bool(self.redis.exists(USER_ACTIVITY_BUILT_KEY))
+
+    def filter_active(self, user_ids, since):
+        """
+        Keep Only Users Online at or After `since`.
+
+        Parameters:
+            user_ids (set): Candidate user IDs.
+            since (datetime): Timezone-aware cutoff.
+
+        Returns:
+            dict: user_id -> last_online epoch seconds for the active users,
+                  or None if the index can't answer (not built / Redis down).
+        """
+        try:
+            if not self.is_built():
+                return None
+
+            user_ids = list(user_ids)
+            cutoff = since.timestamp()
+
+            pipeline = self.redis.pipeline(transaction=False)
+            for start in range(0, len(user_ids), USER_ACTIVITY_BATCH):
+                pipeline.zmscore(USER_ACTIVITY_KEY, user_ids[start:start + USER_ACTIVITY_BATCH])
+
+            active = {}
+            for start, scores in zip(range(0, len(user_ids), USER_ACTIVITY_BATCH), pipeline.execute()):
+                for user_id, score in zip(user_ids[start:start + USER_ACTIVITY_BATCH], scores):
+                    if score is not None and score >= cutoff:
+                        active[user_id] = score
+            return active
+
+        except Exception as e:
+            print(f"Error reading user activity: {str(e)}")
+            return None
+
+    def rebuild(self):
+        """
+        Backfill the Sorted Set from users.last_online.
+
+        Returns:
+            int: Number of users written.
+        """
+        from Backend.src.models.user import User
+
+        self.redis.delete(USER_ACTIVITY_BUILT_KEY)
+
+        written = 0
+        rows = User.query.with_entities(User.id, User.last_online).filter(
+            User.last_online.isnot(None),
+            User.deleted.isnot(True),
+        ).yield_per(USER_ACTIVITY_BATCH)
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for user_id, last_online in rows:
+            # last_online is Stored as Naive UTC - GT Keeps Any Newer Score Recorded Mid-Backfill
+            pipeline.zadd(USER_ACTIVITY_KEY, {user_id: last_online.replace(tzinfo=timezone.utc).timestamp()}, gt=True)
+            written += 1
+            if written % USER_ACTIVITY_BATCH == 0:
+                pipeline.execute()
+        pipeline.set(USER_ACTIVITY_BUILT_KEY, "1")
+        pipeline.execute()
+
+        return written
@@ -0,0 +1,391 @@
+"""Author: Joshua Ferguson
+
+Shared-Memory Columnar Snapshot of the Matchmaking Attributes of Every User
+
+One .npy File per Column, Memory-Mapped by Every API/Worker Process, so Pool Generation
+Can Filter the Whole User Base with NumPy Boolean Masks Instead of a SQL Scan.
+
+Layout (USER_SNAPSHOT_DIR, Default ./Data/UserSnapshot/):
+- `snapshot.json` Metadata: version, rows, capacity, watermark, and the String Codes
+  for the Categorical Columns (gender, state, city, interested_in)
+- `v{version}/{column}.npy` Fixed-Capacity Columns (See SNAPSHOT_COLUMNS)
+
+Refreshing:
+- build() Writes a New Version from Scratch and Swaps it In by Replacing snapshot.json
+- refresh() Applies Only Users with updated_at >= the Watermark Less USER_SNAPSHOT_OVERLAP, In Place (Readers
+  See the New Values Through the Shared Mapping), Growing into a New Version When Capacity Runs Out.
+  updated_at is Stamped Before Commit, so the Overlap Catches Updates that Committed After an Earlier
+  Refresh Moved Past Them - Re-Applying a Row is Harmless
+- There is One Writer at a Time (File Lock), Normally the Swipe Pool Refill Worker
+
+The Snapshot is a Candidate Source Only - Pools Still Load the Chosen Users with SQL, so a
+Stale Row (e.g. a Deleted User) Can Only Cost a Wasted ID, Never a Wrong Card.
+"""
+
+import copy
+import fcntl
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from Backend.src.extensions import db
+from Backend.src.models.user import User
+from Backend.src.models.datingPreference import DatingPreference
+from Backend.src.utils import EnvManager
+
+DEFAULT_USER_SNAPSHOT_DIR = "./Data/UserSnapshot/"
+USER_SNAPSHOT_MIN_CAPACITY = 1024
+USER_SNAPSHOT_GROWTH = 2 # Capacity Multiplier When the Snapshot is (Re)Allocated
+USER_SNAPSHOT_BATCH = 5000
+USER_SNAPSHOT_OVERLAP = timedelta(seconds=30) # Updates Stamped this Long Before Committing are Still Applied
+
+SNAPSHOT_COLUMNS = {
+    "id": "S64",
+    "age": np.int16,
+    "gender": np.int16, # Coded
+    "state": np.int32, # Coded
+    "city": np.int32, # Coded
+    "interested_in": np.int16, # Coded
+    "age_lower": np.int16,
+    "age_upper": np.int16,
+    "last_online": np.float64, # Epoch Seconds, NaN if Unknown
+    "is_fake": np.bool_,
+    "live": np.bool_, # Not Deleted, Profile Complete, and has Dating Preferences
+}
+CODED_COLUMNS = ("gender", "state", "city", "interested_in")
+MISSING = -1 # Code/Age Stored for a NULL Value
+
+
+class UserSnapshot:
+    """
+    Reads (and, if Writable, Maintains) the Columnar User Snapshot.
+    """
+
+    def __init__(self, snapshot_dir=None, writable=False):
+        """
+        Parameters:
+            snapshot_dir (str, optional): Snapshot directory, defaults to USER_SNAPSHOT_DIR.
+            writable (bool): Map the columns read-write for build()/refresh().
+        """
+        self.snapshot_dir = snapshot_dir or EnvManager().load_env_var("USER_SNAPSHOT_DIR") or DEFAULT_USER_SNAPSHOT_DIR
+        self.writable = writable
+        self.meta = None
+        self.columns = {}
+        self._meta_mtime = None
+        self._code_lookup = {}
+        self._row_lookup = None # user_id -> row, Writer Only
+        self._load_lock = threading.Lock()
+
+    # -----Reading-----
+
+    def load(self):
+        """
+        Map the Current Snapshot, Re-Reading it Only if snapshot.json Changed.
+
+        Returns:
+            bool: True if a snapshot is available.
+        """
+        meta_path = self._meta_path()
+        with self._load_lock:
+            try:
+                mtime = os.stat(meta_path).st_mtime_ns
+            except FileNotFoundError:
+                self.meta = None
+                return False
+
+            if mtime == self._meta_mtime:
+                return True
+
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+
+            if self.meta is None or meta["version"] != self.meta["version"]:
+                mode = "r+" if self.writable else "r"
+                self.columns = {
+                    name: np.load(self._column_path(meta["version"], name), mmap_mode=mode)
+                    for name in SNAPSHOT_COLUMNS
+                }
+
+            self.meta = meta
+            self._meta_mtime = mtime
+            self._code_lookup = {
+                name: {value: code for code, value in enumerate(values)}
+                for name, values in meta["codes"].items()
+            }
+            self._row_lookup = None
+            return True
+
+    def candidate_ids(self, user, preferences, include_fake=True):
+        """
+        IDs of Users Passing the Location, Gender, and Mutual Age Filters of Pool Generation.
+
+        Parameters:
+            user (User): The user the pool is being generated for.
+            preferences (DatingPreference): The user's dating preferences.
+            include_fake (bool): Keep seeded fake users.
+
+        Returns:
+            set: Candidate user IDs, or None if there is no snapshot to answer from.
+        """
+        try:
+            if not self.load():
+                return None
+            if user.age is None:
+                return set()
+
+            state_code = self._code_lookup["state"].get(user.state)
+            city_code = self._code_lookup["city"].get(user.city)
+            if state_code is None or city_code is None:
+                return set()
+
+            rows = self.meta["rows"]
+            column = {name: values[:rows] for name, values in self.columns.items()}
+
+            mask = column["live"] & (column["state"] == state_code) & (column["city"] == city_code)
+            mask &= (column["age"] >= preferences.age_preference_lower) & (column["age"] <= preferences.age_preference_upper)
+            mask &= (column["age_lower"] <= user.age) & (column["age_upper"] >= user.age)
+
+            if preferences.interested_in != "any":
+                gender_code = self._code_lookup["gender"].get(preferences.interested_in)
+                if gender_code is None:
+                    return set()
+                mask &= column["gender"] == gender_code
+
+            # Candidates Interested in "any" or in the User's Gender
+            accepted_codes = [
+                self._code_lookup["interested_in"][value]
+                for value in ("any", user.gender)
+                if value in self._code_lookup["interested_in"]
+            ]
+            mask &= np.isin(column["interested_in"], accepted_codes)
+
+            if not include_fake:
+                mask &= ~column["is_fake"]
+
+            candidates = {raw_id.decode("utf-8") for raw_id in column["id"][mask]}
+            candidates.discard(user.id)
+            return candidates
+
+        except Exception as e:
+            print(f"Error reading user snapshot for user {user.id}: {str(e)}")
+            return None
+
+    # -----Maintenance-----
+
+    def build(self):
+        """
+        Write a New Snapshot Version from the users and datingpreferences Tables.
+
+        Returns:
+            int: Number of users written.
+        """
+        with self._writer_lock():
+            try:
+                return self._build()
+            except Exception:
+                self._discard_state()
+                raise
+
+    def refresh(self):
+        """
+        Apply Users Changed Since the Watermark, Building the Snapshot if there isn't One Yet.
+
+        Returns:
+            int: Number of users written.
+        """
+        with self._writer_lock():
+            try:
+                if not self.load():
+                    return self._build()
+                return self._refresh()
+            except Exception:
+                self._discard_state()
+                raise
+
+    # -----Helpers-----
+
+    def _refresh(self):
+        if self._row_lookup is None:
+            self._row_lookup = {
+                raw_id.decode("utf-8"): row
+                for row, raw_id in enumerate(self.columns["id"][:self.meta["rows"]])
+            }
+
+        watermark = self.meta["watermark"]
+        # Back Past the Watermark - Updates Stamped Before it May have Committed Since
+        since = datetime.fromisoformat(watermark) - USER_SNAPSHOT_OVERLAP if watermark else None
+
+        meta = copy.deepcopy(self.meta)
+        changed = 0
+        for user_row in self._user_rows(since):
+            row = self._row_lookup.get(user_row.id)
+            if row is None:
+                if meta["rows"] == meta["capacity"]:
+                    self._grow(meta)
+                row = meta["rows"]
+                meta["rows"] += 1
+                self._row_lookup[user_row.id] = row
+
+            self._write_row(self.columns, row, user_row, meta["codes"])
+            changed += 1
+            if user_row.updated_at and (watermark is None or user_row.updated_at.isoformat() > watermark):
+                watermark = user_row.updated_at.isoformat()
+
+        meta["watermark"] = watermark
+        # Rows Re-Applied In Place are Already Visible - Only Publish When the Metadata Changed
+        if meta != self.meta:
+            self._publish(meta)
+        elif changed:
+            for column in self.columns.values():
+                column.flush()
+        return changed
+
+    def _discard_state(self):
+        """Forget Half-Applied Writer State - the Next load() Re-Maps from snapshot.json."""
+        self.meta = None
+        self.columns = {}
+        self._meta_mtime = None
+        self._code_lookup = {}
+        self._row_lookup = None
+
+    def _build(self):
+        version = (self.meta["version"] + 1) if self.load() else 1
+        capacity = max(USER_SNAPSHOT_MIN_CAPACITY, User.query.count() * USER_SNAPSHOT_GROWTH)
+        meta = {
+            "version": version,
+            "rows": 0,
+            "capacity": capacity,
+            "watermark": None,
+            "codes": {name: [] for name in CODED_COLUMNS},
+        }
+        self._code_lookup = {name: {} for name in CODED_COLUMNS}
+        self._row_lookup = {}
+
+        self.columns = self._allocate(version, capacity)
+        for user_row in self._user_rows():
+            if meta["rows"] == meta["capacity"]:
+                self._grow(meta) # More Users Arrived Mid-Build
+
+            self._write_row(self.columns, meta["rows"], user_row, meta["codes"])
+            self._row_lookup[user_row.id] = meta["rows"]
+            meta["rows"] += 1
+            if user_row.updated_at and (meta["watermark"] is None or user_row.updated_at.isoformat() > meta["watermark"]):
+                meta["watermark"] = user_row.updated_at.isoformat()
+
+        self._publish(meta)
+        return meta["rows"]
+
+    def _grow(self, meta):
+        """Copy the Snapshot into a New, Larger Version (Published with the Next Metadata Write)."""
+        meta["version"] += 1
+        meta["capacity"] *= USER_SNAPSHOT_GROWTH
+        self.columns = self._allocate(meta["version"], meta["capacity"], copy_from=self.columns, rows=meta["rows"])
+
+    def _allocate(self, version, capacity, copy_from=None, rows=0):
+        os.makedirs(self._version_dir(version), exist_ok=True)
+        columns = {}
+        for name, dtype in SNAPSHOT_COLUMNS.items():
+            column = np.lib.format.open_memmap(self._column_path(version, name), mode="w+", dtype=dtype, shape=(capacity,))
+            if copy_from is not None:
+                column[:rows] = copy_from[name][:rows]
+            columns[name] = column
+        return columns
+
+    def _user_rows(self, since=None):
+        query = db.session.query(
+            User.id, User.age, User.gender, User.state, User.city, User.last_online,
+            User.is_fake, User.deleted, User.updated_at,
+            DatingPreference.interested_in, DatingPreference.age_preference_lower, DatingPreference.age_preference_upper,
+        ).outerjoin(DatingPreference, DatingPreference.user_id == User.id)
+
+        if since is not None:
+            # Inclusive - Rows Sharing the Watermark's Timestamp are Simply Rewritten
+            query = query.filter(User.updated_at >= since)
+
+        return query.order_by(User.updated_at).yield_per(USER_SNAPSHOT_BATCH)
+
+    def _write_row(self, columns, row, user_row, codes):
+        has_preferences = user_row.interested_in is not None
+        columns["id"][row] = user_row.id.encode("utf-8")
+        columns["age"][row] = user_row.age if user_row.age is not None else MISSING
+        columns["gender"][row] = self._encode("gender", user_row.gender, codes)
+        columns["state"][row] = self._encode("state", user_row.state, codes)
+        columns["city"][row] = self._encode("city", user_row.city, codes)
+        columns["interested_in"][row] = self._encode("interested_in", user_row.interested_in, codes)
+        columns["age_lower"][row] = user_row.age_preference_lower if has_preferences else MISSING
+        columns["age_upper"][row] = user_row.age_preference_upper if has_preferences else MISSING
+        # last_online is Stored as Naive UTC
+        columns["last_online"][row] = (
+            user_row.last_online.replace(tzinfo=timezone.utc).timestamp() if user_row.last_online else np.nan
+        )
+        columns["is_fake"][row] = bool(user_row.is_fake)
+        columns["live"][row] = (
+            has_preferences
+            and not user_row.deleted
+            and all(value is not None for value in (user_row.age, user_row.gender, user_row.state, user_row.city))
+        )
+
+    def _encode(self, name, value, codes):
+        if value is None:
+            return MISSING
+        code = self._code_lookup[name].get(value)
+        if code is None:
+            code = len(codes[name])
+            codes[name].append(value)
+            self._code_lookup[name][value] = code
+        return code
+
+    def _publish(self, meta):
+        """Flush the Columns, then Atomically Replace snapshot.json so Readers Pick Up the Change."""
+        for column in self.columns.values():
+            column.flush()
+
+        meta_path = self._meta_path()
+        temp_path = f"{meta_path}.tmp"
+        with open(temp_path, "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temp_path, meta_path)
+
+        self.meta = meta
+        self._meta_mtime = os.stat(meta_path).st_mtime_ns
+
+        # Readers Still Mapping an Older Version Keep their (Unlinked) Files Until they Re-Map
+        for entry in os.listdir(self.snapshot_dir):
+            if entry.startswith("v") and entry != f"v{meta['version']}":
+                shutil.rmtree(os.path.join(self.snapshot_dir, entry), ignore_errors=True)
+
+    @contextmanager
+    def _writer_lock(self):
+        if not self.writable:
+            raise RuntimeError("UserSnapshot was opened read-only")
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        with open(os.path.join(self.snapshot_dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _meta_path(self):
+        return os.path.join(self.snapshot_dir, "snapshot.json")
+
+    def _version_dir(self, version):
+        return os.path.join(self.snapshot_dir, f"v{version}")
+
+    def _column_path(self, version, name):
+        return os.path.join(self._version_dir(version), f"{name}.npy")
+
+
+# One Read-Only Mapping per Process, Shared by Every Request
+_user_snapshot = None
+
+def get_user_snapshot():
+    global _user_snapshot
+    if _user_snapshot is None:
+        _user_snapshot = UserSnapshot()
+    return _user_snapshot
@@ -9,7 +9,7 @@ The `ChatNamespace` class provides the following methods:
 
 - `on_connect()`: Authenticates the user via JWT when they connect and auto-joins match rooms.
 - `on_join(data)`: User joins a chat room (f"match_<match_id>" used as room identifier).
-- `on_message(data)`: Handles message sending and Saving to DB
+- `on_message(data)`: Handles message sending and Saving to DB (Strict), or to the Message Log (CHAT_PERSISTENCE=async)
 - `on_leave(data)`: User leaves a chat room.
 - `on_disconnect()`: Handles user disconnection and removes them from any match rooms.
 
@@ -18,15 +18,19 @@ The `ChatNamespace` class provides the following methods:
 - `get_user_match_rooms()`: Retrieves all match rooms where this user is involved.
 - `auto_join_match_rooms()`: Retrieves and joins all match rooms where this user is not joined.
 - `auto_leave_match_rooms()`: Leaves all match rooms where this user is joined.
+- `is_match_member(match_id)`: Whether this user is one of the match's two users.
 
 """  
 import json
 from flask import request
 from flask_socketio import Namespace, emit, join_room, leave_room, disconnect, rooms
+from sqlalchemy import or_
 
 from Backend.src.models.model_helpers import MatchModelHelper
 import Backend.src.models as models
 from Backend.src.services.auth_service import get_user_from_token
+from Backend.src.services.message_log_service import MessageLog
+from Backend.src.services.recent_messages_service import RecentMessages
 from Backend.src.sockets.socket_helpers import (
     auth_connecting_user, 
     gen_match_room_name, 
@@ -126,6 +130,11 @@ class ChatNamespace(Namespace):
                 print("Missing room_id/match_id. Join request ignored.")
                 return
 
+            if not self.is_match_member(match_id):
+                print(f"User {self.user_id} is not in match {match_id}. Join request ignored.")
+                emit(EVENT_ERROR, {"message": "Not a member of this match"}, room=self.user_id)
+                return
+
             # Join the chat room for match_id
             join_room(match_room)
             print(f"User {self.user_id} joined Match-Chat {match_room}")
@@ -133,13 +142,8 @@ class ChatNamespace(Namespace):
             # Emit status message to all users in the chat room that the user has joined
             emit(EVENT_STATUS, {"msg": f"User {self.user_id} joined"}, room=match_room)
             
-            # Get recent messages from Postgres 
-            MatchHelper = MatchModelHelper(match_id=match_id)
-            recent_messages = MatchHelper.get_messages(
-                limit=MESSAGE_HISTORY_LIMIT, 
-                page=1, 
-                get_all_messages=False
-            )
+            # Get recent messages from the Match's Buffer (Postgres on a Miss)
+            recent_messages = RecentMessages().recent(match_id, MESSAGE_HISTORY_LIMIT)
             
             # Emit Recent Messages to User
             emit(EVENT_CHAT_HISTORY, {
@@ -164,7 +168,7 @@ class ChatNamespace(Namespace):
             
         This method:
         1. Validates the message data
-        2. Saves the message to the database
+        2. Saves the message to the database (Strict), or Appends it to the Message Log (Async)
         3. Broadcasts the message to all users in the room
         4. Caches the message for offline users
         """
@@ -178,26 +182,34 @@ class ChatNamespace(Namespace):
                 print("Invalid message data. Ignored.")
                 return
 
+            # Only the Match's Two Users Write to it - the Async Path Logs Without Ever Reading the Match
+            if not self.is_match_member(match_id):
+                print(f"User {self.user_id} is not in match {match_id}. Message ignored.")
+                emit(EVENT_ERROR, {"message": "Not a member of this match"}, room=self.user_id)
+                return
+
             print(f"User {self.user_id} sent message '{message_content}' in Match-Chat {match_room}")
 
-            # Save message to Postgres - Persisting the Message
-            MatchHelper = MatchModelHelper(match_id=match_id)
-            saved_message = MatchHelper.save_message_to_match_chat(
-                self.user_id, 
-                message_content=message_content
-            )
+            # Async Mode - Id, seq and Log Sequence Assigned Up Front, Persisted by the Message Log Flusher
+            saved_message = None
+            if MessageLog.is_enabled():
+                saved_message = MessageLog().append(match_id, self.user_id, message_content)
+
+            # Strict Mode (or the Log Couldn't Take It) - Save message to Postgres Before Broadcasting
+            if not saved_message:
+                MatchHelper = MatchModelHelper(match_id=match_id)
+                saved_message = MatchHelper.save_message_to_match_chat(
+                    self.user_id, 
+                    message_content=message_content
+                )
 
             if not saved_message:
                 print(f"Failed to save message to DB: {json.dumps(saved_message)}")
                 emit(EVENT_ERROR, {"message": "Failed to save message"}, room=self.user_id)
                 return
         
-            # Create message data for broadcasting
-            message_data = {
-                "sender": self.user_id, 
-                "message": message_content,
-                "timestamp": saved_message.created_at.isoformat() if hasattr(saved_message, 'created_at') else None
-            }
+            # Broadcast the Saved Message as Buffered - sender, message, timestamp, Plus id and kind
+            message_data = saved_message
             
             # Broadcast message to all users in the Match chat room
             emit(EVENT_MESSAGE, message_data, room=match_room)
@@ -289,6 +301,27 @@ class ChatNamespace(Namespace):
             print(f"Error getting user match rooms: {str(e)}")
             return []
     
+    def is_match_member(self, match_id):
+        """
+        Whether this User is One of the Two Users in a Match - a Primary Key Lookup.
+
+        Args:
+            match_id: The match ID, as sent by the client
+
+        Returns:
+            bool: True if the user is the match's matcher or matchee
+        """
+        try:
+            match_id = int(match_id)
+        except (TypeError, ValueError):
+            return False
+
+        Match = models.match.Match
+        return Match.query.with_entities(Match.id).filter(
+            Match.id == match_id,
+            or_(Match.matcher_id == self.user_id, Match.matchee_id == self.user_id),
+        ).first() is not None
+
     @authenticated_only
     def auto_join_match_rooms(self):
         """
@@ -29,6 +29,7 @@ from flask_socketio import disconnect, emit
 
 from Backend.src.services.auth_service import get_user_from_token
 from Backend.src.extensions import redis_client
+from Backend.src.services.user_activity_service import touch_user_activity
 
 # Constants
 ROOM_PREFIX_MATCH = "match_"
@@ -152,6 +153,7 @@ def cache_user_status(user_id, is_online):
         
         if is_online:
             redis_client.setex(cache_key, USER_STATUS_TTL, "online")
+            touch_user_activity(user_id) # Socket Connects Count as Activity for Swipe Pools
         else:
             redis_client.delete(cache_key)
             
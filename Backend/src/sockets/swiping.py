@@ -10,6 +10,7 @@ from datetime import datetime
 
 from Backend.src.extensions import db, redis_client
 import Backend.src.models as models
+from Backend.src.services.swipe_pool_service import SwipePoolService
 
 from Backend.src.sockets.socket_helpers import (
     auth_connecting_user,
@@ -140,13 +141,15 @@ class SwipeNamespace(Namespace):
             processed_swipe = models.swipe.SwipeProcessor.process_new_swipe(
                 swiper_id=self.user_id,
                 swipee_id=swipee_id,
-                swipe_result=swipe_result
+                new_swipe_result=swipe_result
             )
             
             if not processed_swipe:
                 print(f"Failed to process swipe: {json.dumps(processed_swipe)}")
                 emit(EVENT_ERROR, {"message": "Failed to process swipe"}, room=self.user_id)
                 return
+
+            SwipePoolService().remove_card(self.user_id, swipee_id)
                 
             if processed_swipe.swipe_result == "ACCEPTED":
                 print(f"New Match Detected: {processed_swipe}")
@@ -38,6 +38,13 @@ class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
     
+    # Connection Pool Bounds - Set per Process via DB_POOL_SIZE / DB_MAX_OVERFLOW (e.g. Refill Worker)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(EnvManager().load_env_var('DB_POOL_SIZE') or 5),
+        "max_overflow": int(EnvManager().load_env_var('DB_MAX_OVERFLOW') or 10),
+        "pool_pre_ping": True,
+    }
+    
     JWT_SECRET_KEY = EnvManager().load_env_var('PASS_SECRET_KEY')
     
     def __repr__(self):
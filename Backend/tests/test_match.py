@@ -0,0 +1,149 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+import Backend.app
+from Backend.src.extensions import db
+from Backend.src.models.match import Match
+from Backend.src.models.message import MESSAGE_SEQ_GAP_WAIT, Message, held_seq
+from Backend.src.models.model_helpers import MatchModelHelper
+from Backend.src.models.user import User
+from Backend.src.routes.match_routes import match_response_helper
+from Backend.src.utils import TestingConfig
+from Backend.tests.utils_for_tests import (
+    pytest_assertion_failure,
+    pytest_assertion_success,
+    pytest_start_test_display,
+    pytest_test_success,
+)
+
+MESSAGES_PER_MATCH = 3
+
+
+@pytest.fixture()
+def app():
+    Backend.app.app.config.from_object(TestingConfig)
+    yield Backend.app.app
+
+
+@pytest.fixture()
+def make_matched_user(app):
+    """Create a User Matched with match_count Others, Each Match Holding a Few Messages - Removed Afterwards"""
+    created_ids = []
+
+    def make(match_count):
+        user_id, partner_ids = str(uuid.uuid4()), [str(uuid.uuid4()) for _ in range(match_count)]
+        created_ids.extend([user_id, *partner_ids])
+
+        db.session.add_all(
+            User(id=new_id, email=f"{new_id}@match.test", auth_provider="email", name=f"User {new_id[:8]}")
+            for new_id in [user_id, *partner_ids]
+        )
+        db.session.flush()
+
+        now = datetime.now(timezone.utc)
+        for index, partner_id in enumerate(partner_ids):
+            # Alternate Sides, so Both the matcher_id and matchee_id Branches are Covered
+            matcher_id, matchee_id = (user_id, partner_id) if index % 2 else (partner_id, user_id)
+            match = Match(matcher_id=matcher_id, matchee_id=matchee_id, match_date=now, created_at=now)
+            db.session.add(match)
+            db.session.flush()
+            for n in range(MESSAGES_PER_MATCH):
+                Match.add_message(match.id, partner_id, f"Message {n}", message_date=now + timedelta(seconds=n))
+        db.session.commit()
+        return user_id
+
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            pytest.skip("Match tests need PostgreSQL")
+        yield make
+
+        Message.query.filter(Message.messager_id.in_(created_ids)).delete(synchronize_session=False)
+        Match.query.filter(Match.matcher_id.in_(created_ids)).delete(synchronize_session=False)
+        User.query.filter(User.id.in_(created_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def count_queries(fn, *args):
+    """Run fn, Returning (Result, Number of SQL Statements it Executed)"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = fn(*args)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_match_list_query_count_is_constant(make_matched_user):
+
+    pytest_start_test_display()
+
+    few_user_id, many_user_id = make_matched_user(2), make_matched_user(40)
+    db.session.expire_all()
+
+    few, few_queries = count_queries(match_response_helper, few_user_id)
+    many, many_queries = count_queries(match_response_helper, many_user_id)
+
+    assert len(few) == 2 and len(many) == 40
+    assert few_queries == many_queries == 1, pytest_assertion_failure(
+        f"{few_queries} Queries for 2 Matches, {many_queries} for 40"
+    )
+    pytest_assertion_success("One Query for the Match List, Whether 2 or 40 Matches")
+
+    assert all(match["last_message"] == f"Message {MESSAGES_PER_MATCH - 1}" for match in many)
+    assert all(match["matched_user_name"].startswith("User ") for match in many)
+    pytest_assertion_success("Each Match Carries its Partner's Name and Latest Message")
+
+    activity = [match["last_activity_at"] for match in many]
+    assert activity == sorted(activity, reverse=True)
+    pytest_assertion_success("Matches are Ordered by Last Activity")
+
+    pytest_test_success()
+
+
+def test_messages_since_seq(make_matched_user):
+
+    pytest_start_test_display()
+
+    user_id = make_matched_user(1)
+    match = Match.query.filter((Match.matcher_id == user_id) | (Match.matchee_id == user_id)).one()
+    helper = MatchModelHelper(match_id=match.id)
+
+    assert match.last_seq == MESSAGES_PER_MATCH
+    assert [message.seq for message in helper.get_messages_since(0)["messages"]] == list(range(1, MESSAGES_PER_MATCH + 1))
+    pytest_assertion_success("Each Message Takes the Match's Next seq, Without Gaps")
+
+    delta = helper.get_messages_since(1, limit=1)
+    assert [message.message_content for message in delta["messages"]] == ["Message 1"]
+    assert delta["seq"] == 2 and delta["has_more"]
+    assert helper.get_messages_since(MESSAGES_PER_MATCH) == {"messages": [], "seq": MESSAGES_PER_MATCH, "has_more": False}
+    pytest_assertion_success("A Delta Holds Exactly the Messages After seq")
+
+    pytest_test_success()
+
+
+def test_held_seq_waits_for_recent_gaps():
+
+    pytest_start_test_display()
+
+    now = datetime(2025, 1, 1)
+    assert held_seq(3, [(4, now), (5, now)], now) == 5
+    assert held_seq(3, [], now) == 3
+    pytest_assertion_success("A Cursor Moves Through Messages Without Gaps")
+
+    # seq 5 was Logged but Not Yet Flushed - Hold at 4, and Send 6 Again Next Time
+    assert held_seq(3, [(4, now), (6, now)], now) == 4
+    pytest_assertion_success("A Cursor Holds at a Recent Gap")
+
+    # seq 5 Never Arrived (Rolled Back or Dead-Lettered) - Move Past It
+    assert held_seq(3, [(4, now), (6, now - MESSAGE_SEQ_GAP_WAIT - timedelta(seconds=1))], now) == 6
+    pytest_assertion_success("A Cursor Moves Past an Old Gap")
+
+    pytest_test_success()
@@ -0,0 +1,296 @@
+import itertools
+import uuid
+from datetime import datetime
+
+import pytest
+
+import Backend.app
+import Backend.src.services.message_log_service as message_log_service
+from Backend.src.extensions import db
+from Backend.src.models.match import Match
+from Backend.src.models.message import Message
+from Backend.src.models.user import User
+from Backend.src.services.message_log_flusher import (
+    MESSAGE_FLUSH_MAX_ATTEMPTS,
+    MESSAGE_LOG_ATTEMPTS_KEY,
+    MESSAGE_LOG_DEAD_STREAM,
+    MESSAGE_LOG_GROUP,
+    MessageLogFlusher,
+)
+from Backend.src.services.message_log_service import MESSAGE_LOG_STREAM, MessageLog, logged_message_row, message_seq_key
+from Backend.src.services.recent_messages_service import RecentMessages
+from Backend.src.services.stream_flusher import requeue_dead_entries
+from Backend.src.utils import TestingConfig
+from Backend.tests.utils_for_tests import (
+    pytest_assertion_failure,
+    pytest_assertion_success,
+    pytest_start_test_display,
+    pytest_test_success,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture()
+def app():
+    Backend.app.app.config.from_object(TestingConfig)
+    yield Backend.app.app
+
+
+@pytest.fixture()
+def fake_redis():
+    """A Fresh In-Memory Redis (with Lua, for MESSAGE_SEQ_SCRIPT)"""
+    yield fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture()
+def message_log(fake_redis, monkeypatch):
+    """A MessageLog on fake_redis, with Ids Reserved Locally and Every Match's last_seq Read as 7"""
+    ids = itertools.count(1)
+    last_seq_reads = []
+    monkeypatch.setattr(message_log_service, "reserve_message_id", lambda: next(ids))
+    monkeypatch.setattr(MessageLog, "_last_seq", staticmethod(lambda match_id: last_seq_reads.append(match_id) or 7))
+    message_log = MessageLog(fake_redis)
+    message_log.last_seq_reads = last_seq_reads
+    yield message_log
+
+
+@pytest.fixture()
+def match_id(app):
+    """A Fresh Match Between Two Users, Removed Along with its Messages Afterwards"""
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            pytest.skip("Message inserts need PostgreSQL")
+
+        user_ids = [str(uuid.uuid4()) for _ in range(2)]
+        db.session.add_all(User(id=user_id, email=f"{user_id}@message.test", auth_provider="email") for user_id in user_ids)
+        db.session.commit()
+        match = Match(matcher_id=user_ids[0], matchee_id=user_ids[1])
+        db.session.add(match)
+        db.session.commit()
+        match_id = match.id
+
+    yield match_id
+
+    with app.app_context():
+        Match.query.filter(Match.id == match_id).delete(synchronize_session=False)
+        User.query.filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+class StubFlusher(MessageLogFlusher):
+    """A Flusher Whose Postgres is Faked - Writes Fail for Messages in failing_matches, or All Writes While Down"""
+
+    def __init__(self, app, redis_conn):
+        super().__init__(app, batch_size=10, consumer_name="test", redis_conn=redis_conn)
+        self.database_up = True
+        self.failing_matches = set()
+        self.written = []
+
+    def _write(self, entries):
+        if not self.database_up:
+            raise ConnectionError("database is down")
+        for _, entry in entries:
+            if int(entry["match_id"]) in self.failing_matches:
+                raise ValueError(f"match {entry['match_id']} is gone")
+        self.written.extend(logged_message_row(entry) for _, entry in entries)
+
+    def _database_up(self):
+        return self.database_up
+
+
+def pending_count(redis_conn):
+    return redis_conn.xpending(MESSAGE_LOG_STREAM, MESSAGE_LOG_GROUP)["pending"]
+
+
+def test_append_takes_seq_from_match_counter(app, fake_redis, message_log):
+    pytest_start_test_display()
+
+    try:
+        # The First Message Seeds the Counter from last_seq - the Rest Never Read Postgres
+        sent = [message_log.append(1, "a", f"Message {i}") for i in range(3)]
+        assert [message["seq"] for message in sent] == [8, 9, 10]
+        assert message_log.last_seq_reads == [1]
+        pytest_assertion_success("seqs continue from last_seq, which is read once")
+
+        # Each Match Has its Own Counter
+        assert message_log.append(2, "b", "Other match")["seq"] == 8
+        assert fake_redis.get(message_seq_key(1)) == "10"
+        pytest_assertion_success("Matches are numbered separately")
+
+        # The seq is Logged, Buffered and Broadcast Alike
+        logged = [logged_message_row(entry) for _, entry in fake_redis.xrange(MESSAGE_LOG_STREAM)]
+        assert [(row["match_id"], row["seq"], row["message_content"]) for row in logged] == [
+            (1, 8, "Message 0"), (1, 9, "Message 1"), (1, 10, "Message 2"), (2, 8, "Other match"),
+        ]
+        assert [message["seq"] for message in RecentMessages(fake_redis).recent(1, 3)] == [10, 9, 8]
+        assert [message["log_seq"] for message in sent] == [entry_id for entry_id, _ in fake_redis.xrange(MESSAGE_LOG_STREAM)][:3]
+        pytest_assertion_success("A logged message carries its seq everywhere")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_append_falls_back_when_match_missing(app, fake_redis, message_log, monkeypatch):
+    pytest_start_test_display()
+
+    def missing_match(match_id):
+        raise LookupError(f"Match {match_id} not found")
+
+    monkeypatch.setattr(MessageLog, "_last_seq", staticmethod(missing_match))
+
+    try:
+        assert message_log.append(999, "a", "Nobody's match") is None
+        assert not fake_redis.exists(MESSAGE_LOG_STREAM) and not fake_redis.exists(message_seq_key(999))
+        pytest_assertion_success("A message for a missing match isn't logged - the caller saves it strictly")
+
+        assert message_log.append(1, "a", "") is None and message_log.append(1, "a", "x" * 501) is None
+        pytest_assertion_success("Empty and oversized messages aren't logged")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_next_seq_respects_floor(app, fake_redis, message_log):
+    pytest_start_test_display()
+
+    try:
+        message_log.append(1, "a", "Logged")
+        # The Counter (8) is Ahead of last_seq - Strict Saves Take Past It
+        assert message_log.next_seq(1, 7) == 9
+        # last_seq Ahead of the Counter (a Save While Redis was Down) - the Counter Jumps Past It
+        assert message_log.next_seq(1, 20) == 21
+        assert message_log.append(1, "a", "After")["seq"] == 22
+        pytest_assertion_success("next_seq never hands out a seq at or below the floor, or one already taken")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_flusher_acks_backs_off_and_dead_letters(app, fake_redis, message_log):
+    pytest_start_test_display()
+
+    message_log.append(1, "a", "Good")
+    message_log.append(2, "a", "Bad")
+    flusher = StubFlusher(app, fake_redis)
+
+    try:
+        # Postgres Down - Nothing is Attempted Against the Entries, Whatever the Number of Flushes
+        flusher.database_up = False
+        for _ in range(MESSAGE_FLUSH_MAX_ATTEMPTS * 2):
+            assert flusher.flush_once() == 0
+        assert flusher.backoff_s > 1 and pending_count(fake_redis) == 2
+        assert not fake_redis.exists(MESSAGE_LOG_ATTEMPTS_KEY) and not fake_redis.exists(MESSAGE_LOG_DEAD_STREAM)
+        pytest_assertion_success("Messages stay pending while the database is down")
+
+        # Back Up - the Good Message Goes In, the Bad One is Retried Until its Last Attempt
+        flusher.database_up = True
+        flusher.failing_matches = {2}
+        assert flusher.flush_once() == 1 and flusher.backoff_s == 0
+        assert [row["message_content"] for row in flusher.written] == ["Good"]
+        for _ in range(MESSAGE_FLUSH_MAX_ATTEMPTS - 2):
+            assert flusher.flush_once() == 0
+        assert pending_count(fake_redis) == 1 and not fake_redis.exists(MESSAGE_LOG_DEAD_STREAM)
+        assert flusher.flush_once() == 0
+        dead = fake_redis.xrange(MESSAGE_LOG_DEAD_STREAM)
+        assert len(dead) == 1 and dead[0][1]["message"] == "Bad" and "is gone" in dead[0][1]["error"]
+        assert fake_redis.xlen(MESSAGE_LOG_STREAM) == 0 and pending_count(fake_redis) == 0
+        pytest_assertion_success(f"A message failing {MESSAGE_FLUSH_MAX_ATTEMPTS} times is dead-lettered")
+
+        # Requeued, it Keeps its seq
+        flusher.failing_matches = set()
+        assert requeue_dead_entries(MESSAGE_LOG_STREAM, MESSAGE_LOG_DEAD_STREAM, fake_redis) == 1
+        assert flusher.flush_once() == 1
+        assert (flusher.written[-1]["message_content"], flusher.written[-1]["seq"]) == ("Bad", 8)
+        pytest_assertion_success("A requeued message is flushed with its seq")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_insert_messages_renumbers_taken_seqs(app, match_id):
+    pytest_start_test_display()
+
+    def row(message_id, seq, content):
+        return {
+            "id": message_id, "match_id": match_id, "messager_id": matcher_id, "message_content": content,
+            "kind": "text", "message_date": datetime.utcnow(), "message_read": False, "seq": seq,
+        }
+
+    with app.app_context():
+        matcher_id = db.session.get(Match, match_id).matcher_id
+        # A Strict Save While Redis was Down Took seq 1
+        Match.add_message(match_id, matcher_id, "Strict")
+        db.session.commit()
+
+        message_ids = [message_log_service.reserve_message_id() for _ in range(3)]
+        renumbered = []
+
+        def next_seq(next_match_id, last_seq):
+            renumbered.append((next_match_id, last_seq))
+            return last_seq + 5
+
+        try:
+            inserted = Match.insert_messages([row(message_ids[0], 1, "Logged 1"), row(message_ids[1], 2, "Logged 2")], next_seq=next_seq)
+            db.session.commit()
+            assert inserted == set(message_ids[:2])
+            assert renumbered == [(match_id, 2)]
+            pytest_assertion_success("A logged message whose seq was taken is renumbered past the kept seqs")
+
+            # A Replay Inserts Nothing and Takes No seq
+            assert Match.insert_messages([row(message_ids[0], 1, "Logged 1")], next_seq=next_seq) == set()
+            db.session.commit()
+            assert len(renumbered) == 1
+            pytest_assertion_success("A replayed message is skipped by id")
+
+            messages = Message.query.filter(Message.match_id == match_id).order_by(Message.seq).all()
+            assert [(message.seq, message.message_content) for message in messages] == [(1, "Strict"), (2, "Logged 2"), (7, "Logged 1")]
+            match = db.session.get(Match, match_id)
+            assert match.last_seq == 7 and match.last_message_preview == "Logged 2"
+            pytest_assertion_success("last_seq is the highest seq, and the last message the newest")
+        except AssertionError as e:
+            pytest_assertion_failure(str(e))
+            raise
+        finally:
+            Message.query.filter(Message.match_id == match_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    pytest_test_success()
+
+
+def test_append_seeds_counter_from_postgres(app, fake_redis, match_id):
+    pytest_start_test_display()
+
+    with app.app_context():
+        matcher_id = db.session.get(Match, match_id).matcher_id
+        Match.add_message(match_id, matcher_id, "Strict")
+        db.session.commit()
+
+        try:
+            message_log = MessageLog(fake_redis)
+            assert message_log.append(match_id, matcher_id, "Logged")["seq"] == 2
+            pytest_assertion_success("The counter is seeded from matches.last_seq")
+
+            # Flushed for Real - the Logged seq is Kept
+            assert MessageLogFlusher(app, consumer_name="test", redis_conn=fake_redis).flush_once() == 1
+            assert [message.seq for message in Message.query.filter(Message.match_id == match_id).order_by(Message.seq)] == [1, 2]
+            pytest_assertion_success("The flusher inserts a logged message with its seq")
+
+            assert message_log.append(-1, matcher_id, "Nobody's match") is None
+            pytest_assertion_success("A message for a missing match isn't logged")
+        except AssertionError as e:
+            pytest_assertion_failure(str(e))
+            raise
+        finally:
+            Message.query.filter(Message.match_id == match_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    pytest_test_success()
@@ -0,0 +1,203 @@
+import threading
+import uuid
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+import Backend.app
+from Backend.src.extensions import db
+from Backend.src.models.match import Match
+from Backend.src.models.swipe import Swipe, SwipeProcessor
+from Backend.src.models.user import User
+from Backend.src.utils import TestingConfig
+from Backend.tests.utils_for_tests import (
+    pytest_assertion_failure,
+    pytest_assertion_success,
+    pytest_start_test_display,
+    pytest_test_success,
+)
+
+MUTUAL_SWIPE_ROUNDS = 20 # Pairs Swiping on Each Other at the Same Moment
+
+
+@pytest.fixture()
+def app():
+    Backend.app.app.config.from_object(TestingConfig)
+    yield Backend.app.app
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def user_pairs(app):
+    """Fresh Pairs of Users, Removed Along with their Swipes and Matches Afterwards"""
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            pytest.skip("Swipe upserts need PostgreSQL")
+
+        user_ids = [str(uuid.uuid4()) for _ in range(MUTUAL_SWIPE_ROUNDS * 2)]
+        db.session.add_all(
+            User(id=user_id, email=f"{user_id}@swipe.test", auth_provider="email") for user_id in user_ids
+        )
+        db.session.commit()
+
+    yield list(zip(user_ids[::2], user_ids[1::2]))
+
+    with app.app_context():
+        Match.query.filter(Match.matcher_id.in_(user_ids)).delete(synchronize_session=False)
+        Swipe.query.filter(Swipe.swiper_id.in_(user_ids)).delete(synchronize_session=False)
+        User.query.filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def swipe_at_once(app, swipes):
+    """Run Each (swiper_id, swipee_id) Swipe Right on its Own Thread and Connection, Released Together"""
+    barrier = threading.Barrier(len(swipes))
+    outcomes, errors = [], []
+
+    def swipe(swiper_id, swipee_id):
+        with app.app_context():
+            try:
+                barrier.wait()
+                outcomes.append(SwipeProcessor.process_new_swipe(swiper_id, swipee_id, "PENDING"))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=swipe, args=pair) for pair in swipes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes, errors
+
+
+def test_simultaneous_mutual_swipes_create_one_match(app, user_pairs):
+
+    pytest_start_test_display()
+
+    for first_id, second_id in user_pairs:
+        outcomes, errors = swipe_at_once(app, [(first_id, second_id), (second_id, first_id)])
+        assert not errors, pytest_assertion_failure(f"Swipe Failed: {errors}")
+
+        # Exactly One of the Two Swipes Sees the Other and Creates the Match
+        assert sorted(outcome.swipe_result for outcome in outcomes) == ["ACCEPTED", "PENDING"]
+        assert [outcome.new_match for outcome in outcomes].count(True) == 1
+
+        with app.app_context():
+            pair_swipes = Swipe.query.filter(
+                Swipe.swiper_id.in_([first_id, second_id]), Swipe.swipee_id.in_([first_id, second_id])
+            ).all()
+            pair_matches = Match.query.filter(
+                Match.matcher_id.in_([first_id, second_id]), Match.matchee_id.in_([first_id, second_id])
+            ).count()
+
+        assert len(pair_swipes) == 1 and pair_swipes[0].swipe_result == "ACCEPTED"
+        assert pair_matches == 1, pytest_assertion_failure(f"{pair_matches} Matches for One Pair")
+
+    pytest_assertion_success(f"{len(user_pairs)} Simultaneous Mutual Swipes - One Swipe Row and One Match Each")
+
+    pytest_test_success()
+
+
+def test_reswiping_right_does_not_accept_own_swipe(app, user_pairs):
+
+    pytest_start_test_display()
+
+    swiper_id, swipee_id = user_pairs[0]
+    with app.app_context():
+        SwipeProcessor.process_new_swipe(swiper_id, swipee_id, "PENDING")
+        outcome = SwipeProcessor.process_new_swipe(swiper_id, swipee_id, "PENDING")
+
+    assert outcome.swipe_result == "PENDING" and outcome.match_id is None
+    pytest_assertion_success("Swiping Right Twice on the Same User Leaves the Pair PENDING")
+
+    pytest_test_success()
+
+
+def post_swipe_batch(app, client, swiper_id, swipes):
+    """POST /users/swipes/batch as swiper_id"""
+    with app.app_context():
+        token = create_access_token(identity=swiper_id)
+    return client.post("/users/swipes/batch", json={"swipes": swipes}, headers={"X-Authorization": f"Bearer {token}"})
+
+
+def test_swipe_batch_marks_bad_entries_invalid(app, client, user_pairs):
+
+    pytest_start_test_display()
+
+    swiper_id, swipee_id = user_pairs[0]
+    other_id = user_pairs[1][0]
+    response = post_swipe_batch(app, client, swiper_id, [
+        {"swipee_id": swipee_id, "swipe_result": "PENDING"},
+        {"swipee_id": [other_id], "swipe_result": "PENDING"}, # Not a String
+        {"swipee_id": {"id": other_id}, "swipe_result": "REJECTED"}, # Not a String
+        {"swipee_id": other_id, "swipe_result": ["PENDING"]}, # Not a String
+        {"swipee_id": str(uuid.uuid4()), "swipe_result": "PENDING"}, # No Such User
+        {"swipee_id": other_id, "swipe_result": "ACCEPTED"}, # Only Ever Derived
+        {"swipee_id": swiper_id, "swipe_result": "PENDING"}, # Self
+        "not a swipe",
+    ])
+
+    assert response.status_code == 201, pytest_assertion_failure(response.get_json())
+    statuses = [result["status"] for result in response.get_json()["results"]]
+    assert statuses == ["SUCCESS"] + ["INVALID"] * 7, pytest_assertion_failure(statuses)
+    pytest_assertion_success("Bad Entries are INVALID Individually - the Rest of the Batch Goes Through")
+
+    assert post_swipe_batch(app, client, swiper_id, []).status_code == 400
+    pytest_assertion_success("An Empty Batch is Rejected")
+
+    pytest_test_success()
+
+
+def test_swipe_batch_last_swipe_on_card_wins(app, client, user_pairs):
+
+    pytest_start_test_display()
+
+    swiper_id, swipee_id = user_pairs[0]
+    response = post_swipe_batch(app, client, swiper_id, [
+        {"swipee_id": swipee_id, "swipe_result": "PENDING"},
+        {"swipee_id": swipee_id, "swipe_result": "REJECTED"},
+    ])
+
+    assert response.status_code == 201
+    assert [result["swipe_result"] for result in response.get_json()["results"]] == ["REJECTED", "REJECTED"]
+    with app.app_context():
+        pair_swipes = Swipe.query.filter(Swipe.swiper_id == swiper_id, Swipe.swipee_id == swipee_id).all()
+    assert [swipe.swipe_result for swipe in pair_swipes] == ["REJECTED"]
+    pytest_assertion_success("Swiping a Card Twice in a Batch Keeps the Last Swipe")
+
+    pytest_test_success()
+
+
+def test_swipe_batch_mutual_like_makes_new_match(app, client, user_pairs):
+
+    pytest_start_test_display()
+
+    swiper_id, liker_id = user_pairs[0]
+    plain_id = user_pairs[1][0]
+    with app.app_context():
+        SwipeProcessor.process_new_swipe(liker_id, swiper_id, "PENDING")
+
+    response = post_swipe_batch(app, client, swiper_id, [
+        {"swipee_id": plain_id, "swipe_result": "PENDING"},
+        {"swipee_id": liker_id, "swipe_result": "PENDING"},
+    ])
+
+    assert response.status_code == 201
+    body = response.get_json()
+    plain, mutual = body["results"]
+    assert plain["status"] == "SUCCESS" and plain["swipe_result"] == "PENDING" and plain["match_id"] is None
+    assert mutual["status"] == "NEW" and mutual["swipe_result"] == "ACCEPTED" and mutual["match_id"]
+    assert body["matches"] == [{"match_id": mutual["match_id"], "user_id": liker_id}]
+    pytest_assertion_success("A Mutual Like in a Batch is a NEW Match with its match_id")
+
+    with app.app_context():
+        assert Match.query.filter(Match.matcher_id.in_([swiper_id, liker_id]), Match.matchee_id.in_([swiper_id, liker_id])).count() == 1
+    pytest_assertion_success("One Match Row for the Pair")
+
+    pytest_test_success()
@@ -0,0 +1,258 @@
+import uuid
+
+import pytest
+
+import Backend.app
+from Backend.src.extensions import db
+from Backend.src.models.match import Match
+from Backend.src.models.swipe import Swipe
+from Backend.src.models.user import User
+from Backend.src.services.mutual_like_service import MutualLikeDetector, liked_by_key
+from Backend.src.services.swipe_log_flusher import (
+    SWIPE_FLUSH_MAX_ATTEMPTS,
+    SWIPE_LOG_ATTEMPTS_KEY,
+    SWIPE_LOG_DEAD_STREAM,
+    SWIPE_LOG_GROUP,
+    SwipeLogFlusher,
+    swipe_waves,
+)
+from Backend.src.services.stream_flusher import requeue_dead_entries
+from Backend.src.services.swipe_log_service import SWIPE_LOG_STREAM, SwipeLog
+from Backend.src.utils import TestingConfig
+from Backend.tests.utils_for_tests import (
+    pytest_assertion_failure,
+    pytest_assertion_success,
+    pytest_start_test_display,
+    pytest_test_success,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture()
+def app():
+    Backend.app.app.config.from_object(TestingConfig)
+    yield Backend.app.app
+
+
+@pytest.fixture()
+def fake_redis():
+    """A Fresh In-Memory Redis (with Lua, for RESOLVE_SWIPE_SCRIPT)"""
+    yield fakeredis.FakeRedis(decode_responses=True)
+
+
+class StubFlusher(SwipeLogFlusher):
+    """A Flusher Whose Postgres is Faked - Writes Fail for Swipes on failing_ids, or All Writes While Down"""
+
+    def __init__(self, app, redis_conn):
+        super().__init__(app, batch_size=10, consumer_name="test", redis_conn=redis_conn)
+        self.database_up = True
+        self.failing_ids = set()
+        self.written = []
+
+    def _write(self, entries):
+        if not self.database_up:
+            raise ConnectionError("database is down")
+        for _, entry in entries:
+            if entry["swipee_id"] in self.failing_ids:
+                raise ValueError(f"swipee {entry['swipee_id']} is gone")
+        self.written.extend(entry for _, entry in entries)
+
+    def _database_up(self):
+        return self.database_up
+
+
+def pending_count(redis_conn):
+    return redis_conn.xpending(SWIPE_LOG_STREAM, SWIPE_LOG_GROUP)["pending"]
+
+
+def test_swipe_waves_keep_pair_order():
+    pytest_start_test_display()
+
+    date = "2025-01-01T00:00:00+00:00"
+    entries = [
+        ("1-0", {"swiper_id": "a", "swipee_id": "b", "swipe_result": "PENDING", "swipe_date": date}),
+        ("2-0", {"swiper_id": "c", "swipee_id": "d", "swipe_result": "PENDING", "swipe_date": date}),
+        ("3-0", {"swiper_id": "b", "swipee_id": "a", "swipe_result": "PENDING", "swipe_date": date}),
+        ("4-0", {"swiper_id": "a", "swipee_id": "b", "swipe_result": "REJECTED", "swipe_date": date}),
+    ]
+    waves = swipe_waves(entries)
+
+    try:
+        # One Swipe per Pair per Wave, in Log Order - (a, b) and (b, a) are the Same Pair
+        assert [[(row["swiper_id"], row["swipee_id"], row["swipe_result"]) for row in wave] for wave in waves] == [
+            [("a", "b", "PENDING"), ("c", "d", "PENDING")],
+            [("b", "a", "PENDING")],
+            [("a", "b", "REJECTED")],
+        ]
+        pytest_assertion_success("Waves keep each pair's swipes in log order")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_resolve_swipe_outcomes(app, fake_redis):
+    pytest_start_test_display()
+
+    detector = MutualLikeDetector(fake_redis)
+
+    try:
+        # A Right Swipe Waits for the Other Side - b is Now Liked by a
+        assert detector.resolve_swipes("a", {"b": "PENDING"}, log_stream=SWIPE_LOG_STREAM) == {"b": "PENDING"}
+        assert fake_redis.smembers(liked_by_key("b")) == {"a"}
+        pytest_assertion_success("A first right swipe stays PENDING")
+
+        # The Other Side Swiping Right Makes it Mutual, and Uses Up the Like
+        assert detector.resolve_swipes("b", {"a": "PENDING"}, log_stream=SWIPE_LOG_STREAM) == {"a": "ACCEPTED"}
+        assert not fake_redis.smembers(liked_by_key("b"))
+        pytest_assertion_success("A mutual right swipe is ACCEPTED")
+
+        # A Left Swipe Clears the Like in Both Directions
+        detector.resolve_swipes("c", {"d": "PENDING"})
+        assert detector.resolve_swipes("d", {"c": "REJECTED"}, log_stream=SWIPE_LOG_STREAM) == {"c": "REJECTED"}
+        assert not fake_redis.smembers(liked_by_key("d"))
+        pytest_assertion_success("A left swipe is REJECTED and clears the like")
+
+        # Every Swipe Given the Stream was Logged As Made, Not As Resolved
+        logged = [(entry["swiper_id"], entry["swipee_id"], entry["swipe_result"]) for _, entry in fake_redis.xrange(SWIPE_LOG_STREAM)]
+        assert logged == [("a", "b", "PENDING"), ("b", "a", "PENDING"), ("d", "c", "REJECTED")]
+        pytest_assertion_success("Swipes are logged atomically with their resolution")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_flusher_acks_written_swipes(app, fake_redis):
+    pytest_start_test_display()
+
+    SwipeLog(fake_redis).append_many("a", {"b": "PENDING", "c": "REJECTED"})
+    flusher = StubFlusher(app, fake_redis)
+
+    try:
+        assert flusher.flush_once() == 2
+        assert [entry["swipee_id"] for entry in flusher.written] == ["b", "c"]
+        assert fake_redis.xlen(SWIPE_LOG_STREAM) == 0 and pending_count(fake_redis) == 0
+        pytest_assertion_success("A written batch is acknowledged and deleted")
+
+        assert flusher.flush_once() == 0
+        pytest_assertion_success("An empty log writes nothing")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_flusher_backs_off_while_database_down(app, fake_redis):
+    pytest_start_test_display()
+
+    SwipeLog(fake_redis).append_many("a", {"b": "PENDING", "c": "PENDING"})
+    flusher = StubFlusher(app, fake_redis)
+    flusher.database_up = False
+
+    try:
+        # Far More Failed Flushes than SWIPE_FLUSH_MAX_ATTEMPTS - an Outage Must Not Dead-Letter Anything
+        for _ in range(SWIPE_FLUSH_MAX_ATTEMPTS * 2):
+            assert flusher.flush_once() == 0
+        assert flusher.backoff_s > 1
+        assert pending_count(fake_redis) == 2
+        assert not fake_redis.exists(SWIPE_LOG_DEAD_STREAM) and not fake_redis.exists(SWIPE_LOG_ATTEMPTS_KEY)
+        pytest_assertion_success("Swipes stay pending, unattempted, while the database is down")
+
+        # Back Up - the Pending Swipes are Replayed and the Backoff Resets
+        flusher.database_up = True
+        assert flusher.flush_once() == 2
+        assert flusher.backoff_s == 0
+        assert fake_redis.xlen(SWIPE_LOG_STREAM) == 0 and pending_count(fake_redis) == 0
+        pytest_assertion_success("Pending swipes are replayed once the database is back")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_flusher_dead_letters_failing_swipe(app, fake_redis):
+    pytest_start_test_display()
+
+    SwipeLog(fake_redis).append_many("a", {"b": "PENDING", "gone": "PENDING"})
+    flusher = StubFlusher(app, fake_redis)
+    flusher.failing_ids = {"gone"}
+
+    try:
+        # The Good Swipe Goes In on the First Flush, the Failing One is Retried Each Flush
+        assert flusher.flush_once() == 1
+        for attempt in range(2, SWIPE_FLUSH_MAX_ATTEMPTS):
+            assert flusher.flush_once() == 0
+            assert int(fake_redis.hget(SWIPE_LOG_ATTEMPTS_KEY, fake_redis.xrange(SWIPE_LOG_STREAM)[0][0])) == attempt
+        assert pending_count(fake_redis) == 1 and not fake_redis.exists(SWIPE_LOG_DEAD_STREAM)
+        pytest_assertion_success("A failing swipe stays pending until its last attempt")
+
+        assert flusher.flush_once() == 0
+        dead = fake_redis.xrange(SWIPE_LOG_DEAD_STREAM)
+        assert len(dead) == 1 and dead[0][1]["swipee_id"] == "gone" and "is gone" in dead[0][1]["error"]
+        assert fake_redis.xlen(SWIPE_LOG_STREAM) == 0 and pending_count(fake_redis) == 0
+        assert not fake_redis.exists(SWIPE_LOG_ATTEMPTS_KEY)
+        pytest_assertion_success(f"A swipe failing {SWIPE_FLUSH_MAX_ATTEMPTS} times is dead-lettered")
+
+        # Fixed - Requeued Swipes are Flushed Like New Ones
+        flusher.failing_ids = set()
+        assert requeue_dead_entries(SWIPE_LOG_STREAM, SWIPE_LOG_DEAD_STREAM, fake_redis) == 1
+        assert not fake_redis.xlen(SWIPE_LOG_DEAD_STREAM)
+        assert flusher.flush_once() == 1
+        assert flusher.written[-1]["swipee_id"] == "gone"
+        pytest_assertion_success("A requeued swipe is flushed")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+
+    pytest_test_success()
+
+
+def test_flusher_replays_into_postgres(app, fake_redis):
+    pytest_start_test_display()
+
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            pytest.skip("Swipe upserts need PostgreSQL")
+
+        user_ids = [str(uuid.uuid4()) for _ in range(2)]
+        db.session.add_all(User(id=user_id, email=f"{user_id}@swipe.test", auth_provider="email") for user_id in user_ids)
+        db.session.commit()
+    matcher_id, matchee_id = user_ids
+
+    try:
+        swipe_log = SwipeLog(fake_redis)
+        assert swipe_log.append(matcher_id, matchee_id, "PENDING") == "PENDING"
+        assert swipe_log.append(matchee_id, matcher_id, "PENDING") == "ACCEPTED"
+
+        # A Crash After the Commit but Before the XACK Replays the Batch - the Upsert Makes it Harmless
+        flusher = SwipeLogFlusher(app, consumer_name="test", redis_conn=fake_redis)
+        flusher._ensure_group()
+        entries = flusher._next_batch(None)
+        flusher._write(entries)
+        flusher.pending_checked = False
+        assert flusher.flush_once() == 2
+
+        with app.app_context():
+            swipes = Swipe.query.filter(Swipe.swiper_id.in_(user_ids)).all()
+            matches = Match.query.filter(Match.matcher_id.in_(user_ids)).all()
+            assert len(swipes) == 1 and swipes[0].swipe_result == "ACCEPTED"
+            assert len(matches) == 1
+        assert fake_redis.xlen(SWIPE_LOG_STREAM) == 0
+        pytest_assertion_success("A replayed batch leaves one ACCEPTED swipe and one match")
+    except AssertionError as e:
+        pytest_assertion_failure(str(e))
+        raise
+    finally:
+        with app.app_context():
+            Match.query.filter(Match.matcher_id.in_(user_ids)).delete(synchronize_session=False)
+            Swipe.query.filter(Swipe.swiper_id.in_(user_ids)).delete(synchronize_session=False)
+            User.query.filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+            db.session.commit()
+
+    pytest_test_success()
@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+import pytest
+
+from Backend.src.services.swipe_ranking_service import DEFAULT_SCORE_WEIGHTS, SwipeRanker
+from Backend.tests.utils_for_tests import (
+    pytest_assertion_success,
+    pytest_start_test_display,
+    pytest_test_success,
+)
+
+
+def make_features(now, **overrides):
+    """Three Identical Candidates, Adjusted per Test"""
+    features = {
+        "same_city": np.array([False, False, False]),
+        "same_state": np.array([False, False, False]),
+        "age_gap": np.array([0.0, 0.0, 0.0]),
+        "last_online": np.array([now, now, now]),
+        "filled_fields": np.array([5.0, 5.0, 5.0]),
+        "has_photo": np.array([True, True, True]),
+    }
+    features.update(overrides)
+    return features
+
+
+def test_ranker_prefers_closer_and_more_active_candidates():
+
+    pytest_start_test_display()
+
+    ranker = SwipeRanker(DEFAULT_SCORE_WEIGHTS)
+    now = time.time()
+    features = make_features(
+        now,
+        same_city=np.array([False, True, False]),
+        same_state=np.array([True, True, True]),
+        last_online=np.array([now - 86400.0, now, np.nan]),
+    )
+
+    ranked = ranker.top_k(ranker.score(features, now), 3)
+    assert list(ranked) == [1, 0, 2]
+    pytest_assertion_success("Same City, Recently Active Candidate Ranked First")
+
+    pytest_test_success()
+
+
+def test_ranker_top_k_matches_full_sort():
+
+    pytest_start_test_display()
+
+    ranker = SwipeRanker(DEFAULT_SCORE_WEIGHTS)
+    scores = np.random.default_rng(7).random(10000)
+
+    assert list(ranker.top_k(scores, 50)) == list(np.argsort(-scores)[:50])
+    pytest_assertion_success("argpartition Top-k Equals the Head of a Full Sort")
+
+    assert len(ranker.top_k(scores[:10], 50)) == 10
+    pytest_assertion_success("k Larger than the Block Returns the Whole Block")
+
+    pytest_test_success()
+
+
+def test_ranker_rejects_unknown_weights():
+
+    pytest_start_test_display()
+
+    with pytest.raises(ValueError):
+        SwipeRanker({"interests": 1.0})
+    pytest_assertion_success("Unknown Score Component Rejected")
+
+    pytest_test_success()